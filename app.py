@@ -11,10 +11,12 @@ import time
 import os
 import sys
 
-from config import HOST, PORT, PUBLIC_HOST
+from config import HOST, PORT, PUBLIC_HOST, LIVE_RECORD_PATH, LIVE_REPLAY_PATH, LIVE_REPLAY_SPEED
+from constants import get_augment_index
+from core import lcu
 from routes import page_bp, data_bp
 from websocket import register_socket_events
-from utils import get_local_ip
+from utils import get_local_ip, json_codec
 from utils.logger import logger
 
 
@@ -27,6 +29,8 @@ def create_app():
     """
     # 初始化Flask应用
     app = Flask(__name__)
+    # 统一的 JSON 编解码（orjson 可用时使用 orjson）
+    app.json = json_codec.CodecJSONProvider(app)
     
     # 注册蓝图
     app.register_blueprint(page_bp)  # 页面渲染路由
@@ -40,6 +44,7 @@ def create_app():
         app, 
         cors_allowed_origins="*",
         async_mode='threading',
+        json=json_codec,
         logger=False,
         engineio_logger=False
     )
@@ -47,6 +52,15 @@ def create_app():
     # 注册WebSocket事件
     register_socket_events(socketio)
     
+    # 预先构建海克斯天赋索引，避免首次查看对局时加载
+    get_augment_index()
+    
+    # 可选：实时对局录制 / 回放
+    if LIVE_REPLAY_PATH:
+        lcu.start_live_replay(LIVE_REPLAY_PATH, speed=LIVE_REPLAY_SPEED, loop=True)
+    elif LIVE_RECORD_PATH:
+        lcu.start_live_recording(LIVE_RECORD_PATH)
+    
     return app, socketio
 
 
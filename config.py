@@ -2,6 +2,7 @@
 配置文件
 包含应用的全局配置和共享状态
 """
+import os
 
 # Flask 配置
 HOST = '0.0.0.0'
@@ -10,6 +11,26 @@ PORT = 5000
 # 如果为 None，则使用自动检测到的局域网 IP 或回环地址
 PUBLIC_HOST = None
 
+# LCU 连接池配置
+# 单个 (port, token) 会话内保持的最大 keep-alive 连接数，
+# 需覆盖轮询线程 + Flask 路由 + 数据增强的并发请求数
+LCU_POOL_SIZE = 16
+
+# 本地对局存档（SQLite），已结束的对局详情只需从 LCU 获取一次
+# 设置环境变量 LOLHELPER_ARCHIVE_PATH 可以改为其他位置
+MATCH_ARCHIVE_PATH = os.environ.get(
+    'LOLHELPER_ARCHIVE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'match_archive.sqlite3')
+)
+
+# 实时对局录制 / 回放（默认关闭）
+# LOLHELPER_LIVE_RECORD:        把游戏内 API 数据追加录制到该文件
+# LOLHELPER_LIVE_REPLAY:        从录制文件回放，替代端口 2999（无需游戏客户端）
+# LOLHELPER_LIVE_REPLAY_SPEED:  回放速度倍数，默认 1.0
+LIVE_RECORD_PATH = os.environ.get('LOLHELPER_LIVE_RECORD') or None
+LIVE_REPLAY_PATH = os.environ.get('LOLHELPER_LIVE_REPLAY') or None
+LIVE_REPLAY_SPEED = float(os.environ.get('LOLHELPER_LIVE_REPLAY_SPEED') or 1.0)
+
 # 全局状态变量
 class AppState:
     """应用全局状态管理"""
@@ -1,6 +1,8 @@
 import os
 import json
 from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
 
 # --- LCU 根路径查找函数 ---
 
@@ -158,4 +160,49 @@ def get_augment_info_by_id(augment_id):
         dict: {'name': '中文名称', 'desc': '中文描述'} 或 None
     """
     info_dict = _get_augment_info_map()  # 使用延迟加载
-    return info_dict.get(augment_id)
\ No newline at end of file
+    return info_dict.get(augment_id)
+
+
+# 海克斯天赋查询索引：{mapped_id: AugmentRecord}
+# 合并 augment_names.json 与 augment_info.json，只构建一次，之后为只读映射，
+# 补全对局数据时每个天赋槽位只需一次字典查找
+class AugmentRecord(NamedTuple):
+    """单个海克斯天赋的展示信息"""
+    name: str | None
+    desc: str | None
+    icon_url: str | None
+
+
+AUGMENT_INDEX = None
+
+
+def build_augment_index(version='15.19'):
+    """
+    构建海克斯天赋索引
+
+    Args:
+        version: 图标 CDN 版本号
+
+    Returns:
+        MappingProxyType: {mapped_id: AugmentRecord}，不在数据中的ID不会出现
+    """
+    names = _get_augment_names()
+    infos = _get_augment_info_map()
+    index = {}
+    for augment_id in set(names) | set(infos):
+        info = infos.get(augment_id)
+        if isinstance(info, dict) and info:
+            name = info.get('name', '') or info.get('title', '')
+            desc = info.get('desc', '') or info.get('description', '')
+        else:
+            name = desc = None
+        index[augment_id] = AugmentRecord(name, desc, get_augment_icon_url(augment_id, version))
+    return MappingProxyType(index)
+
+
+def get_augment_index():
+    """获取海克斯天赋索引，首次调用时构建（应用启动时会预先构建）"""
+    global AUGMENT_INDEX
+    if AUGMENT_INDEX is None:
+        AUGMENT_INDEX = build_augment_index()
+    return AUGMENT_INDEX
@@ -4,11 +4,13 @@ League of Legends Client Update API 客户端封装
 
 提供与英雄联盟客户端交互的完整功能:
 - 凭证自动检测
+- 事件推送订阅 (WebSocket)
 - 游戏流程控制
 - 召唤师信息查询
 - 战绩历史记录
 - 游戏内实时数据
 - 数据增强功能
+- 异步客户端 (core.lcu.aio，同名函数的协程版本)
 
 使用示例:
     from core.lcu import autodetect_credentials, get_current_summoner
@@ -30,7 +32,16 @@ from .credentials import (
 )
 
 # HTTP 客户端
-from .client import make_request
+from .client import make_request, request_with_status, get_session, reset_session, get_session_stats
+
+# 缓存
+from .cache import TTLCache, get_cache_stats
+
+# 并发请求合并
+from .singleflight import SingleFlight, get_singleflight_stats
+
+# 事件推送
+from .events import event_bus, ensure_event_bus, LcuEvent
 
 # 游戏流程
 from .game_flow import (
@@ -40,26 +51,47 @@ from .game_flow import (
     get_champ_select_enemies
 )
 
+# 选人会话状态模型
+from .champ_select import ChampSelectState, ChampSelectChange
+
 # 召唤师信息
 from .summoner import (
     get_current_summoner,
     get_puuid,
+    get_cached_puuid,
     get_summoner_by_id,
     get_summoner_by_puuid,
     get_summoner_by_name,
-    get_ranked_stats
+    get_summoners_by_puuids,
+    get_summoners_by_ids,
+    get_bulk_summoner_stats,
+    get_ranked_stats,
+    get_ranked_endpoint_stats
 )
 
 # 战绩查询
 from .match_history import (
     get_match_history,
+    get_cached_history_page,
     get_tft_match_history,
-    get_match_by_id
+    get_cached_tft_history,
+    get_match_by_id,
+    get_history_sync_stats
 )
 
 # 游戏内实时数据
 from .live_game import (
     get_live_game_data,
+    get_live_active_player,
+    get_live_player_list,
+    get_live_game_stats,
+    get_live_events,
+    start_live_recording,
+    stop_live_recording,
+    start_live_replay,
+    stop_live_replay,
+    record_live_frame,
+    get_live_recording_stats,
     get_enemy_players_from_game,
     get_all_players_from_game,
     get_enemy_stats
@@ -78,28 +110,65 @@ __all__ = [
     
     # HTTP 客户端
     'make_request',
+    'request_with_status',
+    'get_session',
+    'reset_session',
+    'get_session_stats',
+    
+    # 缓存
+    'TTLCache',
+    'get_cache_stats',
+    
+    # 并发请求合并
+    'SingleFlight',
+    'get_singleflight_stats',
+    
+    # 事件推送
+    'event_bus',
+    'ensure_event_bus',
+    'LcuEvent',
     
     # 游戏流程
     'get_gameflow_phase',
     'accept_ready_check',
     'get_champ_select_session',
+    'ChampSelectState',
+    'ChampSelectChange',
     'get_champ_select_enemies',
     
     # 召唤师信息
     'get_current_summoner',
     'get_puuid',
+    'get_cached_puuid',
     'get_summoner_by_id',
     'get_summoner_by_puuid',
     'get_summoner_by_name',
+    'get_summoners_by_puuids',
+    'get_summoners_by_ids',
+    'get_bulk_summoner_stats',
     'get_ranked_stats',
+    'get_ranked_endpoint_stats',
     
     # 战绩查询
     'get_match_history',
+    'get_cached_history_page',
     'get_tft_match_history',
+    'get_cached_tft_history',
     'get_match_by_id',
+    'get_history_sync_stats',
     
     # 游戏内实时数据
     'get_live_game_data',
+    'get_live_active_player',
+    'get_live_player_list',
+    'get_live_game_stats',
+    'get_live_events',
+    'start_live_recording',
+    'stop_live_recording',
+    'start_live_replay',
+    'stop_live_replay',
+    'record_live_frame',
+    'get_live_recording_stats',
     'get_enemy_players_from_game',
     'get_all_players_from_game',
     'get_enemy_stats',
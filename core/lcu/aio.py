@@ -0,0 +1,695 @@
+"""
+异步 LCU 客户端
+core.lcu 查询类函数的协程版本（同名、同参数、同返回值），用于一次发起大量 LCU 查询
+（整局玩家的召唤师信息、段位、战绩），在一个事件循环线程内 gather，不再为每个请求占用一个线程。
+
+缓存、增量同步、排位端点记录、批量接口可用性等状态和判断都在同步模块中
+（summoner.BulkSummonerLookup / RankedLookup、match_history.HistorySync 等），本模块只负责发送请求和并发调度，
+两种客户端的行为和统计保持一致。并发请求合并也使用同步模块的 SingleFlight（do_async，key 相同），
+同步路由和异步批量查询同时请求同一玩家/对局时只向 LCU 发起一次。
+
+覆盖的接口:
+- make_request / request_with_status
+- 召唤师: get_current_summoner、get_puuid、get_summoner_by_id / by_puuid / by_name、
+  get_summoners_by_puuids / by_ids、get_ranked_stats
+- 战绩: get_match_history、get_tft_match_history、get_match_by_id
+- 游戏内实时数据（2999 端口，回放模式下读取录制）: get_live_game_data、get_live_active_player、
+  get_live_player_list、get_live_game_stats、get_live_events、get_all_players_from_game
+- 批量查询: fetch_players、fetch_histories，以及在后台事件循环中执行的 *_sync 版本
+
+不覆盖（请直接使用 core.lcu 的同步版本）: 凭证检测、事件推送、游戏流程与选人会话、
+数据增强、实时数据录制/回放控制、各类统计函数。
+
+每个事件循环一个连接池（最多 LCU_POOL_SIZE 个连接），同时进行的请求数受 AIO_MAX_CONCURRENCY 限制，
+每个请求有独立的超时。依赖 aiohttp（可选依赖: pip install ".[async]"）；未安装时请求回退为
+在线程中调用同步 request_with_status，并发数仍受同样的限制。
+
+使用示例:
+    from core.lcu import aio
+
+    # 协程中
+    ranked = await aio.get_ranked_stats(token, port, puuid=puuid)
+
+    # 同步代码中
+    players = aio.fetch_players_sync(token, port, puuids, deadline=5)
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+import weakref
+
+from config import LCU_POOL_SIZE
+from core.match_archive import match_archive
+from utils import json_codec
+from utils.logger import logger
+from . import live_game as _sync_live
+from .client import request_with_status as _sync_request_with_status
+from .match_history import (
+    MATCH_REQUEST_TIMEOUT,
+    RETRY_DELAY,
+    TFT_MAX_RETRIES,
+    HistorySync,
+    build_history_page,
+    get_cached_history_page,
+    get_cached_tft_history,
+    history_flight,
+    match_endpoints,
+    match_flight,
+    store_tft_history,
+    tft_history_flight,
+    tft_history_request,
+)
+from .summoner import (
+    BulkSummonerLookup,
+    RankedLookup,
+    cache_summoner,
+    get_cached_puuid,
+    get_cached_summoner,
+    parse_ranked_response,
+    puuid_flight,
+    puuid_request,
+    ranked_discovery_flight,
+    store_puuid,
+    summoner_endpoint,
+)
+
+try:
+    import aiohttp
+except ImportError:  # 可选依赖，未安装时回退到线程
+    aiohttp = None
+
+# 每个事件循环同时进行的 LCU 请求数上限
+AIO_MAX_CONCURRENCY = 8
+# 默认单个请求超时（秒），与 make_request 一致
+DEFAULT_TIMEOUT = 5
+# fetch_players 默认获取的战绩数量，与 /get_history 默认每页数量一致
+PLAYER_HISTORY_COUNT = 20
+
+_stats_lock = threading.Lock()
+_stats = {'requests': 0, 'errors': 0, 'timeouts': 0, 'max_in_flight': 0, 'total_time': 0.0}
+
+
+def _incr_stat(name, value=1):
+    with _stats_lock:
+        _stats[name] += value
+
+
+class AsyncLcuClient:
+    """
+    绑定到一个事件循环的 LCU 客户端（aiohttp 会话和信号量不能跨事件循环使用）。
+
+    一般不直接创建，通过 get_client(token, port) 获取当前事件循环的共享实例。
+    """
+
+    def __init__(self, token, port, max_concurrency=AIO_MAX_CONCURRENCY, pool_size=LCU_POOL_SIZE):
+        self.token = token
+        self.port = port
+        self._pool_size = pool_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None
+        self._in_flight = 0
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                base_url=f"https://127.0.0.1:{self.port}",
+                auth=aiohttp.BasicAuth('riot', self.token),
+                connector=aiohttp.TCPConnector(limit=self._pool_size, ssl=False),
+                json_serialize=json_codec.dumps,
+            )
+        return self._session
+
+    async def request(self, method, endpoint, **kwargs):
+        """
+        发起一次 LCU 请求（参数与 make_request 相同：params、json、timeout）
+
+        Returns:
+            dict: 响应JSON数据，失败返回None
+        """
+        return (await self.request_with_status(method, endpoint, **kwargs))[1]
+
+    async def request_with_status(self, method, endpoint, **kwargs):
+        """
+        与 request 相同，同时返回 HTTP 状态码
+
+        Returns:
+            tuple: (status, data)，status 为 None 表示没有收到响应
+        """
+        timeout = kwargs.pop('timeout', DEFAULT_TIMEOUT)
+        async with self._semaphore:
+            self._in_flight += 1
+            with _stats_lock:
+                _stats['max_in_flight'] = max(_stats['max_in_flight'], self._in_flight)
+            started = time.perf_counter()
+            try:
+                if aiohttp is None:
+                    return await asyncio.to_thread(
+                        _sync_request_with_status, method, endpoint, self.token, self.port,
+                        timeout=timeout, **kwargs
+                    )
+                return await self._request(method, endpoint, timeout, **kwargs)
+            finally:
+                self._in_flight -= 1
+                elapsed = time.perf_counter() - started
+                with _stats_lock:
+                    _stats['requests'] += 1
+                    _stats['total_time'] += elapsed
+
+    async def _request(self, method, endpoint, timeout, **kwargs):
+        status = None
+        try:
+            async with self._get_session().request(
+                method, endpoint, timeout=aiohttp.ClientTimeout(total=timeout), **kwargs
+            ) as response:
+                status = response.status
+                if status == 204:  # No Content
+                    return status, None
+                if status >= 400:
+                    _incr_stat('errors')
+                    # 🔇 静默处理404错误（端点尝试时很常见）
+                    if status != 404:
+                        logger.warning(f"⚠️ LCU API 错误 ({method} {endpoint}) : {status} {response.reason}")
+                    return status, None
+                return status, await response.json(loads=json_codec.loads, content_type=None)
+        except asyncio.TimeoutError:
+            _incr_stat('timeouts')
+            logger.warning(f"⚠️ LCU API 请求超时 ({method} {endpoint}, timeout={timeout}s)")
+            return None, None
+        except aiohttp.ClientConnectorError:
+            # 🔇 连接被拒绝通常是客户端未启动或正在重启
+            _incr_stat('errors')
+            return None, None
+        except (aiohttp.ClientError, ValueError) as e:
+            _incr_stat('errors')
+            logger.warning(f"⚠️ LCU API 请求异常 ({method} {endpoint}) : {e}")
+            return status, None
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+# 每个事件循环的共享客户端与游戏内 API 会话
+_clients = weakref.WeakKeyDictionary()
+_live_sessions = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def get_client(token, port):
+    """
+    获取当前事件循环中 (port, token) 对应的共享客户端（需在协程中调用）。
+
+    凭证变化（客户端重启、重新检测）时关闭旧客户端并重建连接池。
+    """
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is not None and (client.port, client.token) == (port, token):
+            return client
+        old_client = client
+        client = _clients[loop] = AsyncLcuClient(token, port)
+    if old_client is not None:
+        logger.debug(f"🔁 LCU 凭证变化，重建异步连接池 (port={port})")
+        loop.create_task(old_client.close())
+    return client
+
+
+async def close():
+    """关闭当前事件循环中的客户端和游戏内 API 会话"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.pop(loop, None)
+        live_session = _live_sessions.pop(loop, None)
+    if client is not None:
+        await client.close()
+    if live_session is not None:
+        await live_session.close()
+
+
+async def make_request(method, endpoint, token, port, **kwargs):
+    """协程版 make_request，参数与返回值相同"""
+    return await get_client(token, port).request(method, endpoint, **kwargs)
+
+
+async def request_with_status(method, endpoint, token, port, **kwargs):
+    """协程版 request_with_status，返回 (status, data)"""
+    return await get_client(token, port).request_with_status(method, endpoint, **kwargs)
+
+
+# ----------------------------------------------------------------------
+# 召唤师信息
+# ----------------------------------------------------------------------
+async def get_current_summoner(token, port):
+    """获取当前登录召唤师的完整信息"""
+    return await make_request("GET", "/lol-summoner/v1/current-summoner", token, port)
+
+
+async def get_puuid(token, port, summoner_name):
+    """通过召唤师名字（GameName#TAG）获取PUUID（与同步版本共享PUUID缓存），失败返回None"""
+    cached_puuid = get_cached_puuid(summoner_name)
+    if cached_puuid is not None:
+        return cached_puuid
+
+    async def fetch():
+        method, endpoint, kwargs = puuid_request(summoner_name)
+        return store_puuid(summoner_name, await make_request(method, endpoint, token, port, **kwargs))
+
+    return await puuid_flight.do_async((port, summoner_name), fetch)
+
+
+async def _get_summoner(token, port, kind, key):
+    cached = get_cached_summoner(kind, key)
+    if cached is not None:
+        return cached
+    info = await make_request("GET", summoner_endpoint(kind, key), token, port)
+    cache_summoner(info)
+    return info
+
+
+async def get_summoner_by_puuid(token, port, puuid):
+    """通过 puuid 获取召唤师信息（与同步版本共享召唤师缓存）"""
+    return await _get_summoner(token, port, 'puuid', puuid)
+
+
+async def get_summoner_by_id(token, port, summoner_id):
+    """通过 summonerId 获取召唤师信息（与同步版本共享召唤师缓存）"""
+    return await _get_summoner(token, port, 'id', summoner_id)
+
+
+async def get_summoner_by_name(token, port, name):
+    """通过召唤师名字查询完整信息"""
+    return await make_request("GET", "/lol-summoner/v1/summoners", token, port, params={'name': name})
+
+
+async def _resolve_bulk(token, port, kind, keys):
+    """批量解析召唤师：缓存 -> 批量接口 -> 并发单个查询（与同步版本共享批量接口可用性记录）"""
+    lookup = BulkSummonerLookup(port, kind, keys)
+    if not lookup.missing:
+        return lookup.result
+
+    request = lookup.bulk_request()
+    if request is not None:
+        method, endpoint, kwargs = request
+        if lookup.apply_bulk(*await request_with_status(method, endpoint, token, port, **kwargs)):
+            return lookup.result
+
+    lookup.apply_singles(await asyncio.gather(*(_get_summoner(token, port, kind, key) for key in lookup.missing)))
+    return lookup.result
+
+
+async def get_summoners_by_puuids(token, port, puuids):
+    """
+    批量通过 puuid 获取召唤师信息
+
+    Returns:
+        dict: {puuid: summoner_dict}，查询失败的 puuid 不在结果中
+    """
+    return await _resolve_bulk(token, port, 'puuid', puuids)
+
+
+async def get_summoners_by_ids(token, port, summoner_ids):
+    """
+    批量通过 summonerId 获取召唤师信息
+
+    Returns:
+        dict: {summonerId: summoner_dict}，查询失败的 summonerId 不在结果中
+    """
+    return await _resolve_bulk(token, port, 'id', summoner_ids)
+
+
+# ----------------------------------------------------------------------
+# 排位信息
+# ----------------------------------------------------------------------
+async def _fetch_ranked(token, port, tag, endpoint):
+    return parse_ranked_response(tag, await make_request("GET", endpoint, token, port))
+
+
+async def _race_ranked(token, port, lookup):
+    """并发请求所有候选端点，返回最先得到可用数据的 (标签, 数据)，其余请求取消"""
+    lookup.record_race()
+    tasks = {
+        asyncio.ensure_future(_fetch_ranked(token, port, tag, endpoint)): tag
+        for tag, endpoint in lookup.candidates
+    }
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    logger.debug(f"排位端点探测失败 {tasks[task]}: {task.exception()}")
+                elif task.result():
+                    return tasks[task], task.result()
+        return None, None
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def get_ranked_stats(token, port, summoner_id=None, puuid=None):
+    """
+    获取召唤师排位信息（与同步版本共享结果缓存和已探测出的排位端点，规则见 summoner.get_ranked_stats）。
+
+    没有记录可用端点时，同一端口的并发调用只有一个发起探测。
+    """
+    lookup = RankedLookup(port, summoner_id, puuid)
+    cached = lookup.cached()
+    if cached is not None:
+        return cached
+
+    tag = lookup.remembered()
+    if tag:
+        normalized = await _fetch_ranked(token, port, tag, lookup.endpoints[tag])
+        lookup.record_direct(normalized)
+        if not normalized:
+            logger.debug(f"排位端点 {tag} 未返回数据，重新探测")
+            tag, normalized = await _race_ranked(token, port, lookup)
+    else:
+        async def discover():
+            return (*await _race_ranked(token, port, lookup), lookup.owner)
+
+        tag, normalized, prober = await ranked_discovery_flight.do_async(lookup.key, discover)
+        if prober != lookup.owner:
+            # 探测结果属于另一名玩家：直接请求探测出的端点，不可用时再自行探测
+            normalized = await _fetch_ranked(token, port, tag, lookup.endpoints[tag]) if tag else None
+            if not normalized:
+                tag, normalized = await _race_ranked(token, port, lookup)
+
+    return lookup.finish(tag, normalized)
+
+
+# ----------------------------------------------------------------------
+# 战绩查询
+# ----------------------------------------------------------------------
+async def get_match_history(token, port, puuid, count=20, begin_index=0):
+    """
+    通过 PUUID 获取比赛历史记录（与同步版本共享战绩缓存和增量同步列表）
+
+    Returns:
+        dict: {'games': {'games': [...]}}（已切片），失败返回None
+    """
+    cached_data = get_cached_history_page(puuid, count, begin_index)
+    if cached_data is not None:
+        return cached_data
+
+    all_games = await history_flight.do_async((port, puuid), lambda: _fetch_all_games(token, port, puuid, count))
+    if all_games is None:
+        return None
+    return build_history_page(puuid, all_games, count, begin_index)
+
+
+async def _fetch_all_games(token, port, puuid, count):
+    """获取玩家的完整战绩列表并写入缓存：已有战绩时先增量同步，失败再分阶段全量请求"""
+    sync = HistorySync(puuid, count)
+    if sync.cached is not None:
+        return sync.cached
+
+    delta = sync.delta_request()
+    if delta is not None:
+        method, endpoint, kwargs = delta
+        merged = sync.apply_delta(await make_request(method, endpoint, token, port, **kwargs))
+        if merged is not None:
+            return merged
+
+    for idx, profile in enumerate(sync.profiles):
+        method, endpoint, kwargs = sync.full_request(profile)
+        result = await make_request(method, endpoint, token, port, **kwargs)
+        if not result:
+            # 与同步版本一致：没有响应时用更长的超时再请求一次
+            logger.warning(f"⏳ 战绩请求无响应，延长超时重试 (timeout={profile['retry_timeout']}s)...")
+            method, endpoint, kwargs = sync.full_request(profile, timeout=profile['retry_timeout'])
+            result = await make_request(method, endpoint, token, port, **kwargs)
+        if result:
+            return sync.apply_full(result, profile)
+        if idx < len(sync.profiles) - 1:
+            await asyncio.sleep(RETRY_DELAY)
+
+    logger.error(f"❌ 查询最终失败 (PUUID={puuid[:8]}...)")
+    return None
+
+
+async def get_tft_match_history(token, port, puuid, count=20):
+    """
+    通过 PUUID 获取 TFT 战绩（与同步版本共享缓存）
+
+    Returns:
+        dict: {'games': {'games': [...]}}，失败返回None
+    """
+    cached_data = get_cached_tft_history(puuid, count)
+    if cached_data is not None:
+        return cached_data
+
+    async def fetch():
+        method, endpoint, kwargs = tft_history_request(puuid, count)
+        for attempt in range(TFT_MAX_RETRIES):
+            status, data = await request_with_status(method, endpoint, token, port, **kwargs)
+            if status == 200:
+                return store_tft_history(puuid, count, data)
+            logger.warning(f"⚠️ TFT 请求失败: {status} (attempt {attempt + 1}/{TFT_MAX_RETRIES})")
+            if attempt < TFT_MAX_RETRIES - 1:
+                await asyncio.sleep(RETRY_DELAY)
+        logger.error("❌ TFT 查询最终失败")
+        return None
+
+    return await tft_history_flight.do_async((port, puuid, count), fetch)
+
+
+async def get_match_by_id(token, port, match_id):
+    """通过 match_id 获取完整对局详情（优先读取本地存档），失败返回None"""
+    archived = match_archive.get_raw(match_id)
+    if archived is not None:
+        return archived
+
+    async def fetch():
+        for endpoint in match_endpoints(match_id):
+            res = await make_request("GET", endpoint, token, port, timeout=MATCH_REQUEST_TIMEOUT)
+            if res:
+                match_archive.put_raw(match_id, res)
+                return res
+        logger.warning(f"❌ 无法通过任何已知 LCU 端点获取 match_id={match_id}")
+        return None
+
+    return await match_flight.do_async((port, str(match_id)), fetch)
+
+
+# ----------------------------------------------------------------------
+# 游戏内实时数据（2999 端口，不需要认证）
+# ----------------------------------------------------------------------
+def _get_live_session():
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        session = _live_sessions.get(loop)
+        if session is None or session.closed:
+            session = _live_sessions[loop] = aiohttp.ClientSession(
+                base_url=_sync_live.LIVE_CLIENT_BASE_URL,
+                connector=aiohttp.TCPConnector(limit=2, ssl=False),
+            )
+    return session
+
+
+async def _get_live(path, timeout, params=None):
+    """请求游戏内 API，失败（通常是未在游戏中）返回 None；回放模式下从录制中读取"""
+    replay = _sync_live.get_live_replay()
+    if replay is not None:
+        return replay.get(path, params)
+    if aiohttp is None:
+        return await asyncio.to_thread(_sync_live.request_live, path, timeout, params)
+    try:
+        async with _get_live_session().get(
+            path, params=params, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            response.raise_for_status()
+            return await response.json(loads=json_codec.loads, content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.debug(f"获取游戏内数据失败（可能游戏未开始）: {path} {e}")
+        return None
+
+
+async def get_live_game_data(timeout=5):
+    """获取当前对局的完整实时数据（/liveclientdata/allgamedata），未在游戏中返回 None"""
+    data = await _get_live("/liveclientdata/allgamedata", timeout)
+    _sync_live.record_live_frame(data)
+    return data
+
+
+async def get_live_active_player(timeout=5):
+    """获取当前玩家信息，未在游戏中返回 None"""
+    return await _get_live("/liveclientdata/activeplayer", timeout)
+
+
+async def get_live_player_list(timeout=5):
+    """获取所有玩家列表，未在游戏中返回 None"""
+    return await _get_live("/liveclientdata/playerlist", timeout)
+
+
+async def get_live_game_stats(timeout=5):
+    """获取对局元数据（模式、时间、地图），未在游戏中返回 None"""
+    return await _get_live("/liveclientdata/gamestats", timeout)
+
+
+async def get_live_events(event_id=0, timeout=5):
+    """获取 EventID >= event_id 的游戏事件，失败返回 None"""
+    data = await _get_live("/liveclientdata/eventdata", timeout, params={'eventID': event_id})
+    if isinstance(data, dict):
+        events = data.get('Events')
+        return events if isinstance(events, list) else []
+    return None
+
+
+async def get_all_players_from_game(token, port):
+    """
+    获取所有玩家并分为队友和敌人（规则与返回值见 live_game.get_all_players_from_game），
+    所有玩家的 PUUID 并发查询。游戏未开始或数据不完整时返回 None
+    """
+    game_data = await get_live_game_data()
+    if not game_data:
+        logger.debug("❌ 无法获取游戏数据（游戏可能未开始）")
+        return None
+
+    players = _sync_live.classify_live_players(game_data)
+    if players is None:
+        return None
+    infos = players['teammates'] + players['enemies']
+    puuids = await asyncio.gather(*(get_puuid(token, port, info['summonerName']) for info in infos))
+    for info, puuid in zip(infos, puuids, strict=True):
+        info['puuid'] = puuid
+    return players
+
+
+# ----------------------------------------------------------------------
+# 批量查询
+# ----------------------------------------------------------------------
+async def fetch_players(token, port, puuids, history_count=PLAYER_HISTORY_COUNT, deadline=None):
+    """
+    并发获取一组玩家的召唤师信息、段位和近期战绩
+
+    Args:
+        puuids: puuid 列表（自动去重）
+        history_count: 每名玩家的战绩数量
+        deadline: 整体截止时间（秒），到期仍未完成的项为 None（后台继续完成并写入缓存）
+
+    Returns:
+        dict: {puuid: {'summoner': dict | None, 'ranked': dict | None, 'history': dict | None}}
+    """
+    puuids = list(dict.fromkeys(p for p in puuids if p))
+    if not puuids:
+        return {}
+
+    summoners_task = asyncio.ensure_future(get_summoners_by_puuids(token, port, puuids))
+    tasks = {summoners_task: (None, 'summoner')}
+    for puuid in puuids:
+        tasks[asyncio.ensure_future(get_ranked_stats(token, port, puuid=puuid))] = (puuid, 'ranked')
+        tasks[asyncio.ensure_future(get_match_history(token, port, puuid, count=history_count))] = (puuid, 'history')
+
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    summoners = summoners_task.result() if summoners_task in done and not summoners_task.exception() else {}
+    players = {puuid: {'summoner': summoners.get(puuid), 'ranked': None, 'history': None} for puuid in puuids}
+    for task in done:
+        puuid, field = tasks[task]
+        if puuid is None:
+            continue
+        if task.exception() is not None:
+            logger.warning(f"⚠️ 获取玩家 {field} 失败: {task.exception()}")
+            continue
+        players[puuid][field] = task.result()
+    if pending:
+        logger.debug(f"⏱️ 批量查询超过截止时间，{len(pending)} 项未完成")
+    return players
+
+
+async def fetch_histories(token, port, players, count=PLAYER_HISTORY_COUNT, deadline=None):
+    """
+    并发解析一组玩家的 PUUID 并获取战绩（重复的名称 / PUUID 只查询一次）
+
+    Args:
+        players: [{'name': 名称#TAG} 或 {'puuid': ...}]
+        count: 每名玩家的战绩数量
+        deadline: 整体截止时间（秒），到期仍未完成的玩家视为超时
+
+    Returns:
+        list: 与 players 顺序一致的 {'puuid', 'history', 'error'}，
+              error 为 None / 'not_found' / 'history_failed' / 'timeout'
+    """
+    async def resolve(player):
+        puuid = player.get('puuid') or await get_puuid(token, port, player.get('name'))
+        if not puuid:
+            return {'puuid': None, 'history': None, 'error': 'not_found'}
+        history = await get_match_history(token, port, puuid, count=count)
+        return {'puuid': puuid, 'history': history, 'error': None if history else 'history_failed'}
+
+    tasks = [asyncio.ensure_future(resolve(player)) for player in players]
+    if not tasks:
+        return []
+    _, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    results = []
+    for player, task in zip(players, tasks, strict=True):
+        if task in pending:
+            results.append({'puuid': player.get('puuid'), 'history': None, 'error': 'timeout'})
+        elif task.exception() is not None:
+            logger.warning(f"⚠️ 批量获取战绩失败: {task.exception()}")
+            results.append({'puuid': player.get('puuid'), 'history': None, 'error': 'history_failed'})
+        else:
+            results.append(task.result())
+    return results
+
+
+# ----------------------------------------------------------------------
+# 同步调用入口
+# ----------------------------------------------------------------------
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop():
+    """后台事件循环（首次使用时在守护线程中启动）"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='lcu-aio-loop', daemon=True).start()
+        return _loop
+
+
+def run_sync(coro, timeout=None):
+    """
+    在后台事件循环线程中执行协程并等待结果（供同步代码调用，不可在该事件循环线程内调用）。
+
+    超过 timeout 秒时取消协程并抛出 TimeoutError。
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _background_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+def fetch_players_sync(token, port, puuids, history_count=PLAYER_HISTORY_COUNT, deadline=None):
+    """fetch_players 的同步版本，返回值相同"""
+    return run_sync(fetch_players(token, port, puuids, history_count, deadline))
+
+
+def fetch_histories_sync(token, port, players, count=PLAYER_HISTORY_COUNT, deadline=None):
+    """fetch_histories 的同步版本，返回值相同"""
+    return run_sync(fetch_histories(token, port, players, count, deadline))
+
+
+def get_aio_stats():
+    """返回异步客户端统计：backend / requests / errors / timeouts / max_in_flight / avg_latency_ms"""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    total_time = snapshot.pop('total_time')
+    snapshot['avg_latency_ms'] = (
+        round(total_time * 1000 / snapshot['requests'], 2) if snapshot['requests'] else 0.0
+    )
+    snapshot['backend'] = 'aiohttp' if aiohttp is not None else 'thread'
+    snapshot['max_concurrency'] = AIO_MAX_CONCURRENCY
+    snapshot['loop_running'] = _loop is not None and _loop.is_running()
+    return snapshot
@@ -0,0 +1,112 @@
+"""
+LCU 数据缓存
+线程安全的 LRU + TTL 缓存，get/put 均为 O(1)
+
+- 条目超过 ttl 秒视为过期，在访问时惰性删除
+- 超出 maxsize 时淘汰最久未使用的条目
+- 每个实例独立加锁，可在 Flask 请求线程与后台任务之间共享
+
+使用示例:
+    _cache = TTLCache('match_history', maxsize=100, ttl=300)
+
+    data = _cache.get(key)
+    if data is None:
+        data = fetch()
+        _cache.put(key, data)
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    线程安全的 LRU + TTL 缓存。
+
+    Args:
+        name: 缓存名称（用于统计输出）
+        maxsize: 最大条目数
+        ttl: 条目有效期（秒）
+    """
+
+    def __init__(self, name, maxsize, ttl):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # {key: (expires_at, value)}，按最近使用排序
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        _registry.append(self)
+
+    def get(self, key, default=None):
+        """读取缓存，未命中或已过期时返回 default"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._stats['misses'] += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def put(self, key, value, ttl=None):
+        """写入缓存，可为单个条目指定不同的 ttl"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def pop(self, key, default=None):
+        """删除并返回条目（不计入命中统计）"""
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and entry[0] > time.monotonic()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def stats(self):
+        """返回统计信息：size / maxsize / hits / misses / hit_ratio / evictions / expirations"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['size'] = len(self._data)
+        lookups = snapshot['hits'] + snapshot['misses']
+        snapshot['maxsize'] = self.maxsize
+        snapshot['ttl'] = self.ttl
+        snapshot['hit_ratio'] = round(snapshot['hits'] / lookups, 3) if lookups else 0.0
+        return snapshot
+
+
+# 所有缓存实例，便于统一输出统计
+_registry = []
+
+
+def get_cache_stats():
+    """
+    返回所有 LCU 缓存的统计信息。
+
+    Returns:
+        dict: {name: stats}
+    """
+    return {cache.name: cache.stats() for cache in _registry}
@@ -0,0 +1,172 @@
+"""
+选人会话状态模型
+逐次接收 /lol-champ-select/v1/session 的数据，维护索引结构并产生类型化的变化事件
+
+- 索引: 按 id / 按 actorCellId 的动作、已禁用/已选取英雄集合、本地玩家 cellId、计时器、己方队伍
+- 变化: 会话开始、计时阶段变化、动作开始、悬停英雄变化、禁用完成、英雄锁定、己方队伍变化
+
+使用方只在有相关变化时重新处理，查询均为 O(1)，不必在每次轮询中嵌套遍历整个会话。
+"""
+from typing import NamedTuple
+
+# 变化类型
+SESSION_STARTED = 'session_started'
+TIMER_PHASE_CHANGED = 'timer_phase_changed'
+ACTION_STARTED = 'action_started'
+CHAMPION_HOVERED = 'champion_hovered'
+BAN_COMPLETED = 'ban_completed'
+CHAMPION_LOCKED = 'champion_locked'
+TEAM_CHANGED = 'team_changed'
+
+
+class ChampSelectChange(NamedTuple):
+    """一次选人会话变化"""
+    kind: str
+    action_id: int | None = None
+    actor_cell_id: int | None = None
+    action_type: str | None = None
+    champion_id: int | None = None
+
+
+class ChampSelectState:
+    """
+    选人会话的增量状态（非线程安全，由单个任务持有）。
+
+    ingest(session) 返回本次相对上一份会话的变化列表；
+    新的对局（会话 id 变化）会重建状态并产生 SESSION_STARTED。
+    """
+
+    def __init__(self):
+        self.reset()
+
+    @classmethod
+    def from_session(cls, session):
+        state = cls()
+        state.ingest(session)
+        return state
+
+    def reset(self):
+        self.session = None
+        self.session_id = None
+        self.local_cell_id = None
+        self.timer = {}
+        self.my_team = []
+        self.actions_by_id = {}
+        self.actions_by_cell = {}
+        self.banned_ids = set()
+        self.picked_ids = set()
+        self.version = 0
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+    @property
+    def timer_phase(self):
+        return self.timer.get('phase')
+
+    @property
+    def unavailable_ids(self):
+        return self.banned_ids | self.picked_ids
+
+    def is_unavailable(self, champion_id):
+        return champion_id in self.banned_ids or champion_id in self.picked_ids
+
+    def action(self, action_id):
+        return self.actions_by_id.get(action_id)
+
+    def actions_for_cell(self, cell_id):
+        """指定 cellId 的所有动作（按会话中的顺序）"""
+        return [self.actions_by_id[i] for i in self.actions_by_cell.get(cell_id, ())]
+
+    def local_actions(self):
+        return self.actions_for_cell(self.local_cell_id)
+
+    def local_actions_in_progress(self):
+        """本地玩家正在进行且未完成的动作"""
+        return [a for a in self.local_actions() if a.get('isInProgress') and not a.get('completed')]
+
+    @property
+    def team_puuids(self):
+        return [m['puuid'] for m in self.my_team if m.get('puuid')]
+
+    # ------------------------------------------------------------------
+    # 增量更新
+    # ------------------------------------------------------------------
+    def ingest(self, session):
+        """
+        接收一份会话数据并更新索引
+
+        Returns:
+            list[ChampSelectChange]: 本次变化，会话无效或没有变化时为空列表
+        """
+        if not isinstance(session, dict):
+            return []
+
+        changes = []
+        session_id = session.get('id') or session.get('gameId')
+        if self.session is None or session_id != self.session_id:
+            self.reset()
+            self.session_id = session_id
+            changes.append(ChampSelectChange(SESSION_STARTED))
+
+        self.session = session
+        self.local_cell_id = session.get('localPlayerCellId')
+
+        timer = session.get('timer') if isinstance(session.get('timer'), dict) else {}
+        if timer.get('phase') != self.timer.get('phase'):
+            changes.append(ChampSelectChange(TIMER_PHASE_CHANGED))
+        self.timer = timer
+
+        my_team = [m for m in session.get('myTeam', []) if isinstance(m, dict)]
+        if [m.get('puuid') for m in my_team] != [m.get('puuid') for m in self.my_team]:
+            changes.append(ChampSelectChange(TEAM_CHANGED))
+        self.my_team = my_team
+
+        self.banned_ids = {
+            ban.get('championId')
+            for team in session.get('teams', []) if isinstance(team, dict)
+            for ban in team.get('bans', []) if isinstance(ban, dict) and ban.get('championId')
+        }
+
+        previous = self.actions_by_id
+        self.actions_by_id = {}
+        self.actions_by_cell = {}
+        self.picked_ids = set()
+        for group in session.get('actions', []):
+            if not isinstance(group, list):
+                continue
+            for action in group:
+                if not isinstance(action, dict):
+                    continue
+                action_id = action.get('id')
+                self.actions_by_id[action_id] = action
+                self.actions_by_cell.setdefault(action.get('actorCellId'), []).append(action_id)
+                if action.get('completed') and action.get('championId'):
+                    self.picked_ids.add(action['championId'])
+                changes.extend(_action_changes(previous.get(action_id), action))
+
+        if changes:
+            self.version += 1
+        return changes
+
+
+def _action_changes(old, new):
+    """比较同一动作的前后两份数据"""
+    def change(kind):
+        return ChampSelectChange(
+            kind,
+            action_id=new.get('id'),
+            actor_cell_id=new.get('actorCellId'),
+            action_type=str(new.get('type') or '').lower(),
+            champion_id=new.get('championId') or None,
+        )
+
+    old = old or {}
+    changes = []
+    if new.get('isInProgress') and not old.get('isInProgress') and not new.get('completed'):
+        changes.append(change(ACTION_STARTED))
+    if new.get('completed') and not old.get('completed'):
+        changes.append(change(BAN_COMPLETED if str(new.get('type') or '').lower() == 'ban' else CHAMPION_LOCKED))
+    elif not new.get('completed') and new.get('championId') and new.get('championId') != old.get('championId'):
+        changes.append(change(CHAMPION_HOVERED))
+    return changes
@@ -1,46 +1,191 @@
 """
 LCU HTTP 客户端模块
 提供统一的 LCU API 请求封装
+
+所有 LCU 请求共享一个按 (port, token) 划分的 keep-alive 连接池，
+避免每次调用都重新建立 TCP 连接和 TLS 握手。
 """
-import json
+import threading
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 import urllib3
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
+from config import LCU_POOL_SIZE
+from utils import json_codec
 from utils.logger import logger
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 
+# 连接复用统计（跨会话累计，会话重建时不清零）
+_stats_lock = threading.Lock()
+_stats = {
+    'requests': 0,
+    'errors': 0,
+    'new_connections': 0,
+    'connection_checkouts': 0,
+    'session_rebuilds': 0,
+    'total_time': 0.0,
+}
+
+
+def _incr_stat(name, value=1):
+    with _stats_lock:
+        _stats[name] += value
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    """记录连接取用次数和新建连接次数的 HTTPS 连接池"""
+
+    def _get_conn(self, timeout=None):
+        _incr_stat('connection_checkouts')
+        return super()._get_conn(timeout=timeout)
+
+    def _new_conn(self):
+        _incr_stat('new_connections')
+        return super()._new_conn()
+
+
+class _LcuHTTPAdapter(HTTPAdapter):
+    """使用计数连接池的 HTTPAdapter"""
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': HTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+
+# 共享会话：{(port, token): Session}，同一时间只保留当前凭证对应的会话
+_session_lock = threading.Lock()
+_session = None
+_session_key = None
+
+
+def _build_session(token, pool_size):
+    session = requests.Session()
+    # LCU 认证要求使用 HTTPBasicAuth，用户名是 'riot'
+    session.auth = HTTPBasicAuth('riot', token)
+    session.verify = False  # 忽略SSL证书错误
+    adapter = _LcuHTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(token, port):
+    """
+    获取当前 (port, token) 对应的共享 keep-alive 会话。
+
+    凭证变化（客户端重启、重新检测）时会关闭旧会话并重建连接池。
+
+    Args:
+        token: 认证令牌
+        port: LCU端口
+
+    Returns:
+        requests.Session: 线程共享的会话对象
+    """
+    global _session, _session_key
+    key = (port, token)
+    with _session_lock:
+        if _session is None or _session_key != key:
+            old_session = _session
+            _session = _build_session(token, LCU_POOL_SIZE)
+            _session_key = key
+            if old_session is not None:
+                _incr_stat('session_rebuilds')
+                logger.debug(f"🔁 LCU 凭证变化，重建连接池 (port={port})")
+                try:
+                    old_session.close()
+                except Exception:
+                    pass
+        return _session
+
+
+def reset_session():
+    """关闭并丢弃当前共享会话（凭证失效或被清空时调用）"""
+    global _session, _session_key
+    with _session_lock:
+        old_session = _session
+        _session = None
+        _session_key = None
+    if old_session is not None:
+        try:
+            old_session.close()
+        except Exception:
+            pass
+
+
+def get_session_stats():
+    """
+    返回连接池统计信息，用于确认连接复用是否生效。
+
+    Returns:
+        dict: requests / new_connections / reused_connections / avg_latency_ms 等
+    """
+    with _stats_lock:
+        snapshot = dict(_stats)
+    with _session_lock:
+        active_port = _session_key[0] if _session_key else None
+
+    checkouts = snapshot.pop('connection_checkouts')
+    total_time = snapshot.pop('total_time')
+    reused = max(checkouts - snapshot['new_connections'], 0)
+    snapshot['reused_connections'] = reused
+    snapshot['reuse_ratio'] = round(reused / checkouts, 3) if checkouts else 0.0
+    snapshot['avg_latency_ms'] = (
+        round(total_time * 1000 / snapshot['requests'], 2) if snapshot['requests'] else 0.0
+    )
+    snapshot['pool_size'] = LCU_POOL_SIZE
+    snapshot['active_port'] = active_port
+    return snapshot
+
+
 def make_request(method, endpoint, token, port, **kwargs):
     """
     统一的 LCU API 请求封装，处理认证和 SSL 验证。
-    
+
     Args:
         method: HTTP方法 ('GET', 'POST', 'PUT', 'DELETE' 等)
         endpoint: API端点路径（如 '/lol-summoner/v1/current-summoner'）
         token: 认证令牌
         port: LCU端口
         **kwargs: 其他请求参数（可包含自定义timeout、params、json等）
-    
+
     Returns:
         dict: 响应JSON数据，失败返回None
-    
+
     Examples:
         >>> make_request('GET', '/lol-gameflow/v1/gameflow-phase', token, port)
         >>> make_request('POST', '/lol-matchmaking/v1/ready-check/accept', token, port)
         >>> make_request('GET', '/lol-summoner/v1/summoners', token, port, params={'name': 'Faker'})
     """
+    return request_with_status(method, endpoint, token, port, **kwargs)[1]
+
+
+def request_with_status(method, endpoint, token, port, **kwargs):
+    """
+    与 make_request 相同，同时返回 HTTP 状态码。
+
+    用于需要区分"端点不存在"（404 等）与"请求失败"（超时、连接错误）的调用方。
+
+    Returns:
+        tuple: (status, data)，status 为 None 表示没有收到响应
+    """
     url = f"https://127.0.0.1:{port}{endpoint}"
-    # LCU 认证要求使用 HTTPBasicAuth，用户名是 'riot'
-    auth = HTTPBasicAuth('riot', token) 
-    
+    session = get_session(token, port)
+
     # 🔇 减少日志噪音：仅在详细模式下打印（通过环境变量控制）
     # logger.debug(f"--- LCU Request: {method} {endpoint} ---")
-    
+
     # 处理 JSON 数据：将 json 参数转换为 data + Content-Type
     if 'json' in kwargs:
-        kwargs['data'] = json.dumps(kwargs.pop('json'))
+        kwargs['data'] = json_codec.dumps_bytes(kwargs.pop('json'))
         kwargs['headers'] = kwargs.get('headers', {})
         kwargs['headers']['Content-Type'] = 'application/json'
 
@@ -49,41 +194,50 @@ def make_request(method, endpoint, token, port, **kwargs):
     if 'timeout' not in kwargs:
         kwargs['timeout'] = 5
 
+    started = time.perf_counter()
+    response = None
     try:
-        response = requests.request(
-            method,
-            url,
-            auth=auth,
-            verify=False,  # 忽略SSL证书错误
-            **kwargs
-        )
-        
+        response = session.request(method, url, **kwargs)
+
         # 抛出 HTTPError 异常，处理 4xx/5xx 状态码
-        response.raise_for_status() 
+        response.raise_for_status()
 
         if response.status_code == 204:  # No Content
-            return None
-        
-        return response.json()
-        
+            return response.status_code, None
+
+        return response.status_code, json_codec.loads(response.content)
+
     except requests.exceptions.HTTPError as e:
+        _incr_stat('errors')
         # 🔇 静默处理404错误（端点尝试时很常见），只记录其他错误
         if e.response.status_code != 404:
             # Print full URL to help diagnose path/encoding issues
             logger.warning(f"⚠️ LCU API 错误 ({method} {endpoint}) -> URL: {url} : {e.response.status_code} {e.response.reason}")
-            
+
             # 打印 403 错误的详细信息
             if e.response.status_code == 403:
                 logger.warning("!!! 权限拒绝 (403 Forbidden) !!! 可能原因: LCU 客户端限制或当前游戏状态不允许查询。")
-        
-        return None
-        
+
+        return e.response.status_code, None
+
+    except ValueError as e:
+        _incr_stat('errors')
+        logger.warning(f"⚠️ LCU API 响应不是有效的 JSON ({method} {endpoint}) : {e}")
+        return (response.status_code if response is not None else None), None
+
     except requests.exceptions.RequestException as e:
+        _incr_stat('errors')
         # 🔇 忽略连接拒绝错误（通常是因为客户端未启动或正在重启），避免刷屏
         error_str = str(e)
         if "WinError 10061" in error_str or "Connection refused" in error_str:
-            return None
+            return None, None
 
         # 处理其他请求异常（如连接超时、DNS 错误）
         logger.warning(f"⚠️ LCU API 请求异常 ({method} {endpoint}) -> URL: {url} : {e}")
-        return None
+        return None, None
+
+    finally:
+        elapsed = time.perf_counter() - started
+        with _stats_lock:
+            _stats['requests'] += 1
+            _stats['total_time'] += elapsed
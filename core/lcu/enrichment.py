@@ -1,9 +1,64 @@
 """
 数据增强模块
 为游戏数据填充缺失的召唤师信息
+
+参与者先通过批量接口按 puuid / summonerId 一次性解析；仍未解析的参与者
+按名称查询，通过共享线程池并发执行，整体受 ENRICH_DEADLINE 限制，
+超时未返回的参与者按查询失败处理（回退到 participantIdentities）。
+有查询超时或失败时补全函数返回 False，调用方不应持久化这份补全结果。
 """
-from .summoner import get_summoner_by_puuid, get_summoner_by_id, get_summoner_by_name
-from constants import get_augment_icon_url, get_augment_info
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .summoner import (
+    get_summoner_by_name,
+    get_summoners_by_puuids,
+    get_summoners_by_ids,
+)
+from constants import get_augment_index
+from utils.logger import logger
+
+# 并发查询的最大线程数（需小于 LCU 连接池大小，给其他请求留出连接）
+ENRICH_MAX_WORKERS = 8
+# 单次补全等待查询结果的最长时间（秒）
+ENRICH_DEADLINE = 6.0
+
+_enrich_pool = ThreadPoolExecutor(max_workers=ENRICH_MAX_WORKERS, thread_name_prefix='lcu-enrich')
+
+
+def _lookup_all(participants, lookup, deadline=None):
+    """
+    并发执行每个参与者的查询，按参与者顺序返回结果列表。
+
+    Args:
+        participants: 参与者列表
+        lookup: 查询函数 lookup(participant) -> dict | None
+        deadline: 最长等待时间（秒），默认 ENRICH_DEADLINE
+
+    Returns:
+        tuple: (results, complete)，results 与 participants 一一对应，失败或超时为 None；
+               有查询超时或抛出异常时 complete 为 False
+    """
+    if not participants:
+        return [], True
+    futures = [_enrich_pool.submit(lookup, p) for p in participants]
+    _, not_done = wait(futures, timeout=ENRICH_DEADLINE if deadline is None else deadline)
+    if not_done:
+        logger.warning(f"⏱️ {len(not_done)}/{len(futures)} 个参与者查询超时，使用备用数据")
+
+    results = []
+    complete = not not_done
+    for future in futures:
+        if future in not_done:
+            future.cancel()
+            results.append(None)
+            continue
+        try:
+            results.append(future.result())
+        except Exception as e:
+            logger.warning(f"⚠️ 参与者查询失败: {e}")
+            complete = False
+            results.append(None)
+    return results, complete
 
 
 def enrich_game_with_summoner_info(token, port, game):
@@ -22,7 +77,7 @@ def enrich_game_with_summoner_info(token, port, game):
         game: 游戏数据对象（dict）
     
     Returns:
-        dict: 增强后的游戏数据（就地修改并返回）
+        bool: 是否完整补全（有参与者查询超时或失败时为 False）
     
     Notes:
         - 此函数会就地修改传入的 game 对象
@@ -30,7 +85,7 @@ def enrich_game_with_summoner_info(token, port, game):
         - 如果所有方法都失败，会尝试从 participantIdentities 中提取
     """
     if not game or not isinstance(game, dict):
-        return game
+        return True
 
     participants = game.get('participants') or []
     
@@ -42,41 +97,47 @@ def enrich_game_with_summoner_info(token, port, game):
         if pid is not None:
             idents[pid] = player
     
-    # 遍历每个参与者，填充缺失信息
+    # Ensure summonerName exists if riotId fields are present
     for p in participants:
-        try:
-            # 如果已有可读的 summonerName，跳过
-            # Ensure summonerName exists if riotId fields are present
-            if not p.get('summonerName'):
-                # prefer Riot game name + tagline if available
-                game_name = p.get('riotIdGameName') or p.get('riotId') or None
-                tag_line = p.get('riotIdTagline') or p.get('riotTagLine') or ''
-                if game_name:
-                    p['summonerName'] = f"{game_name}#{tag_line}" if tag_line else game_name
+        if not p.get('summonerName'):
+            # prefer Riot game name + tagline if available
+            game_name = p.get('riotIdGameName') or p.get('riotId') or None
+            tag_line = p.get('riotIdTagline') or p.get('riotTagLine') or ''
+            if game_name:
+                p['summonerName'] = f"{game_name}#{tag_line}" if tag_line else game_name
 
-            if p.get('summonerName'):
-                # already have a readable name — but we may still try to fill profileIcon below
-                pass
+    # 先批量解析所有 puuid / summonerId（通常 1-2 个请求），结果进入召唤师缓存
+    puuids = [p.get('puuid') or (p.get('player') or {}).get('puuid') for p in participants]
+    by_puuid = get_summoners_by_puuids(token, port, puuids)
+    summoner_ids = [
+        p.get('summonerId') or (p.get('player') or {}).get('summonerId')
+        for p, puuid in zip(participants, puuids, strict=True) if puuid not in by_puuid
+    ]
+    by_id = get_summoners_by_ids(token, port, summoner_ids) if any(summoner_ids) else {}
 
-            info = None
-            
-            # 方法1: 尝试通过 puuid 查询
-            puuid = p.get('puuid') or (p.get('player') or {}).get('puuid')
-            if puuid:
-                info = get_summoner_by_puuid(token, port, puuid)
+    def lookup(p):
+        # 方法1: 通过 puuid 查询（批量结果）
+        puuid = p.get('puuid') or (p.get('player') or {}).get('puuid')
+        info = by_puuid.get(puuid)
+
+        # 方法2: 通过 summonerId 查询（批量结果）
+        if not info:
+            sid = p.get('summonerId') or (p.get('player') or {}).get('summonerId')
+            info = by_id.get(sid)
 
-            # 方法2: 尝试通过 summonerId 查询
-            if not info:
-                sid = p.get('summonerId') or (p.get('player') or {}).get('summonerId')
-                if sid:
-                    info = get_summoner_by_id(token, port, sid)
+        # 方法3: 尝试通过 name 查询
+        if not info:
+            name = p.get('summonerName') or (p.get('player') or {}).get('summonerName')
+            if name:
+                info = get_summoner_by_name(token, port, name)
+        return info
 
-            # 方法3: 尝试通过 name 查询
-            if not info:
-                name = p.get('summonerName') or (p.get('player') or {}).get('summonerName')
-                if name:
-                    info = get_summoner_by_name(token, port, name)
+    # 并发查询，再按参与者顺序写回
+    infos, complete = _lookup_all(participants, lookup)
 
+    # 遍历每个参与者，填充缺失信息
+    for p, info in zip(participants, infos, strict=True):
+        try:
             # 如果查询成功，填充数据
             if info and isinstance(info, dict):
                 # 标准化可能的字段名
@@ -116,7 +177,7 @@ def enrich_game_with_summoner_info(token, port, game):
             print(f"enrich参与者信息失败: {e}")
             continue
 
-    return game
+    return complete
 
 
 def enrich_tft_game_with_summoner_info(token, port, game):
@@ -131,35 +192,38 @@ def enrich_tft_game_with_summoner_info(token, port, game):
         game: TFT 游戏数据对象（dict）
     
     Returns:
-        dict: 增强后的游戏数据（就地修改并返回）
+        bool: 是否完整补全（有参与者的 puuid 未能解析时为 False）
     """
     if not game or not isinstance(game, dict):
-        return game
+        return True
     
     # TFT 参与者在 json.participants 中
     game_json = game.get('json', game)
     if not isinstance(game_json, dict):
-        return game
+        return True
     
     participants = game_json.get('participants') or []
     
-    # 遍历每个参与者，填充缺失信息
+    # 如果没有 summonerName，先尝试从 riotId 字段构造一个可读名称
     for p in participants:
-        try:
-            # 如果没有 summonerName，先尝试从 riotId 字段构造一个可读名称
-            if not p.get('summonerName'):
-                rn = p.get('riotIdGameName') or p.get('riotId') or None
-                rt = p.get('riotIdTagline') or p.get('riotTagLine') or ''
-                if rn:
-                    p['summonerName'] = f"{rn}#{rt}" if rt else rn
+        if not p.get('summonerName'):
+            rn = p.get('riotIdGameName') or p.get('riotId') or None
+            rt = p.get('riotIdTagline') or p.get('riotTagLine') or ''
+            if rn:
+                p['summonerName'] = f"{rn}#{rt}" if rt else rn
 
-            info = None
-
-            # 方法1: 尝试通过 puuid 查询以获取更完整的召唤师信息（头像等）
-            puuid = p.get('puuid') or (p.get('player') or {}).get('puuid')
-            if puuid:
-                info = get_summoner_by_puuid(token, port, puuid)
+    # 批量通过 puuid 查询以获取更完整的召唤师信息（头像等）
+    by_puuid = get_summoners_by_puuids(
+        token, port, [p.get('puuid') or (p.get('player') or {}).get('puuid') for p in participants]
+    )
+    puuids = [p.get('puuid') or (p.get('player') or {}).get('puuid') for p in participants]
+    infos = [by_puuid.get(puuid) for puuid in puuids]
+    # TFT 参与者都是真实玩家，解析不到说明查询失败
+    complete = all(info is not None for puuid, info in zip(puuids, infos, strict=True) if puuid)
 
+    # 遍历每个参与者，填充缺失信息
+    for p, info in zip(participants, infos, strict=True):
+        try:
             # 如果查询成功，填充数据（包括头像）
             if info and isinstance(info, dict):
                 # 标准化可能的字段名
@@ -185,7 +249,7 @@ def enrich_tft_game_with_summoner_info(token, port, game):
             print(f"[TFT] enrich参与者信息失败: {e}")
             continue
 
-    return game
+    return complete
 
 
 def enrich_game_with_augments(game):
@@ -216,6 +280,7 @@ def enrich_game_with_augments(game):
         return game
     
     participants = game.get('participants') or []
+    augment_index = get_augment_index()
     
     for p in participants:
         try:
@@ -236,28 +301,14 @@ def enrich_game_with_augments(game):
                     # KIWI模式的ID已经包含+1000偏移
                     mapped_id = augment_id + 1000 if game_mode == 'CHERRY' else augment_id
                     
-                    # 图标URL
-                    icon_url = get_augment_icon_url(mapped_id)
-                    stats[icon_key] = icon_url
-                    
-                    # 中文名称和描述：从全表中根据 mapped_id 查找具体 augment 的信息
-                    aug_info_map = get_augment_info()
-                    # 可能的返回值是以 id 为键的字典，尝试用 int 或 str key 获取具体项
-                    aug = {}
-                    if isinstance(aug_info_map, dict):
-                        # 安全地根据 mapped_id 查找项，兼容 int 或 str 类型的字典键
-                        for k, v in aug_info_map.items():
-                            try:
-                                if k == mapped_id or str(k) == str(mapped_id):
-                                    aug = v or {}
-                                    break
-                            except Exception:
-                                continue
-
-                    if aug and isinstance(aug, dict):
-                        stats[name_key] = aug.get('name', '') or aug.get('title', '')
-                        stats[desc_key] = aug.get('desc', '') or aug.get('description', '')
+                    # 图标URL 和中文名称/描述：索引中一次查找
+                    record = augment_index.get(mapped_id)
+                    if record is not None:
+                        stats[icon_key] = record.icon_url
+                        stats[name_key] = record.name
+                        stats[desc_key] = record.desc
                     else:
+                        stats[icon_key] = None
                         stats[name_key] = None
                         stats[desc_key] = None
                 else:
@@ -0,0 +1,323 @@
+"""
+LCU WebSocket 事件总线
+通过 LCU 根端点的 WAMP 订阅接收 OnJsonApiEvent 推送，替代定时轮询
+
+LCU 在 wss://127.0.0.1:{port}/ 上提供 WAMP 1.0 风格的事件通道:
+- 订阅:   [5, "OnJsonApiEvent_lol-gameflow_v1_gameflow-phase"]
+- 推送:   [8, "OnJsonApiEvent_...", {"uri": "...", "eventType": "Update", "data": ...}]
+
+使用示例:
+    from core.lcu import events
+
+    events.ensure_event_bus(token, port)
+    with events.event_bus.listen([events.READY_CHECK_URI]) as sub:
+        event = sub.get(timeout=5)
+
+测试时可以把 url 指向本地的替身 WebSocket 服务器（见 runs/lcu_ws_standin.py）:
+    events.event_bus.start(token, port, url='ws://127.0.0.1:8765/')
+"""
+import base64
+import queue
+import ssl
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from simple_websocket import Client, ConnectionClosed, ConnectionError as WSConnectionError
+
+from utils import json_codec
+from utils.logger import logger
+
+# 常用事件 URI
+GAMEFLOW_PHASE_URI = '/lol-gameflow/v1/gameflow-phase'
+READY_CHECK_URI = '/lol-matchmaking/v1/ready-check'
+CHAMP_SELECT_SESSION_URI = '/lol-champ-select/v1/session'
+
+DEFAULT_URIS = (GAMEFLOW_PHASE_URI, READY_CHECK_URI, CHAMP_SELECT_SESSION_URI)
+
+# WAMP 1.0 消息类型
+_WAMP_SUBSCRIBE = 5
+_WAMP_EVENT = 8
+
+# 断线重连间隔（秒），逐次翻倍直至上限
+_RECONNECT_DELAY = 1.0
+_MAX_RECONNECT_DELAY = 10.0
+
+
+def topic_for_uri(uri):
+    """把 API 路径转换为 WAMP 订阅主题，例如 /lol-gameflow/v1/gameflow-phase -> OnJsonApiEvent_lol-gameflow_v1_gameflow-phase"""
+    return 'OnJsonApiEvent' + uri.replace('/', '_')
+
+
+@dataclass(frozen=True)
+class LcuEvent:
+    """一条 LCU 推送事件"""
+    uri: str
+    event_type: str  # 'Create' | 'Update' | 'Delete'
+    data: Any
+    received_at: float = field(default_factory=time.time)
+
+
+def parse_event_message(raw):
+    """
+    解析一条 WAMP 推送消息。
+
+    Args:
+        raw: WebSocket 收到的原始文本
+
+    Returns:
+        LcuEvent: 解析成功返回事件对象，心跳/非事件消息返回 None
+    """
+    if not raw:
+        return None
+    try:
+        message = json_codec.loads(raw)
+    except (TypeError, ValueError):
+        return None
+
+    if not isinstance(message, list) or len(message) < 3 or message[0] != _WAMP_EVENT:
+        return None
+
+    payload = message[2]
+    if not isinstance(payload, dict) or not payload.get('uri'):
+        return None
+
+    return LcuEvent(
+        uri=payload['uri'],
+        event_type=payload.get('eventType', 'Update'),
+        data=payload.get('data'),
+    )
+
+
+class Subscription:
+    """
+    把总线推送转为可阻塞读取的队列，方便后台任务在循环中"等待下一次推送"。
+
+    支持上下文管理器，退出时自动取消订阅。
+    """
+
+    def __init__(self, bus, uris):
+        self._bus = bus
+        self._uris = list(uris)
+        self._queue = queue.Queue()
+        for uri in self._uris:
+            bus.subscribe(uri, self._queue.put)
+
+    def get(self, timeout=None):
+        """等待下一条事件，超时返回 None"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        for uri in self._uris:
+            self._bus.unsubscribe(uri, self._queue.put)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class LcuEventBus:
+    """
+    LCU WebSocket 订阅者，在后台线程中维持连接并把事件分发给订阅者。
+
+    - subscribe(uri, callback): 注册回调，callback(LcuEvent) 在总线线程中调用
+    - start(token, port): 启动/按新凭证重启连接
+    - connected: 当前是否已连接，未连接时调用方应回退到轮询
+    """
+
+    def __init__(self, uris=DEFAULT_URIS):
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._subscribers: dict[str, list[Callable[[LcuEvent], None]]] = {}
+        self._uris = set(uris)
+        self._key = None
+        self._token = None
+        self._url = None
+        self._ssl_context = None
+        self._ws = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._connected = threading.Event()
+        self.events_received = 0
+
+    @property
+    def connected(self):
+        return self._connected.is_set()
+
+    def subscribe(self, uri, callback):
+        """注册事件回调；若已连接且该 URI 尚未订阅，会立即发送订阅消息"""
+        with self._lock:
+            self._subscribers.setdefault(uri, []).append(callback)
+            is_new_uri = uri not in self._uris
+            self._uris.add(uri)
+        if is_new_uri and self.connected:
+            self._send_subscribe(uri)
+
+    def unsubscribe(self, uri, callback):
+        with self._lock:
+            callbacks = self._subscribers.get(uri)
+            if callbacks and callback in callbacks:
+                callbacks.remove(callback)
+
+    def listen(self, uris):
+        """创建一个队列式订阅（见 Subscription）"""
+        return Subscription(self, uris)
+
+    def start(self, token, port, url=None, ssl_context=None):
+        """
+        启动总线。同一 (port, token) 重复调用不会重连；凭证变化时重启。
+
+        Args:
+            token: LCU认证令牌
+            port: LCU端口
+            url: 可选，覆盖默认的 wss://127.0.0.1:{port}/（用于本地替身服务器）
+            ssl_context: 可选，自定义 SSL 上下文
+        """
+        key = (port, token)
+        with self._lock:
+            running = self._thread is not None and self._thread.is_alive()
+            if running and self._key == key and (url is None or url == self._url):
+                return
+        self.stop()
+
+        with self._lock:
+            self._key = key
+            self._token = token
+            self._url = url or f"wss://127.0.0.1:{port}/"
+            self._ssl_context = ssl_context
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(self._stop_event,),
+                name='lcu-event-bus',
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """停止总线并断开连接"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+            self._key = None
+            self._stop_event.set()
+            ws = self._ws
+        self._close_ws(ws)
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=2)
+        self._connected.clear()
+
+    def wait_connected(self, timeout=None):
+        """等待连接建立，返回是否已连接"""
+        return self._connected.wait(timeout)
+
+    def _default_ssl_context(self):
+        # LCU 使用自签名证书
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
+
+    def _connect(self):
+        auth = base64.b64encode(f"riot:{self._token}".encode('ascii')).decode('ascii')
+        ssl_context = None
+        if self._url.startswith('wss://'):
+            ssl_context = self._ssl_context or self._default_ssl_context()
+        return Client.connect(
+            self._url,
+            subprotocols=['wamp'],
+            headers={'Authorization': f'Basic {auth}'},
+            ssl_context=ssl_context,
+        )
+
+    def _send_subscribe(self, uri):
+        ws = self._ws
+        if ws is None:
+            return
+        try:
+            with self._send_lock:
+                ws.send(json_codec.dumps([_WAMP_SUBSCRIBE, topic_for_uri(uri)]))
+        except Exception as e:
+            logger.debug(f"LCU 事件订阅发送失败 ({uri}): {e}")
+
+    @staticmethod
+    def _close_ws(ws):
+        if ws is None:
+            return
+        try:
+            ws.close()
+        except Exception:
+            pass
+
+    def _run(self, stop_event):
+        delay = _RECONNECT_DELAY
+        while not stop_event.is_set():
+            try:
+                ws = self._connect()
+            except (WSConnectionError, OSError) as e:
+                logger.debug(f"LCU 事件通道连接失败，{delay:.0f}秒后重试: {e}")
+                stop_event.wait(delay)
+                delay = min(delay * 2, _MAX_RECONNECT_DELAY)
+                continue
+
+            with self._lock:
+                if stop_event.is_set():
+                    self._close_ws(ws)
+                    break
+                self._ws = ws
+                uris = list(self._uris)
+
+            for uri in uris:
+                self._send_subscribe(uri)
+            self._connected.set()
+            delay = _RECONNECT_DELAY
+            logger.info(f"🔌 LCU 事件通道已连接，订阅 {len(uris)} 个端点")
+
+            try:
+                while not stop_event.is_set():
+                    raw = ws.receive(timeout=1)
+                    if raw is None:
+                        continue
+                    event = parse_event_message(raw)
+                    if event is not None:
+                        self._dispatch(event)
+            except ConnectionClosed:
+                if not stop_event.is_set():
+                    logger.warning("⚠️ LCU 事件通道已断开，准备重连")
+            except Exception as e:
+                logger.warning(f"⚠️ LCU 事件通道异常: {e}")
+            finally:
+                self._connected.clear()
+                with self._lock:
+                    if self._ws is ws:
+                        self._ws = None
+                self._close_ws(ws)
+
+            stop_event.wait(delay)
+
+    def _dispatch(self, event):
+        self.events_received += 1
+        with self._lock:
+            callbacks = list(self._subscribers.get(event.uri, ()))
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"❌ LCU 事件回调异常 ({event.uri}): {e}")
+
+
+# 全局事件总线实例
+event_bus = LcuEventBus()
+
+
+def ensure_event_bus(token, port):
+    """按当前凭证确保事件总线在运行（重复调用开销很小）"""
+    if token and port:
+        event_bus.start(token, port)
@@ -6,17 +6,89 @@
 import requests
 import urllib3
 
+from utils import json_codec
 from utils.game_data_formatter import format_game_data
 from utils.logger import logger
+from .live_recording import LiveRecorder, LiveReplay
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+LIVE_CLIENT_BASE_URL = "https://127.0.0.1:2999"
 
-def get_live_game_data():
+# 游戏内 API 的 keep-alive 会话（与 LCU 会话分开，不需要认证）
+_live_session = requests.Session()
+_live_session.verify = False
+
+# 可选的录制器 / 回放源（见 live_recording.py），默认都不启用
+_recorder = None
+_replay = None
+
+
+def start_live_recording(path):
+    """开始把游戏内数据追加录制到 path（已在录制时先结束旧的录制）"""
+    global _recorder
+    stop_live_recording()
+    _recorder = LiveRecorder(path)
+    logger.info(f"⏺️ 开始录制实时对局数据: {path}")
+
+
+def stop_live_recording():
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.close()
+        logger.info(f"⏹️ 实时对局录制已结束: {recorder.path}")
+
+
+def start_live_replay(path, speed=1.0, loop=False):
+    """
+    从录制文件回放游戏内数据，替代端口 2999 的游戏内 API
+
+    Args:
+        path: 录制文件路径
+        speed: 回放速度倍数（2.0 表示两倍速）
+        loop: 回放结束后是否从头循环
+    """
+    global _replay
+    stop_live_replay()
+    _replay = LiveReplay(path, speed=speed, loop=loop)
+    logger.info(f"▶️ 回放实时对局录制: {path}（{_replay.recording.duration:.0f} 秒，{_replay.speed}x）")
+
+
+def stop_live_replay():
+    global _replay
+    replay, _replay = _replay, None
+    if replay is not None:
+        replay.close()
+
+
+def record_live_frame(frame):
+    """把一份 allgamedata 结构的数据写入录制（未录制或正在回放时忽略）"""
+    recorder = _recorder
+    if recorder is None or _replay is not None or not frame:
+        return
+    try:
+        recorder.record(frame)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"⚠️ 写入实时对局录制失败: {e}")
+
+
+def get_live_recording_stats():
+    recorder, replay = _recorder, _replay
+    return {
+        'recording': recorder.stats() if recorder is not None else None,
+        'replay': replay.stats() if replay is not None else None,
+    }
+
+
+def get_live_game_data(timeout=5):
     """
     通过游戏客户端本地API获取当前对局的实时数据（端口2999）。
     
     此API仅在游戏进行中可用，不需要认证。
+
+    Args:
+        timeout: 请求超时（秒）
     
     Returns:
         dict: 包含所有玩家信息的完整游戏数据
@@ -30,16 +102,66 @@ def get_live_game_data():
         'gameData': {...}       # 游戏元数据
     }
     """
+    data = request_live("/liveclientdata/allgamedata", timeout)
+    record_live_frame(data)
+    return data
+
+
+def get_live_replay():
+    """当前的回放源（未在回放时返回 None）"""
+    return _replay
+
+
+def request_live(path, timeout=5, params=None):
+    """请求游戏内 API，失败（通常是未在游戏中）返回 None；回放模式下从录制中读取"""
+    replay = _replay
+    if replay is not None:
+        return replay.get(path, params)
     try:
-        url = "https://127.0.0.1:2999/liveclientdata/allgamedata"
-        response = requests.get(url, verify=False, timeout=5)
+        response = _live_session.get(f"{LIVE_CLIENT_BASE_URL}{path}", params=params, timeout=timeout)
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        logger.debug(f"获取游戏内数据失败（可能游戏未开始）: {e}")
+        return json_codec.loads(response.content)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.debug(f"获取游戏内数据失败（可能游戏未开始）: {path} {e}")
         return None
 
 
+def get_live_active_player(timeout=5):
+    """获取当前玩家信息（/liveclientdata/activeplayer），未在游戏中返回 None"""
+    return request_live("/liveclientdata/activeplayer", timeout)
+
+
+def get_live_player_list(timeout=5):
+    """获取所有玩家列表（/liveclientdata/playerlist），未在游戏中返回 None"""
+    return request_live("/liveclientdata/playerlist", timeout)
+
+
+def get_live_game_stats(timeout=5):
+    """获取对局元数据（/liveclientdata/gamestats：模式、时间、地图），未在游戏中返回 None"""
+    return request_live("/liveclientdata/gamestats", timeout)
+
+
+def get_live_events(event_id=0, timeout=5):
+    """
+    获取 EventID >= event_id 的游戏事件（/liveclientdata/eventdata?eventID=）。
+
+    用于增量拉取：记住已处理的最大 EventID，下次只请求之后的事件，
+    避免每次都传输和遍历整局的事件列表。
+
+    Args:
+        event_id: 起始事件ID（包含）
+        timeout: 请求超时（秒）
+
+    Returns:
+        list: 事件列表，失败返回 None
+    """
+    data = request_live("/liveclientdata/eventdata", timeout, params={'eventID': event_id})
+    if isinstance(data, dict):
+        events = data.get('Events')
+        return events if isinstance(events, list) else []
+    return None
+
+
 def get_enemy_players_from_game():
     """
     从游戏内API获取敌方队伍的所有玩家信息。
@@ -150,7 +272,24 @@ def get_all_players_from_game(token, port):
     if not game_data:
         logger.debug("❌ 无法获取游戏数据（游戏可能未开始）")
         return None
-    
+
+    players = classify_live_players(game_data)
+    if players is None:
+        return None
+    for info in players['teammates'] + players['enemies']:
+        info['puuid'] = get_puuid(token, port, info['summonerName'])
+    return players
+
+
+def classify_live_players(game_data):
+    """
+    把 allgamedata 中的玩家分为队友和敌人（规则见 get_all_players_from_game）。
+
+    不查询 LCU：返回的玩家信息中 puuid 为 None，由调用方按 summonerName 补充。
+
+    Returns:
+        dict: {'teammates': [...], 'enemies': [...]}，数据不完整时返回 None
+    """
     try:
         all_players = game_data.get('allPlayers', [])
         active_player = game_data.get('activePlayer', {})
@@ -238,7 +377,6 @@ def get_all_players_from_game(token, port):
                 game_name = summoner_name
                 tag_line = 'NA'
 
-            puuid = get_puuid(token, port, summoner_name)
             champion = (
                 entry.get('champion')
                 or entry.get('championName')
@@ -252,7 +390,7 @@ def get_all_players_from_game(token, port):
                 'summonerName': summoner_name,
                 'gameName': game_name,
                 'tagLine': tag_line,
-                'puuid': puuid,
+                'puuid': None,
                 'championName': champion,
                 'level': entry.get('level', 0),
                 'team': team_label,
@@ -0,0 +1,278 @@
+"""
+实时对局录制与回放
+把游戏内 API 的 allgamedata 数据追加写入压缩文件，并可按原速或加速回放，
+用于在没有游戏客户端的机器上复现实时对局数据（调试、性能分析、基准测试）。
+
+文件格式（只追加）:
+- 数据文件:   每条记录是一个独立的 gzip 成员，内容为 JSON
+              {"t": 相对录制开始的秒数, "key": 是否关键帧, "frame": allgamedata}
+- 索引文件:   <数据文件>.idx，每行 "t<TAB>offset<TAB>length<TAB>key"
+
+事件列表会随对局时长增长，因此只有关键帧保存完整事件，其余记录只保存新增事件；
+读取时从最近的关键帧开始累积即可还原完整数据。索引在数据写入后才追加，
+进程中途退出时最多丢失最后一条记录。
+"""
+import bisect
+import gzip
+import os
+import threading
+import time
+
+from utils import json_codec
+from utils.logger import logger
+
+# 每隔多少条记录写入一个关键帧（包含完整事件列表）
+KEYFRAME_INTERVAL = 30
+
+
+def _index_path(path):
+    return f"{path}.idx"
+
+
+def _frame_events(frame):
+    events = (frame.get('events') or {}).get('Events') if isinstance(frame, dict) else None
+    return events if isinstance(events, list) else []
+
+
+def _with_events(frame, events):
+    return {**frame, 'events': {'Events': events}}
+
+
+class LiveRecorder:
+    """
+    实时对局录制器（线程安全）。
+
+    record(frame) 接受 allgamedata 结构的数据，events 可以是完整列表，
+    也可以只包含新事件（增量轮询时），按 EventID 去重。
+    """
+
+    def __init__(self, path, keyframe_interval=KEYFRAME_INTERVAL):
+        self.path = path
+        self._keyframe_interval = keyframe_interval
+        self._lock = threading.Lock()
+        self._events = []
+        self._last_event_id = -1
+        self._since_keyframe = None  # None 表示下一条必须是关键帧
+        self._stats = {'frames': 0, 'keyframes': 0, 'bytes': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 追加到已有录制时，时间轴接在最后一条记录之后
+        index = _load_index(path)
+        last_t = index[-1][0] if index else 0.0
+        self._started = time.monotonic() - last_t
+        self._data = open(path, 'ab')
+        self._index = open(_index_path(path), 'a', encoding='utf-8')
+
+    def record(self, frame):
+        if not isinstance(frame, dict):
+            return
+        with self._lock:
+            if self._data is None:
+                return
+            new_events = self._merge_events(_frame_events(frame))
+            key = self._since_keyframe is None or self._since_keyframe + 1 >= self._keyframe_interval
+            record = {
+                't': round(time.monotonic() - self._started, 3),
+                'key': key,
+                'frame': _with_events(frame, list(self._events) if key else new_events),
+            }
+            payload = gzip.compress(json_codec.dumps_bytes(record))
+
+            offset = self._data.seek(0, os.SEEK_END)
+            self._data.write(payload)
+            self._data.flush()
+            self._index.write(f"{record['t']}\t{offset}\t{len(payload)}\t{int(key)}\n")
+            self._index.flush()
+
+            self._since_keyframe = 0 if key else self._since_keyframe + 1
+            self._stats['frames'] += 1
+            self._stats['keyframes'] += int(key)
+            self._stats['bytes'] += len(payload)
+
+    def _merge_events(self, events):
+        """
+        合并事件并返回新增部分。
+
+        完整事件列表每次都以 GameStart 开头；只有列表从 GameStart 重新开始且没有到达已记录的
+        最后一个 EventID 时，才视为新对局。
+        """
+        if events and isinstance(events[0], dict):
+            first = events[0]
+            last_id = max(
+                (e.get('EventID') for e in events if isinstance(e, dict) and isinstance(e.get('EventID'), int)),
+                default=-1
+            )
+            if (
+                first.get('EventName') == 'GameStart'
+                and 0 <= first.get('EventID', 0) <= self._last_event_id
+                and last_id < self._last_event_id
+            ):
+                self._events = []
+                self._last_event_id = -1
+                self._since_keyframe = None
+        new_events = []
+        for event in events:
+            event_id = event.get('EventID') if isinstance(event, dict) else None
+            if isinstance(event_id, int) and event_id > self._last_event_id:
+                self._last_event_id = event_id
+                new_events.append(event)
+        self._events.extend(new_events)
+        return new_events
+
+    def close(self):
+        with self._lock:
+            if self._data is None:
+                return
+            self._data.close()
+            self._index.close()
+            self._data = self._index = None
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['path'] = self.path
+        return snapshot
+
+
+def _load_index(path):
+    """读取索引，返回 [(t, offset, length, key)]；不完整的行（写入中断）会被忽略"""
+    entries = []
+    try:
+        with open(_index_path(path), encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) != 4:
+                    continue
+                try:
+                    entries.append((float(parts[0]), int(parts[1]), int(parts[2]), parts[3] == '1'))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+class LiveRecording:
+    """
+    只读的录制文件。
+
+    - frame_at(t): 返回时间 t 时的完整 allgamedata（t 之前最近的一条记录）
+    - frames():    按顺序遍历 (t, frame)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = _load_index(path)
+        if not self._entries:
+            raise ValueError(f"录制文件为空或缺少索引: {path}")
+        self._times = [entry[0] for entry in self._entries]
+        self._keyframes = [i for i, entry in enumerate(self._entries) if entry[3]]
+        self._file = open(path, 'rb')
+        self._lock = threading.Lock()
+        # 当前累积位置：已应用到 _pos 条记录，_events 为累积的完整事件
+        self._pos = -1
+        self._frame = None
+        self._events = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def duration(self):
+        return self._times[-1]
+
+    def _read(self, i):
+        _, offset, length, _ = self._entries[i]
+        self._file.seek(offset)
+        return json_codec.loads(gzip.decompress(self._file.read(length)))
+
+    def _seek(self, i):
+        """把累积状态推进到第 i 条记录"""
+        k = self._keyframes[bisect.bisect_right(self._keyframes, i) - 1] if self._keyframes else 0
+        start = self._pos + 1 if k <= self._pos <= i else k
+        if start == k:
+            self._events = []
+        for j in range(start, i + 1):
+            record = self._read(j)
+            events = _frame_events(record['frame'])
+            self._events = list(events) if record.get('key') else self._events + events
+            self._frame = record['frame']
+        self._pos = i
+        return _with_events(self._frame, self._events)
+
+    def frame_at(self, t):
+        i = bisect.bisect_right(self._times, t) - 1
+        if i < 0:
+            i = 0
+        with self._lock:
+            return self._seek(i)
+
+    def frames(self):
+        for i, t in enumerate(self._times):
+            with self._lock:
+                frame = self._seek(i)
+            yield t, frame
+
+    def close(self):
+        self._file.close()
+
+
+class LiveReplay:
+    """
+    回放数据源：按墙钟时间（乘以 speed）推进录制，替代端口 2999 的游戏内 API。
+
+    get(path, params) 与游戏内 API 的路径对应，回放结束（且不循环）后返回 None，
+    与游戏结束时 API 不可用的表现一致。
+    """
+
+    def __init__(self, path, speed=1.0, loop=False):
+        self.recording = LiveRecording(path)
+        self.speed = speed if speed and speed > 0 else 1.0
+        self.loop = loop
+        self._started = time.monotonic()
+
+    def position(self):
+        t = (time.monotonic() - self._started) * self.speed
+        if self.loop and self.recording.duration > 0:
+            t %= self.recording.duration
+        return t
+
+    def current_frame(self):
+        t = self.position()
+        if not self.loop and t > self.recording.duration + 1.0:
+            return None
+        return self.recording.frame_at(t)
+
+    def get(self, path, params=None):
+        frame = self.current_frame()
+        if frame is None:
+            return None
+        endpoint = path.rsplit('/', 1)[-1]
+        if endpoint == 'allgamedata':
+            return frame
+        if endpoint == 'activeplayer':
+            return frame.get('activePlayer')
+        if endpoint == 'playerlist':
+            return frame.get('allPlayers')
+        if endpoint == 'gamestats':
+            return frame.get('gameData')
+        if endpoint == 'eventdata':
+            start = int((params or {}).get('eventID', 0) or 0)
+            return {'Events': [e for e in _frame_events(frame) if e.get('EventID', -1) >= start]}
+        logger.debug(f"回放不支持的游戏内 API 路径: {path}")
+        return None
+
+    def stats(self):
+        return {
+            'path': self.recording.path,
+            'speed': self.speed,
+            'loop': self.loop,
+            'position': round(self.position(), 1),
+            'duration': self.recording.duration,
+            'records': len(self.recording),
+        }
+
+    def close(self):
+        self.recording.close()
@@ -1,36 +1,46 @@
 """
 战绩查询 API
 处理比赛历史记录和对局详情查询
+
+战绩缓存、增量同步列表和同步统计只在本模块中维护；
+异步客户端（core.lcu.aio）通过 HistorySync、get_cached_history_page / build_history_page、
+tft_history_request / store_tft_history 等公共步骤读写同一份状态，自己只负责发送请求。
 """
-from .client import make_request
+from .client import make_request, get_session
+from .singleflight import SingleFlight
+from .cache import TTLCache
+from core.match_archive import match_archive
 import time
 import base64
+import threading
 import requests
-from requests.auth import HTTPBasicAuth
 from urllib.parse import quote_plus
+from utils import json_codec
 from utils.logger import logger
 
-# 简单的内存缓存：{puuid: (timestamp, data)}
-_match_history_cache = {}
+# 战绩缓存：{key: data}，key 为 "{puuid}_full" / "{puuid}_{begin}_{count}" / "tft_{puuid}_{count}"
 CACHE_TTL = 300  # 缓存5分钟
-MAX_CACHE_SIZE = 100  # 最大缓存100个玩家
+MAX_CACHE_SIZE = 100  # 最大缓存100个条目
+_match_history_cache = TTLCache('match_history', MAX_CACHE_SIZE, CACHE_TTL)
 
+# 增量同步：每个玩家保留一份按时间倒序（最新在前）的战绩列表，
+# 缓存过期后只请求最新的一小段，遇到已知 gameId 即停止并与已有列表合并
+HISTORY_STORE_TTL = 6 * 3600  # 保留6小时
+MAX_HISTORY_STORE_SIZE = 200  # 最多保留200个玩家
+MAX_STORED_GAMES = 200  # 每个玩家最多保留200场
+DELTA_WINDOW = 5  # 增量同步时请求的最新场次数
+RETRY_DELAY = 1  # 全量请求 / TFT 请求失败后等待多久（秒）再尝试下一次
+TFT_MAX_RETRIES = 2
+MATCH_REQUEST_TIMEOUT = 3  # 单场对局详情的请求超时（秒）
+_history_store = TTLCache('match_history_store', MAX_HISTORY_STORE_SIZE, HISTORY_STORE_TTL)
 
-def _clean_cache():
-    """清理过期缓存和超出容量的缓存"""
-    global _match_history_cache
-    current_time = time.time()
-    
-    # 删除过期缓存
-    expired_keys = [k for k, (t, _) in _match_history_cache.items() if current_time - t > CACHE_TTL]
-    for k in expired_keys:
-        del _match_history_cache[k]
-    
-    # 如果缓存过大，删除最旧的条目
-    if len(_match_history_cache) > MAX_CACHE_SIZE:
-        sorted_items = sorted(_match_history_cache.items(), key=lambda x: x[1][0])
-        for k, _ in sorted_items[:len(_match_history_cache) - MAX_CACHE_SIZE]:
-            del _match_history_cache[k]
+_sync_stats_lock = threading.Lock()
+_sync_stats = {'full_syncs': 0, 'delta_syncs': 0, 'delta_fallbacks': 0, 'new_games': 0}
+
+# 并发请求合并：同一玩家/对局的并发查询只向 LCU 发起一次
+history_flight = SingleFlight('match_history')
+tft_history_flight = SingleFlight('tft_match_history')
+match_flight = SingleFlight('match_by_id')
 
 
 def get_match_history(token, port, puuid, count=20, begin_index=0):
@@ -51,108 +61,41 @@ def get_match_history(token, port, puuid, count=20, begin_index=0):
         - LCU API 不支持真正的分页参数，我们会一次性请求大量数据并缓存
         - 首次请求会获取最多200场，缓存10分钟
         - 后续分页请求会从缓存中切片
+        - 缓存过期后通过增量同步只请求最新几场并与已有战绩合并
     """
-    # 定期清理缓存
-    _clean_cache()
-    
-    # 检查是否有完整数据的缓存
-    full_cache_key = f"{puuid}_full"
-    sliced_cache_key = f"{puuid}_{begin_index}_{count}"
-    
-    # 先检查切片后的缓存
-    if sliced_cache_key in _match_history_cache:
-        cached_time, cached_data = _match_history_cache[sliced_cache_key]
-        if time.time() - cached_time < CACHE_TTL:
-            logger.debug(f"✅ 使用切片缓存 (begin={begin_index}, count={count})")
-            return cached_data
-    
-    # 检查完整数据缓存
-    all_games = None
-    if full_cache_key in _match_history_cache:
-        cached_time, cached_games = _match_history_cache[full_cache_key]
-        if time.time() - cached_time < CACHE_TTL:
-            logger.debug(f"✅ 使用完整数据缓存 (共 {len(cached_games)} 场)")
-            all_games = cached_games
-    
-    # 如果没有缓存，请求完整数据
+    cached_data = get_cached_history_page(puuid, count, begin_index)
+    if cached_data is not None:
+        return cached_data
+
+    # 没有缓存时请求完整数据（同一玩家的并发请求合并为一次）
+    all_games = history_flight.do((port, puuid), _fetch_all_games, token, port, puuid, count)
     if all_games is None:
-        endpoint = f"/lol-match-history/v1/products/lol/{quote_plus(puuid)}/matches"
-
-        # 分阶段尝试，先请求较小范围数据，必要时逐步扩大
-        attempt_profiles = [
-            {
-                'endIndex': min(max(count, 20), 30),
-                'timeout': 12,
-                'desc': 'baseline'
-            },
-            {
-                'endIndex': min(max(count + 10, 30), 50),
-                'timeout': 18,
-                'desc': 'expanded'
-            }
-        ]
-
-        auth = HTTPBasicAuth('riot', token)
-
-        for idx, profile in enumerate(attempt_profiles):
-            params = {'begIndex': 0, 'endIndex': profile['endIndex']}
-            timeout = profile['timeout']
-            logger.debug(f"📊 请求 {profile['endIndex']} 场历史记录 (profile={profile['desc']}, timeout={timeout}s)...")
-
-            # 先尝试通过统一的 make_request（可复用连接池与日志）
-            result = make_request(
-                "GET",
-                endpoint,
-                token,
-                port,
-                params=params,
-                timeout=timeout
-            )
-
-            # 如果 make_request 超时或返回 None，尝试直接使用 requests (支持更长 timeout)
-            if not result:
-                direct_timeout = min(timeout + 6, 28)
-                url = f"https://127.0.0.1:{port}{endpoint}"
-                try:
-                    logger.warning(f"⏳ make_request 无响应，尝试直接请求 (timeout={direct_timeout}s)...")
-                    resp = requests.get(
-                        url,
-                        params=params,
-                        auth=auth,
-                        verify=False,
-                        timeout=direct_timeout
-                    )
-                    resp.raise_for_status()
-                    result = resp.json()
-                except requests.RequestException as exc:
-                    logger.warning(f"⚠️ 直接请求失败: {exc}")
-                    if idx == len(attempt_profiles) - 1:
-                        logger.error(f"❌ 查询最终失败 (PUUID={puuid[:8]}...)")
-                        return None
-                    logger.debug("⏱️ 等待 1 秒后尝试下一套配置...")
-                    time.sleep(1)
-                    continue
-
-            if result:
-                games_data = result.get('games', {})
-                if isinstance(games_data, dict):
-                    all_games = games_data.get('games', [])
-                else:
-                    all_games = games_data if isinstance(games_data, list) else []
+        return None
+    return build_history_page(puuid, all_games, count, begin_index)
 
-                logger.debug(f"✅ API返回 {len(all_games)} 场历史记录 (profile={profile['desc']})")
 
-                _match_history_cache[full_cache_key] = (time.time(), all_games)
-                break
+def get_cached_history_page(puuid, count=20, begin_index=0):
+    """
+    从缓存中取一页战绩：优先切片缓存，其次从完整战绩缓存中切片
 
-        if all_games is None:
-            return None
-    
-    # 如果还是没有数据，返回None
+    Returns:
+        dict: {'games': {'games': [...]}}，都未命中返回None
+    """
+    cached_data = _match_history_cache.get(f"{puuid}_{begin_index}_{count}")
+    if cached_data is not None:
+        logger.debug(f"✅ 使用切片缓存 (begin={begin_index}, count={count})")
+        return cached_data
+
+    all_games = _match_history_cache.get(f"{puuid}_full")
     if all_games is None:
         return None
-    
-    # 从完整数据中切片
+    logger.debug(f"✅ 使用完整数据缓存 (共 {len(all_games)} 场)")
+    return build_history_page(puuid, all_games, count, begin_index)
+
+
+def build_history_page(puuid, all_games, count=20, begin_index=0):
+    """从完整战绩列表中切出一页并写入切片缓存"""
+    sliced_cache_key = f"{puuid}_{begin_index}_{count}"
     sliced_games = all_games[begin_index:begin_index + count]
     
     logger.debug(f"📊 从 {len(all_games)} 场中切片，取第 {begin_index+1}-{begin_index+len(sliced_games)} 场")
@@ -169,18 +112,224 @@ def get_match_history(token, port, puuid, count=20, begin_index=0):
     }
     
     # 缓存切片后的结果
-    _match_history_cache[sliced_cache_key] = (time.time(), sliced_result)
+    _match_history_cache.put(sliced_cache_key, sliced_result)
     logger.debug(f"✅ 返回 {len(sliced_games)} 场比赛")
     
     return sliced_result
 
 
+def _incr_sync_stat(name, value=1):
+    with _sync_stats_lock:
+        _sync_stats[name] += value
+
+
+def get_history_sync_stats():
+    """返回战绩同步统计：full_syncs / delta_syncs / delta_fallbacks / new_games"""
+    with _sync_stats_lock:
+        return dict(_sync_stats)
+
+
+def _extract_games(result):
+    """从战绩响应中取出对局列表（兼容 {'games': {'games': [...]}} 与 {'games': [...]}）"""
+    games_data = result.get('games', {})
+    if isinstance(games_data, dict):
+        return games_data.get('games', [])
+    return games_data if isinstance(games_data, list) else []
+
+
+def _merge_delta(window, stored_games):
+    """
+    把最新窗口内的新对局合并到已有列表前面（遇到第一个已知 gameId 即停止）
+
+    Returns:
+        list: 合并后的对局列表；窗口内没有已知对局（新对局过多）时返回None
+    """
+    known_ids = {g.get('gameId') for g in stored_games}
+    new_games = []
+    for game in window:
+        if game.get('gameId') in known_ids:
+            if new_games:
+                _incr_sync_stat('new_games', len(new_games))
+            return (new_games + stored_games)[:MAX_STORED_GAMES]
+        new_games.append(game)
+
+    # 窗口未满说明该玩家的全部战绩都在窗口内
+    if len(window) < DELTA_WINDOW:
+        _incr_sync_stat('new_games', len(new_games))
+        return new_games
+    return None
+
+
+def _history_profiles(count):
+    """全量请求的分阶段配置：先请求较小范围数据，必要时逐步扩大"""
+    profiles = [
+        {
+            'endIndex': min(max(count, 20), 30),
+            'timeout': 12,
+            'desc': 'baseline'
+        },
+        {
+            'endIndex': min(max(count + 10, 30), 50),
+            'timeout': 18,
+            'desc': 'expanded'
+        }
+    ]
+    for profile in profiles:
+        # 没有响应时用更长的超时直接重试一次
+        profile['retry_timeout'] = min(profile['timeout'] + 6, 28)
+    return profiles
+
+
+def _store_full_games(puuid, all_games, end_index):
+    """全量请求成功后写入缓存和增量同步用的战绩列表"""
+    _incr_sync_stat('full_syncs')
+    _match_history_cache.put(f"{puuid}_full", all_games)
+    _history_store.put(puuid, {
+        'games': all_games,
+        # 返回数量少于请求范围，说明已是该玩家的全部战绩
+        'complete': len(all_games) < end_index,
+    })
+
+
+def history_endpoint(puuid):
+    """LOL 战绩列表端点"""
+    return f"/lol-match-history/v1/products/lol/{quote_plus(puuid)}/matches"
+
+
+class HistorySync:
+    """
+    一次完整战绩同步：已有该玩家的战绩时先增量同步，失败再分阶段全量请求。
+
+    不发送请求，调用方按顺序:
+    1. cached 不为 None 时直接使用（等待合并期间其他调用可能已经写入缓存）
+    2. delta_request() 不为 None 时请求，结果交给 apply_delta()，返回列表即完成
+    3. 按 profiles 依次请求 full_request(profile)，没有响应时可用 profile['retry_timeout'] 再试一次，
+       成功后交给 apply_full()；同一阶段失败后等待 RETRY_DELAY 秒再进入下一阶段
+    """
+
+    def __init__(self, puuid, count):
+        self.puuid = puuid
+        self.endpoint = history_endpoint(puuid)
+        self.profiles = _history_profiles(count)
+        self.cached = _match_history_cache.get(f"{puuid}_full")
+        stored = _history_store.get(puuid)
+        # 已有列表需要覆盖本次所需的范围（或者已经是该玩家的全部战绩）
+        if stored is not None and not (stored['complete'] or len(stored['games']) >= self.profiles[0]['endIndex']):
+            stored = None
+        self.stored = stored
+
+    def delta_request(self):
+        """
+        增量同步的请求参数（只请求最新的 DELTA_WINDOW 场），没有可合并的已有战绩时返回None
+
+        Returns:
+            tuple: (method, endpoint, kwargs)
+        """
+        if self.stored is None:
+            return None
+        return "GET", self.endpoint, {'params': {'begIndex': 0, 'endIndex': DELTA_WINDOW}, 'timeout': 8}
+
+    def apply_delta(self, result):
+        """
+        把增量同步结果合并到已有战绩并写入缓存
+
+        Returns:
+            list: 合并后的对局列表；请求失败或窗口内没有已知对局（新对局过多）时返回None
+        """
+        merged = _merge_delta(_extract_games(result), self.stored['games']) if result else None
+        if merged is None:
+            _incr_sync_stat('delta_fallbacks')
+            logger.debug(f"⏳ 增量同步未命中已知对局，回退全量请求 (PUUID={self.puuid[:8]}...)")
+            return None
+        _incr_sync_stat('delta_syncs')
+        logger.debug(f"✅ 增量同步完成 (PUUID={self.puuid[:8]}..., 共 {len(merged)} 场)")
+        _history_store.put(self.puuid, {'games': merged, 'complete': self.stored['complete']})
+        _match_history_cache.put(f"{self.puuid}_full", merged)
+        return merged
+
+    def full_request(self, profile, timeout=None):
+        """
+        全量请求的请求参数（timeout 默认为该阶段的超时）
+
+        Returns:
+            tuple: (method, endpoint, kwargs)
+        """
+        params = {'begIndex': 0, 'endIndex': profile['endIndex']}
+        return "GET", self.endpoint, {'params': params, 'timeout': timeout or profile['timeout']}
+
+    def apply_full(self, result, profile):
+        """取出全量请求的对局列表并写入缓存和增量同步用的战绩列表"""
+        all_games = _extract_games(result)
+        logger.debug(f"✅ API返回 {len(all_games)} 场历史记录 (profile={profile['desc']})")
+        _store_full_games(self.puuid, all_games, profile['endIndex'])
+        return all_games
+
+
+def _fetch_all_games(token, port, puuid, count):
+    """
+    获取玩家的完整战绩列表并写入缓存（由 history_flight 合并并发调用）。
+
+    已有该玩家的战绩时先尝试增量同步，失败再回退到全量请求。
+
+    Returns:
+        list: 对局列表，失败返回None
+    """
+    sync = HistorySync(puuid, count)
+    if sync.cached is not None:
+        return sync.cached
+
+    delta = sync.delta_request()
+    if delta is not None:
+        method, endpoint, kwargs = delta
+        merged = sync.apply_delta(make_request(method, endpoint, token, port, **kwargs))
+        if merged is not None:
+            return merged
+
+    all_games = None
+
+    # 分阶段尝试，先请求较小范围数据，必要时逐步扩大
+    for idx, profile in enumerate(sync.profiles):
+        method, endpoint, kwargs = sync.full_request(profile)
+        logger.debug(f"📊 请求 {profile['endIndex']} 场历史记录 (profile={profile['desc']}, timeout={kwargs['timeout']}s)...")
+
+        # 先尝试通过统一的 make_request（可复用连接池与日志）
+        result = make_request(method, endpoint, token, port, **kwargs)
+
+        # 如果 make_request 超时或返回 None，尝试直接使用 requests (支持更长 timeout)
+        if not result:
+            direct_timeout = profile['retry_timeout']
+            url = f"https://127.0.0.1:{port}{endpoint}"
+            try:
+                logger.warning(f"⏳ make_request 无响应，尝试直接请求 (timeout={direct_timeout}s)...")
+                resp = get_session(token, port).get(
+                    url,
+                    params=kwargs['params'],
+                    timeout=direct_timeout
+                )
+                resp.raise_for_status()
+                result = json_codec.loads(resp.content)
+            except (requests.RequestException, ValueError) as exc:
+                logger.warning(f"⚠️ 直接请求失败: {exc}")
+                if idx == len(sync.profiles) - 1:
+                    logger.error(f"❌ 查询最终失败 (PUUID={puuid[:8]}...)")
+                    return None
+                logger.debug(f"⏱️ 等待 {RETRY_DELAY} 秒后尝试下一套配置...")
+                time.sleep(RETRY_DELAY)
+                continue
+
+        if result:
+            all_games = sync.apply_full(result, profile)
+            break
+
+    return all_games
+
+
 def get_tft_match_history(token, port, puuid, count=20):
     """
     通过 PUUID 获取 TFT (TFT product) 的比赛历史记录。
 
     使用直接 HTTPS 请求 + Basic Auth（与 runs/fetch_tft_history.py 相同的方式），
-    避免高级 HTTP 客户端的参数处理差异或兼容性问题。
+    避免高级 HTTP 客户端的参数处理差异或兼容性问题。请求走共享连接池以复用连接。
 
     Args:
         token: LCU认证令牌
@@ -192,55 +341,75 @@ def get_tft_match_history(token, port, puuid, count=20):
         dict: 标准化的战绩数据 {'games': {'games': [...]}}，失败返回None
     """
     # reuse cache mechanism but use a distinct cache key
-    _clean_cache()
-    cache_key = f"tft_{puuid}_{count}"
-    if cache_key in _match_history_cache:
-        cached_time, cached_data = _match_history_cache[cache_key]
-        if time.time() - cached_time < CACHE_TTL:
-            logger.debug(f"✅ 使用缓存数据 (TFT PUUID={puuid[:8]}..., count={count})")
-            return cached_data
+    cached_data = get_cached_tft_history(puuid, count)
+    if cached_data is not None:
+        logger.debug(f"✅ 使用缓存数据 (TFT PUUID={puuid[:8]}..., count={count})")
+        return cached_data
+
+    # 同一玩家的并发请求合并为一次
+    return tft_history_flight.do((port, puuid, count), _fetch_tft_match_history, token, port, puuid, count)
+
+
+def get_cached_tft_history(puuid, count=20):
+    """读取 TFT 战绩缓存，未命中返回None"""
+    return _match_history_cache.get(f"tft_{puuid}_{count}")
+
+
+def tft_history_request(puuid, count=20):
+    """
+    TFT 战绩的请求参数（超时随数量增加，最长25秒）
+
+    Returns:
+        tuple: (method, endpoint, kwargs)
+    """
+    timeout = min(8 + (count // 20) * 2, 25)
+    endpoint = f"/lol-match-history/v1/products/tft/{quote_plus(puuid)}/matches"
+    return "GET", endpoint, {'params': {'begin': 0, 'count': count}, 'timeout': timeout}
+
+
+def store_tft_history(puuid, count, data):
+    """规范化 TFT 战绩响应并写入缓存，返回 {'games': {'games': [...]}}"""
+    normalized = _normalize_tft_response(data)
+    _match_history_cache.put(f"tft_{puuid}_{count}", normalized)
+    logger.info(f"✅ TFT 查询成功 (PUUID={puuid[:8]}..., {_get_games_count(normalized)} 场比赛)")
+    return normalized
 
-    timeout = 8 + (count // 20) * 2
-    timeout = min(timeout, 25)
+
+def _fetch_tft_match_history(token, port, puuid, count):
+    """向 LCU 请求 TFT 战绩并写入缓存（由 tft_history_flight 合并并发调用）"""
+    _, endpoint, kwargs = tft_history_request(puuid, count)
+    timeout = kwargs['timeout']
 
     logger.debug(f"📊 查询 TFT {count} 场战绩，预计timeout={timeout}秒")
 
     # 直接使用 HTTPS 请求 + Basic Auth（与 runs/fetch_tft_history.py 相同）
     # 这避免了 make_request 和 HTTPBasicAuth 可能的参数处理差异
-    url = f"https://127.0.0.1:{port}/lol-match-history/v1/products/tft/{quote_plus(puuid)}/matches?begin=0&count={count}"
+    url = f"https://127.0.0.1:{port}{endpoint}"
     auth_header = base64.b64encode(f"riot:{token}".encode('ascii')).decode('ascii')
     headers = {'Authorization': f'Basic {auth_header}'}
 
     logger.debug(f"🔎 TFT 直接请求: {url}")
 
-    max_retries = 2
-    for attempt in range(max_retries):
+    for attempt in range(TFT_MAX_RETRIES):
         try:
-            resp = requests.get(url, headers=headers, verify=False, timeout=timeout)
+            resp = get_session(token, port).get(url, params=kwargs['params'], headers=headers, timeout=timeout)
             logger.debug(f"📡 TFT 请求响应: {resp.status_code}")
 
             if resp.status_code == 200:
-                data = resp.json()
-                # 规范化响应：确保返回 {'games': {'games': [...]}}
-                normalized = _normalize_tft_response(data)
-                _match_history_cache[cache_key] = (time.time(), normalized)
-                
-                games_count = _get_games_count(normalized)
-                logger.info(f"✅ TFT 查询成功 (PUUID={puuid[:8]}..., {games_count} 场比赛)")
-                return normalized
+                return store_tft_history(puuid, count, json_codec.loads(resp.content))
             else:
                 logger.warning(f"⚠️ TFT 请求失败: {resp.status_code}")
-                if attempt < max_retries - 1:
-                    logger.warning(f"⏳ {timeout}秒后重试... (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(1)
+                if attempt < TFT_MAX_RETRIES - 1:
+                    logger.warning(f"⏳ {timeout}秒后重试... (attempt {attempt + 1}/{TFT_MAX_RETRIES})")
+                    time.sleep(RETRY_DELAY)
                 else:
                     logger.error("❌ TFT 查询最终失败")
                     return None
         except Exception as e:
             logger.warning(f"⚠️ TFT 请求异常: {e}")
-            if attempt < max_retries - 1:
-                logger.warning(f"⏳ {timeout}秒后重试... (attempt {attempt + 1}/{max_retries})")
-                time.sleep(1)
+            if attempt < TFT_MAX_RETRIES - 1:
+                logger.warning(f"⏳ {timeout}秒后重试... (attempt {attempt + 1}/{TFT_MAX_RETRIES})")
+                time.sleep(RETRY_DELAY)
             else:
                 logger.error("❌ TFT 查询异常失败")
                 return None
@@ -304,16 +473,31 @@ def get_match_by_id(token, port, match_id):
     Returns:
         dict: 对局完整数据，失败返回None
     """
-    candidates = [
-        f"/lol-match-history/v1/games/{match_id}", 
+    # 已结束的对局不会再变化，优先读取本地存档
+    archived = match_archive.get_raw(match_id)
+    if archived is not None:
+        logger.debug(f"✅ 使用本地存档 (match_id={match_id})")
+        return archived
+
+    return match_flight.do((port, str(match_id)), _fetch_match_by_id, token, port, match_id)
+
+
+def match_endpoints(match_id):
+    """按顺序尝试的对局详情端点"""
+    return [
+        f"/lol-match-history/v1/games/{match_id}",
     ]
 
-    for ep in candidates:
+
+def _fetch_match_by_id(token, port, match_id):
+    """依次尝试已知端点获取对局详情（由 match_flight 合并并发调用）"""
+    for ep in match_endpoints(match_id):
         try:
             # 🔇 仅在失败时打印日志，减少控制台噪音
-            res = make_request("GET", ep, token, port, timeout=3)  # 单次请求超时3秒
+            res = make_request("GET", ep, token, port, timeout=MATCH_REQUEST_TIMEOUT)
             if res:
                 logger.debug(f"✅ 获取对局成功 (match_id={match_id})")
+                match_archive.put_raw(match_id, res)
                 return res
         except Exception:
             # 静默失败，继续尝试下一个端点
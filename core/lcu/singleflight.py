@@ -0,0 +1,190 @@
+"""
+请求合并（single-flight）
+同一个 key 的并发调用只会真正执行一次，其余调用者等待并共享这次的结果
+
+典型场景：进入英雄选择时前端同时发起多个 /get_history 请求，
+同一玩家的战绩只需要向 LCU 请求一次。
+
+do 供同步线程调用，do_async 供事件循环（core.lcu.aio）调用，两者共用同一组进行中的调用：
+同步路由和异步批量查询同时请求同一 key 时也只执行一次。
+
+使用示例:
+    _history_flight = SingleFlight('match_history')
+
+    def get_something(token, port, puuid):
+        return _history_flight.do((port, puuid), _fetch_something, token, port, puuid)
+"""
+import asyncio
+import threading
+
+from utils.logger import logger
+
+# 等待者最多等待进行中的调用多久（秒）；超时后自行执行，避免执行者所在的事件循环停止后永远阻塞
+WAIT_TIMEOUT = 60
+
+
+class _Call:
+    """一次正在进行中的调用"""
+    __slots__ = ('done', 'result', 'error', 'callbacks')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # 完成时调用的回调（事件循环中的等待者），在 SingleFlight._lock 下登记
+        self.callbacks = []
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _wake_threadsafe(loop, waiter):
+    try:
+        loop.call_soon_threadsafe(_wake, waiter)
+    except RuntimeError:
+        pass  # 等待者所在的事件循环已关闭
+
+
+class SingleFlight:
+    """
+    按 key 合并并发调用。
+
+    - do(key, fn, *args, **kwargs): 无进行中的调用时执行 fn，否则等待并返回同一结果
+    - do_async(key, factory): 协程版本，与 do 共用进行中的调用
+    - 执行者抛出的异常会原样传递给所有等待者；异步执行者因事件循环关闭被取消时，等待者收到 RuntimeError
+    - 等待者最多等待 wait_timeout 秒，超时后自行执行 fn / factory（计入 wait_timeouts）
+    - 调用完成后立即移除 key，之后的调用会重新执行（缓存由调用方负责）
+    """
+
+    def __init__(self, name, wait_timeout=WAIT_TIMEOUT):
+        self.name = name
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+        # 执行中的异步调用，保持引用以免任务在完成前被垃圾回收
+        self._tasks = set()
+        self._stats = {'calls': 0, 'executions': 0, 'coalesced': 0, 'errors': 0, 'wait_timeouts': 0}
+        _registry.append(self)
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats['executions'] += 1
+                leader = True
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                self._wait_timed_out(key)
+                return fn(*args, **kwargs)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result
+
+    async def do_async(self, key, factory):
+        """
+        do 的协程版本：factory() 返回要执行的协程，无进行中的调用时执行，否则等待同一结果。
+
+        进行中的调用可能来自同步线程（do），等待时不阻塞事件循环。
+        等待方被取消（例如超过 deadline）不会取消执行中的协程，结果仍会写入缓存。
+        """
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats['executions'] += 1
+                leader = True
+            call.callbacks.append(lambda: _wake_threadsafe(loop, waiter))
+
+        if leader:
+            task = loop.create_task(self._run_async(key, call, factory))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            await waiter
+        else:
+            try:
+                await asyncio.wait_for(waiter, self.wait_timeout)
+            except asyncio.TimeoutError:
+                self._wait_timed_out(key)
+                return await factory()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def _run_async(self, key, call, factory):
+        try:
+            call.result = await factory()
+        except asyncio.CancelledError:
+            # 只有事件循环关闭时才会取消执行者（等待方取消不影响执行者），
+            # 同步线程中的等待者不能收到 CancelledError
+            call.error = RuntimeError(f"合并调用 {self.name} 的执行者已取消（事件循环关闭）")
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+        finally:
+            self._finish(key, call)
+
+    def _wait_timed_out(self, key):
+        with self._lock:
+            self._stats['wait_timeouts'] += 1
+        logger.warning(f"⏱️ 等待合并调用超时，自行执行 ({self.name}, key={key})")
+
+    def _finish(self, key, call):
+        """移除进行中的调用并唤醒所有等待者"""
+        with self._lock:
+            self._calls.pop(key, None)
+            callbacks, call.callbacks = call.callbacks, []
+        call.done.set()
+        for callback in callbacks:
+            callback()
+
+    def stats(self):
+        """返回合并统计：calls / executions / coalesced / errors / wait_timeouts / in_flight"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['in_flight'] = len(self._calls)
+        return snapshot
+
+
+# 所有 SingleFlight 实例，便于统一输出统计
+_registry = []
+
+
+def get_singleflight_stats():
+    """
+    返回所有合并组的统计信息。
+
+    Returns:
+        dict: {name: {calls, executions, coalesced, errors, wait_timeouts, in_flight}}
+    """
+    return {flight.name: flight.stats() for flight in _registry}
@@ -1,33 +1,71 @@
 """
 召唤师信息 API
 查询召唤师资料、PUUID 等信息
+
+缓存、批量接口可用性、排位端点记录等状态只在本模块中维护；
+异步客户端（core.lcu.aio）通过 puuid_request / store_puuid、BulkSummonerLookup、RankedLookup
+等公共步骤读写同一份状态，自己只负责发送请求和并发调度。
 """
+import json
 import re
-import time
-from .client import make_request
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .client import make_request, request_with_status
+from .singleflight import SingleFlight
+from .cache import TTLCache
 from utils.logger import logger
 
-# PUUID缓存：{summoner_name: (timestamp, puuid)}
-_puuid_cache = {}
+# PUUID缓存：{summoner_name: puuid}
 PUUID_CACHE_TTL = 600  # 缓存10分钟
 MAX_PUUID_CACHE_SIZE = 200  # 最大缓存200个召唤师
-
-
-def _clean_puuid_cache():
-    """清理过期的PUUID缓存"""
-    global _puuid_cache
-    current_time = time.time()
-    
-    # 删除过期缓存
-    expired_keys = [k for k, (t, _) in _puuid_cache.items() if current_time - t > PUUID_CACHE_TTL]
-    for k in expired_keys:
-        del _puuid_cache[k]
-    
-    # 如果缓存过大，删除最旧的条目
-    if len(_puuid_cache) > MAX_PUUID_CACHE_SIZE:
-        sorted_items = sorted(_puuid_cache.items(), key=lambda x: x[1][0])
-        for k, _ in sorted_items[:len(_puuid_cache) - MAX_PUUID_CACHE_SIZE]:
-            del _puuid_cache[k]
+_puuid_cache = TTLCache('puuid', MAX_PUUID_CACHE_SIZE, PUUID_CACHE_TTL)
+# 召唤师名称中需要移除的不可见控制字符
+_NAME_CONTROL_CHARS = re.compile(r'[\u200e-\u200f\u202a-\u202e\u2066-\u2069]')
+
+# 同一召唤师名的并发查询只向 LCU 发起一次
+puuid_flight = SingleFlight('puuid')
+
+# 召唤师信息缓存：{('puuid', puuid) | ('id', summonerId): summoner_dict}
+SUMMONER_CACHE_TTL = 600  # 缓存10分钟
+MAX_SUMMONER_CACHE_SIZE = 500
+_summoner_cache = TTLCache('summoner', MAX_SUMMONER_CACHE_SIZE, SUMMONER_CACHE_TTL)
+
+# 批量接口是否可用：{(port, kind): bool}，返回以下状态码时该端口不再尝试批量接口
+# （超时、连接失败等没有响应的情况不计入，下次仍会尝试）
+BULK_UNSUPPORTED_STATUSES = (404, 405, 501)
+_bulk_support = {}
+_bulk_lock = threading.Lock()
+_bulk_stats = {'bulk_requests': 0, 'bulk_resolved': 0, 'single_fallbacks': 0}
+
+# 批量接口不可用时，单个查询的并发线程数
+BULK_FALLBACK_WORKERS = 8
+_single_lookup_pool = ThreadPoolExecutor(max_workers=BULK_FALLBACK_WORKERS, thread_name_prefix='lcu-summoner')
+
+# 排位端点候选（按优先级）：(标签, 路径模板, 所需参数)
+_RANKED_ENDPOINTS = (
+    ("lol-ranked/v1/ranked-stats/puuid", "/lol-ranked/v1/ranked-stats/{puuid}", 'puuid'),
+    ("lol-ranked/v1/ranked-stats/by-puuid-legacy", "/lol-ranked/v1/ranked-stats/by-puuid/{puuid}", 'puuid'),
+    ("lol-ranked/v1/ranked-stats/by-id", "/lol-ranked/v1/ranked-stats/{summoner_id}", 'summoner_id'),
+    ("lol-ranked/v2/summoner", "/lol-ranked/v2/summoner/{summoner_id}", 'summoner_id'),
+    ("lol-league/v1/entries/by-summoner", "/lol-league/v1/entries/by-summoner/{summoner_id}", 'summoner_id'),
+    ("lol-league/v1/positions/by-summoner", "/lol-league/v1/positions/by-summoner/{summoner_id}", 'summoner_id'),
+)
+
+# 排位信息缓存：{('puuid', puuid) | ('id', summonerId): ranked_dict}，对局中段位不会变化
+RANKED_CACHE_TTL = 300
+# 所有端点都没有数据（未定级玩家或端点暂时不可用）时，空结果只缓存较短时间
+RANKED_EMPTY_TTL = 60
+MAX_RANKED_CACHE_SIZE = 300
+_ranked_cache = TTLCache('ranked', MAX_RANKED_CACHE_SIZE, RANKED_CACHE_TTL)
+
+# 已确认可用的排位端点：{(port, 参数组合): 标签}，同一客户端会话内只探测一次
+_ranked_endpoints = {}
+_ranked_lock = threading.Lock()
+_ranked_stats = {'direct': 0, 'direct_misses': 0, 'races': 0, 'race_requests': 0}
+# 同一端口的首次探测只进行一次，其余调用等待探测结果后直接使用
+ranked_discovery_flight = SingleFlight('ranked_endpoint')
+_ranked_probe_pool = ThreadPoolExecutor(max_workers=len(_RANKED_ENDPOINTS), thread_name_prefix='lcu-ranked-probe')
 
 
 def get_current_summoner(token, port):
@@ -67,41 +105,51 @@ def get_puuid(token, port, summoner_name):
     Returns:
         str: PUUID，失败返回None
     """
-    # 定期清理缓存
-    _clean_puuid_cache()
-    
     # 检查缓存
-    if summoner_name in _puuid_cache:
-        cached_time, cached_puuid = _puuid_cache[summoner_name]
-        if time.time() - cached_time < PUUID_CACHE_TTL:
-            logger.debug(f"✅ 使用PUUID缓存 ({summoner_name})")
-            return cached_puuid
-    
-    endpoint = "/lol-summoner/v1/summoners"
-    
-    # 移除不可见的 Unicode 控制字符 (如 U+206E, U+2069 等 Bidi 字符)
-    # 同时保留 # 号用于 Riot ID 格式
-    CLEANR = re.compile(r'[\u200e-\u200f\u202a-\u202e\u2066-\u2069]')
-    cleaned_name = re.sub(CLEANR, '', summoner_name).strip() 
-
-    # 使用 make_request 发送请求
-    data = make_request(
-        "GET",
-        endpoint,
-        token,
-        port,
-        params={'name': cleaned_name}  # 使用查询参数传递清洗后的名称
-    )
-    
-    if data:
-        # Riot ID 查询返回的是一个包含 puuid 的字典
-        puuid = data.get('puuid')
-        if puuid:
-            # 缓存结果
-            _puuid_cache[summoner_name] = (time.time(), puuid)
-            logger.debug(f"✅ 查询PUUID成功 ({summoner_name})")
-        return puuid
-    return None
+    cached_puuid = get_cached_puuid(summoner_name)
+    if cached_puuid is not None:
+        logger.debug(f"✅ 使用PUUID缓存 ({summoner_name})")
+        return cached_puuid
+
+    return puuid_flight.do((port, summoner_name), _fetch_puuid, token, port, summoner_name)
+
+
+def _clean_summoner_name(summoner_name):
+    """
+    移除不可见的 Unicode 控制字符 (如 U+206E, U+2069 等 Bidi 字符)
+    同时保留 # 号用于 Riot ID 格式
+    """
+    return _NAME_CONTROL_CHARS.sub('', summoner_name).strip()
+
+
+def get_cached_puuid(summoner_name):
+    """读取 PUUID 缓存，未命中返回None"""
+    return _puuid_cache.get(summoner_name)
+
+
+def puuid_request(summoner_name):
+    """
+    按召唤师名查询 PUUID 的请求参数（查询参数使用清洗后的名称）
+
+    Returns:
+        tuple: (method, endpoint, kwargs)
+    """
+    return "GET", "/lol-summoner/v1/summoners", {'params': {'name': _clean_summoner_name(summoner_name)}}
+
+
+def store_puuid(summoner_name, data):
+    """从查询结果中取出 PUUID 并写入缓存，失败返回None"""
+    puuid = data.get('puuid') if isinstance(data, dict) else None
+    if puuid:
+        _puuid_cache.put(summoner_name, puuid)
+        logger.debug(f"✅ 查询PUUID成功 ({summoner_name})")
+    return puuid
+
+
+def _fetch_puuid(token, port, summoner_name):
+    """向 LCU 查询 PUUID 并写入缓存（由 puuid_flight 合并并发调用）"""
+    method, endpoint, kwargs = puuid_request(summoner_name)
+    return store_puuid(summoner_name, make_request(method, endpoint, token, port, **kwargs))
 
 
 def get_summoner_by_id(token, port, summoner_id):
@@ -116,8 +164,12 @@ def get_summoner_by_id(token, port, summoner_id):
     Returns:
         dict: 召唤师信息
     """
-    endpoint = f"/lol-summoner/v1/summoners/{summoner_id}"
-    return make_request("GET", endpoint, token, port)
+    cached = get_cached_summoner('id', summoner_id)
+    if cached is not None:
+        return cached
+    info = make_request("GET", summoner_endpoint('id', summoner_id), token, port)
+    cache_summoner(info)
+    return info
 
 
 def get_summoner_by_puuid(token, port, puuid):
@@ -132,8 +184,172 @@ def get_summoner_by_puuid(token, port, puuid):
     Returns:
         dict: 召唤师信息
     """
-    endpoint = f"/lol-summoner/v1/summoners/by-puuid/{puuid}"
-    return make_request("GET", endpoint, token, port)
+    cached = get_cached_summoner('puuid', puuid)
+    if cached is not None:
+        return cached
+    info = make_request("GET", summoner_endpoint('puuid', puuid), token, port)
+    cache_summoner(info)
+    return info
+
+
+def get_cached_summoner(kind, key):
+    """读取召唤师缓存（kind 为 'puuid' 或 'id'），未命中返回None"""
+    return _summoner_cache.get((kind, key))
+
+
+def summoner_endpoint(kind, key):
+    """按 puuid（kind='puuid'）或 summonerId（kind='id'）查询单个召唤师的端点"""
+    if kind == 'puuid':
+        return f"/lol-summoner/v1/summoners/by-puuid/{key}"
+    return f"/lol-summoner/v1/summoners/{key}"
+
+
+def cache_summoner(info):
+    """把召唤师信息按 puuid 和 summonerId 写入共享缓存"""
+    if not isinstance(info, dict):
+        return
+    if info.get('puuid'):
+        _summoner_cache.put(('puuid', info['puuid']), info)
+    if info.get('summonerId'):
+        _summoner_cache.put(('id', info['summonerId']), info)
+
+
+class BulkSummonerLookup:
+    """
+    一次批量解析：缓存 -> 批量接口 -> 单个查询。
+
+    记录批量接口是否可用和统计信息，不发送请求：
+    调用方依次调用 bulk_request() / apply_bulk()，批量接口不可用时对 missing 逐个查询后调用 apply_singles()。
+
+    Args:
+        port: LCU端口
+        kind: 'puuid' 或 'id'
+        keys: puuid / summonerId 列表（自动去重）
+    """
+
+    def __init__(self, port, kind, keys):
+        self.port = port
+        self.kind = kind
+        self.result = {}
+        self.missing = []
+        for key in dict.fromkeys(k for k in keys if k):
+            cached = get_cached_summoner(kind, key)
+            if cached is not None:
+                self.result[key] = cached
+            else:
+                self.missing.append(key)
+
+    def bulk_request(self):
+        """
+        批量接口的请求参数；没有需要查询的 key 或该端口不支持批量接口时返回None
+
+        Returns:
+            tuple: (method, endpoint, kwargs)
+        """
+        if not self.missing or not _bulk_support.get((self.port, self.kind), True):
+            return None
+        with _bulk_lock:
+            _bulk_stats['bulk_requests'] += 1
+        if self.kind == 'puuid':
+            return "POST", "/lol-summoner/v2/summoners/puuid", {'json': self.missing}
+        return "GET", "/lol-summoner/v2/summoners", {'params': {'ids': json.dumps(self.missing)}}
+
+    def apply_bulk(self, status, data):
+        """
+        处理批量接口的响应
+
+        Returns:
+            bool: 批量接口已给出结果（未返回的玩家单独查询同样查不到，不再回退）
+        """
+        support_key = (self.port, self.kind)
+        if isinstance(data, list):
+            _bulk_support[support_key] = True
+            field = 'puuid' if self.kind == 'puuid' else 'summonerId'
+            wanted = set(self.missing)
+            for info in data:
+                if isinstance(info, dict) and info.get(field) in wanted:
+                    cache_summoner(info)
+                    self.result[info[field]] = info
+            with _bulk_lock:
+                _bulk_stats['bulk_resolved'] += len(data)
+            return True
+        if status in BULK_UNSUPPORTED_STATUSES:
+            # 端点不存在或不支持该方法：当前客户端没有该批量接口
+            logger.debug(f"⚠️ 批量召唤师接口不可用 ({self.kind}, {status})，改为并发单个查询")
+            _bulk_support[support_key] = False
+        return False
+
+    def apply_singles(self, infos):
+        """记录 missing 逐个查询的结果（infos 与 missing 一一对应）"""
+        with _bulk_lock:
+            _bulk_stats['single_fallbacks'] += len(self.missing)
+        for key, info in zip(self.missing, infos, strict=True):
+            if isinstance(info, dict):
+                self.result[key] = info
+
+
+def _resolve_bulk(token, port, kind, keys):
+    """
+    批量解析召唤师：缓存 -> 批量接口 -> 并发单个查询。
+
+    Returns:
+        dict: {key: summoner_dict}，查询失败的 key 不在结果中
+    """
+    lookup = BulkSummonerLookup(port, kind, keys)
+    if not lookup.missing:
+        return lookup.result
+
+    request = lookup.bulk_request()
+    if request is not None:
+        method, endpoint, kwargs = request
+        if lookup.apply_bulk(*request_with_status(method, endpoint, token, port, **kwargs)):
+            return lookup.result
+
+    single_lookup = get_summoner_by_puuid if kind == 'puuid' else get_summoner_by_id
+    lookup.apply_singles(_single_lookup_pool.map(lambda key: single_lookup(token, port, key), lookup.missing))
+    return lookup.result
+
+
+def get_summoners_by_puuids(token, port, puuids):
+    """
+    批量通过 puuid 获取召唤师信息。
+
+    优先使用 POST /lol-summoner/v2/summoners/puuid 一次查询全部，
+    不支持时回退为并发的单个查询。结果写入共享召唤师缓存。
+
+    Args:
+        token: LCU认证令牌
+        port: LCU端口
+        puuids: puuid 列表
+
+    Returns:
+        dict: {puuid: summoner_dict}
+    """
+    return _resolve_bulk(token, port, 'puuid', puuids)
+
+
+def get_summoners_by_ids(token, port, summoner_ids):
+    """
+    批量通过 summonerId 获取召唤师信息。
+
+    优先使用 GET /lol-summoner/v2/summoners?ids=[...] 一次查询全部，
+    不支持时回退为并发的单个查询。结果写入共享召唤师缓存。
+
+    Args:
+        token: LCU认证令牌
+        port: LCU端口
+        summoner_ids: summonerId 列表
+
+    Returns:
+        dict: {summonerId: summoner_dict}
+    """
+    return _resolve_bulk(token, port, 'id', summoner_ids)
+
+
+def get_bulk_summoner_stats():
+    """返回批量解析统计：bulk_requests / bulk_resolved / single_fallbacks"""
+    with _bulk_lock:
+        return dict(_bulk_stats)
 
 
 def get_summoner_by_name(token, port, name):
@@ -200,32 +416,152 @@ def _normalize_ranked_payload(payload, endpoint_tag):
     return None
 
 
-def get_ranked_stats(token, port, summoner_id=None, puuid=None):
-    """获取召唤师排位信息（支持按 PUUID 或 summonerId 查询）。"""
-    endpoints = []
+def _ranked_candidates(summoner_id, puuid):
+    params = {'puuid': puuid, 'summoner_id': summoner_id}
+    return [
+        (tag, template.format(**{key: params[key]}))
+        for tag, template, key in _RANKED_ENDPOINTS
+        if params[key]
+    ]
 
-    if puuid:
-        endpoints.append((f"/lol-ranked/v1/ranked-stats/{puuid}", "lol-ranked/v1/ranked-stats/puuid"))
-        endpoints.append((f"/lol-ranked/v1/ranked-stats/by-puuid/{puuid}", "lol-ranked/v1/ranked-stats/by-puuid-legacy"))
-
-    if summoner_id:
-        endpoints.extend([
-            (f"/lol-ranked/v1/ranked-stats/{summoner_id}", "lol-ranked/v1/ranked-stats/by-id"),
-            (f"/lol-ranked/v2/summoner/{summoner_id}", "lol-ranked/v2/summoner"),
-            (f"/lol-league/v1/entries/by-summoner/{summoner_id}", "lol-league/v1/entries/by-summoner"),
-            (f"/lol-league/v1/positions/by-summoner/{summoner_id}", "lol-league/v1/positions/by-summoner"),
-        ])
-
-    if not endpoints:
-        return {}
 
-    for endpoint, tag in endpoints:
-        payload = make_request("GET", endpoint, token, port)
-        normalized = _normalize_ranked_payload(payload, tag)
+def parse_ranked_response(tag, payload):
+    """把候选端点的响应统一为包含 queues 的字典（原始数据保留在 raw 中），没有可用数据返回None"""
+    normalized = _normalize_ranked_payload(payload, tag)
+    if normalized and 'raw' not in normalized:
+        normalized['raw'] = payload
+    return normalized
+
+
+class RankedLookup:
+    """
+    一次排位查询的共享状态：结果缓存、已记住的排位端点和探测统计。
+
+    不发送请求：调用方先检查 cached()，再按 remembered() 直接请求该端点或并发探测 candidates，
+    最后把结果交给 finish()。
+
+    Args:
+        port: LCU端口
+        summoner_id: 召唤师ID（可选）
+        puuid: 玩家PUUID（可选）
+    """
+
+    def __init__(self, port, summoner_id=None, puuid=None):
+        self.candidates = _ranked_candidates(summoner_id, puuid)
+        self.endpoints = dict(self.candidates)
+        self.cache_key = ('puuid', puuid) if puuid else ('id', summoner_id)
+        # 端点记录与首次探测按 (端口, 参数组合) 区分
+        kinds = '+'.join(kind for kind, value in (('puuid', puuid), ('summoner_id', summoner_id)) if value)
+        self.key = (port, kinds)
+        self.owner = (puuid, summoner_id)
+
+    def cached(self):
+        """缓存的结果（包括短期缓存的空结果）；没有可用参数时返回 {}，未命中返回None"""
+        if not self.candidates:
+            return {}
+        return _ranked_cache.get(self.cache_key)
+
+    def remembered(self):
+        """已确认可用的端点标签，没有时返回None"""
+        with _ranked_lock:
+            tag = _ranked_endpoints.get(self.key)
+        return tag if tag in self.endpoints else None
+
+    def record_direct(self, normalized):
+        """记录一次对已记住端点的直接请求"""
+        with _ranked_lock:
+            _ranked_stats['direct'] += 1
+            if not normalized:
+                _ranked_stats['direct_misses'] += 1
+
+    def record_race(self):
+        """记录一次对所有候选端点的并发探测"""
+        with _ranked_lock:
+            _ranked_stats['races'] += 1
+            _ranked_stats['race_requests'] += len(self.candidates)
+
+    def finish(self, tag, normalized):
+        """
+        记住可用端点并写入缓存，返回最终结果。
+
+        有数据时缓存 RANKED_CACHE_TTL 秒；所有端点都没有数据时缓存空结果 RANKED_EMPTY_TTL 秒。
+        """
+        if tag:
+            with _ranked_lock:
+                if _ranked_endpoints.get(self.key) != tag:
+                    logger.info(f"🎯 排位端点: {tag}")
+                _ranked_endpoints[self.key] = tag
         if normalized:
-            if 'raw' not in normalized:
-                normalized['raw'] = payload
+            _ranked_cache.put(self.cache_key, normalized)
             return normalized
+        _ranked_cache.put(self.cache_key, {}, ttl=RANKED_EMPTY_TTL)
+        return {}
+
+
+def _fetch_ranked(token, port, tag, endpoint):
+    return parse_ranked_response(tag, make_request("GET", endpoint, token, port))
+
+
+def _race_ranked(token, port, lookup):
+    """
+    并发请求所有候选端点，返回最先得到可用数据的 (标签, 数据)；都不可用返回 (None, None)。
+    其余请求不再等待，结果被丢弃。
+    """
+    lookup.record_race()
+    futures = {
+        _ranked_probe_pool.submit(_fetch_ranked, token, port, tag, endpoint): tag
+        for tag, endpoint in lookup.candidates
+    }
+    for future in as_completed(futures):
+        try:
+            normalized = future.result()
+        except Exception as e:
+            logger.debug(f"排位端点探测失败 {futures[future]}: {e}")
+            continue
+        if normalized:
+            return futures[future], normalized
+    return None, None
+
 
-    return {}
+def get_ranked_stats(token, port, summoner_id=None, puuid=None):
+    """
+    获取召唤师排位信息（支持按 PUUID 或 summonerId 查询）。
 
+    不同客户端版本可用的排位端点不同。首次查询时并发请求所有候选端点，
+    记住最先返回可用数据的端点，之后只请求该端点；
+    该端点查询失败时重新探测一次（结果可用则更新记录）。
+    查询成功的结果按 PUUID（没有时按 summonerId）缓存 RANKED_CACHE_TTL 秒；
+    所有端点都没有数据时缓存空结果 RANKED_EMPTY_TTL 秒，避免每次查询都重新探测全部端点。
+    """
+    lookup = RankedLookup(port, summoner_id, puuid)
+    cached = lookup.cached()
+    if cached is not None:
+        return cached
+
+    tag = lookup.remembered()
+    if tag:
+        normalized = _fetch_ranked(token, port, tag, lookup.endpoints[tag])
+        lookup.record_direct(normalized)
+        if not normalized:
+            logger.debug(f"排位端点 {tag} 未返回数据，重新探测")
+            tag, normalized = _race_ranked(token, port, lookup)
+    else:
+        # 首次探测：同一端口并发的调用只有一个发起探测，其余等待结果
+        tag, normalized, prober = ranked_discovery_flight.do(
+            lookup.key, lambda: (*_race_ranked(token, port, lookup), lookup.owner)
+        )
+        if prober != lookup.owner:
+            # 探测结果属于另一名玩家：直接请求探测出的端点，不可用时再自行探测
+            normalized = _fetch_ranked(token, port, tag, lookup.endpoints[tag]) if tag else None
+            if not normalized:
+                tag, normalized = _race_ranked(token, port, lookup)
+
+    return lookup.finish(tag, normalized)
+
+
+def get_ranked_endpoint_stats():
+    """返回排位端点探测统计：direct / direct_misses / races / race_requests / endpoints"""
+    with _ranked_lock:
+        snapshot = dict(_ranked_stats)
+        snapshot['endpoints'] = {f"{port}:{kinds}": tag for (port, kinds), tag in _ranked_endpoints.items()}
+    return snapshot
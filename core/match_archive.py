@@ -0,0 +1,315 @@
+"""
+本地对局存档
+把已结束的对局详情持久化到 SQLite，避免每次查看详情或重启后都重新请求 LCU
+
+- raw_games:      /lol-match-history/v1/games/{id} 的原始响应
+- enriched_games: 补全召唤师信息/海克斯符文后的结果（按 kind 区分 lol / tft）
+
+写入先进入内存待写表并由后台线程批量提交，读取会优先命中待写表；
+提交失败的数据保留在待写表中重试，多次失败后才丢弃（计入 dropped）。
+数据库使用 WAL 模式，读写互不阻塞。
+
+每张表最多保留 max_rows 条、max_age 秒内的对局，由后台写入线程定期清理最旧的数据。
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from config import MATCH_ARCHIVE_PATH
+from utils import json_codec
+from utils.logger import logger
+
+# 批量写入：凑满 BATCH_SIZE 条或等待 FLUSH_INTERVAL 秒后提交一次
+BATCH_SIZE = 32
+FLUSH_INTERVAL = 0.5
+# 提交失败时每条数据最多尝试的次数，以及失败后下一次提交前的等待（秒）
+MAX_WRITE_ATTEMPTS = 3
+WRITE_RETRY_DELAY = 1.0
+
+# 存档上限：每张表最多保留的对局数与保留时间（秒），每 PRUNE_INTERVAL 秒清理一次
+MAX_ARCHIVED_GAMES = 5000
+MAX_ARCHIVE_AGE = 90 * 24 * 3600
+PRUNE_INTERVAL = 600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw_games (
+    game_id     TEXT PRIMARY KEY,
+    payload     TEXT NOT NULL,
+    archived_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS enriched_games (
+    game_id     TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    archived_at REAL NOT NULL,
+    PRIMARY KEY (game_id, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_raw_games_archived_at ON raw_games (archived_at);
+CREATE INDEX IF NOT EXISTS idx_enriched_games_archived_at ON enriched_games (archived_at);
+"""
+
+
+class MatchArchive:
+    """
+    基于 SQLite 的对局存档。
+
+    数据库无法打开时（例如目录只读）自动停用，所有读取返回 None、写入被忽略。
+    """
+
+    def __init__(self, path, max_rows=MAX_ARCHIVED_GAMES, max_age=MAX_ARCHIVE_AGE):
+        self.path = path
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self._local = threading.local()
+        self._pending_lock = threading.Lock()
+        self._pending = {}  # {(table, game_id, kind): payload_json}
+        self._attempts = {}  # {key: 提交失败次数}，只在写入线程中访问
+        self._queue = queue.Queue()
+        self._writer = None
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self.enabled = True
+        self._next_prune = 0
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'hits': 0, 'misses': 0, 'writes': 0, 'batches': 0,
+            'write_errors': 0, 'dropped': 0, 'pruned': 0,
+        }
+
+    def _incr_stat(self, name, value=1):
+        with self._stats_lock:
+            self._stats[name] += value
+
+    # ------------------------------------------------------------------
+    # 连接管理
+    # ------------------------------------------------------------------
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _ensure_initialized(self):
+        if self._initialized:
+            return self.enabled
+        with self._init_lock:
+            if self._initialized:
+                return self.enabled
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                conn = self._connect()
+                conn.executescript(_SCHEMA)
+                conn.commit()
+                conn.close()
+                self._writer = threading.Thread(target=self._write_loop, name='match-archive-writer', daemon=True)
+                self._writer.start()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"⚠️ 对局存档不可用，已停用: {e}")
+                self.enabled = False
+            self._initialized = True
+        return self.enabled
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # 读写接口
+    # ------------------------------------------------------------------
+    def get_raw(self, game_id):
+        """读取原始对局数据，未存档返回 None"""
+        return self._get('raw_games', game_id, '')
+
+    def get_enriched(self, game_id, kind='lol'):
+        """读取补全后的对局数据，未存档返回 None"""
+        return self._get('enriched_games', game_id, kind)
+
+    def put_raw(self, game_id, payload):
+        """存档原始对局数据（立即序列化，之后调用方修改 payload 不影响存档）"""
+        self._put('raw_games', game_id, '', payload)
+
+    def put_enriched(self, game_id, game, kind='lol'):
+        """存档补全后的对局数据"""
+        self._put('enriched_games', game_id, kind, game)
+
+    def _get(self, table, game_id, kind):
+        if game_id is None or not self._ensure_initialized():
+            return None
+        key = (table, str(game_id), kind)
+        with self._pending_lock:
+            payload = self._pending.get(key)
+
+        if payload is None:
+            try:
+                if table == 'raw_games':
+                    row = self._reader().execute(
+                        "SELECT payload FROM raw_games WHERE game_id = ?", (key[1],)
+                    ).fetchone()
+                else:
+                    row = self._reader().execute(
+                        "SELECT payload FROM enriched_games WHERE game_id = ? AND kind = ?", (key[1], kind)
+                    ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ 读取对局存档失败 (game_id={game_id}): {e}")
+                row = None
+            payload = row[0] if row else None
+
+        if payload is None:
+            self._incr_stat('misses')
+            return None
+        self._incr_stat('hits')
+        return json_codec.loads(payload)
+
+    def _put(self, table, game_id, kind, data):
+        if game_id is None or not data or not self._ensure_initialized():
+            return
+        try:
+            payload = json_codec.dumps(data)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"⚠️ 对局数据无法序列化，跳过存档 (game_id={game_id}): {e}")
+            return
+        key = (table, str(game_id), kind)
+        with self._pending_lock:
+            self._pending[key] = payload
+        self._queue.put(key)
+
+    def flush(self, timeout=5):
+        """等待待写数据全部提交（主要用于退出前或脚本中）"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._pending_lock:
+                if not self._pending:
+                    return True
+            time.sleep(0.05)
+        return False
+
+    def stats(self):
+        with self._pending_lock:
+            pending = len(self._pending)
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        snapshot['pending'] = pending
+        snapshot['enabled'] = self.enabled
+        snapshot['path'] = self.path
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # 后台批量写入
+    # ------------------------------------------------------------------
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            keys = [self._queue.get()]
+            deadline = time.time() + FLUSH_INTERVAL
+            while len(keys) < BATCH_SIZE:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    keys.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if not self._write_batch(conn, keys):
+                time.sleep(WRITE_RETRY_DELAY)
+            if time.time() >= self._next_prune:
+                self._prune(conn)
+                self._next_prune = time.time() + PRUNE_INTERVAL
+
+    def _write_batch(self, conn, keys):
+        """提交一批待写数据，返回是否成功；失败的数据重新排队，超过 MAX_WRITE_ATTEMPTS 次后丢弃"""
+        with self._pending_lock:
+            rows = {key: self._pending[key] for key in keys if key in self._pending}
+        if not rows:
+            return True
+
+        now = time.time()
+        raw_rows = [(game_id, payload, now) for (table, game_id, _), payload in rows.items() if table == 'raw_games']
+        enriched_rows = [
+            (game_id, kind, payload, now)
+            for (table, game_id, kind), payload in rows.items() if table == 'enriched_games'
+        ]
+        try:
+            with conn:
+                if raw_rows:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO raw_games (game_id, payload, archived_at) VALUES (?, ?, ?)",
+                        raw_rows
+                    )
+                if enriched_rows:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO enriched_games (game_id, kind, payload, archived_at) VALUES (?, ?, ?, ?)",
+                        enriched_rows
+                    )
+        except sqlite3.Error as e:
+            self._incr_stat('write_errors')
+            self._retry_or_drop(rows, e)
+            return False
+
+        self._incr_stat('writes', len(rows))
+        self._incr_stat('batches')
+        # 提交后再从待写表移除（期间被覆盖的新值保留，等待下一批）
+        with self._pending_lock:
+            for key, payload in rows.items():
+                self._attempts.pop(key, None)
+                if self._pending.get(key) is payload:
+                    del self._pending[key]
+        return True
+
+    def _retry_or_drop(self, rows, error):
+        requeue, dropped = [], []
+        with self._pending_lock:
+            for key, payload in rows.items():
+                attempts = self._attempts.get(key, 0) + 1
+                if attempts < MAX_WRITE_ATTEMPTS:
+                    self._attempts[key] = attempts
+                    requeue.append(key)
+                    continue
+                self._attempts.pop(key, None)
+                if self._pending.get(key) is payload:
+                    del self._pending[key]
+                    dropped.append(key)
+                else:
+                    requeue.append(key)  # 期间写入了新值，按新值重新尝试
+        for key in requeue:
+            self._queue.put(key)
+
+        if dropped:
+            self._incr_stat('dropped', len(dropped))
+            logger.error(
+                f"❌ 写入对局存档失败 {MAX_WRITE_ATTEMPTS} 次，丢弃 {len(dropped)} 条 "
+                f"(game_id={', '.join(key[1] for key in dropped[:5])}): {error}"
+            )
+        else:
+            logger.warning(f"⚠️ 写入对局存档失败，{len(requeue)} 条稍后重试: {error}")
+
+    def _prune(self, conn):
+        """删除超过保留时间的对局，并把每张表裁剪到最新的 max_rows 条"""
+        cutoff = time.time() - self.max_age
+        removed = 0
+        try:
+            with conn:
+                for table in ('raw_games', 'enriched_games'):
+                    removed += conn.execute(f"DELETE FROM {table} WHERE archived_at < ?", (cutoff,)).rowcount
+                    removed += conn.execute(
+                        f"DELETE FROM {table} WHERE rowid NOT IN "
+                        f"(SELECT rowid FROM {table} ORDER BY archived_at DESC LIMIT ?)",
+                        (self.max_rows,)
+                    ).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 清理对局存档失败: {e}")
+            return 0
+        if removed:
+            self._incr_stat('pruned', removed)
+            logger.info(f"🧹 对局存档清理 {removed} 条旧数据")
+        return removed
+
+
+# 全局对局存档实例
+match_archive = MatchArchive(MATCH_ARCHIVE_PATH)
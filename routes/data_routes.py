@@ -2,17 +2,93 @@
 数据 API 路由模块
 处理所有数据获取的 API 端点
 """
-from flask import Blueprint, request, jsonify
-import requests
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 
 from config import app_state
 from core import lcu
-from utils.game_data_formatter import format_game_data
-from services.match_service import process_lol_match_history, process_single_tft_game, get_match_detail
+from core.lcu import aio
+from core.match_archive import match_archive
+from services.match_service import (
+    process_lol_match_history,
+    iter_lol_match_history,
+    iter_tft_match_history,
+    get_match_detail,
+)
 from services.opgg_service import fetch_champion_stats
+from services.phase_monitor import phase_monitor
+from services.cache_warmup import cache_warmer
+from services.auto_banpick import get_banpick_latency_stats
+from services.live_game_poller import live_game_poller, build_live_payload
+from utils.http_cache import (
+    compress_response,
+    history_etag,
+    is_not_modified,
+    match_etag,
+    not_modified,
+    with_etag,
+)
+
+# 轮询器快照在该时间（秒）内视为最新
+LIVE_SNAPSHOT_MAX_AGE = 1.5
+# 批量战绩查询的玩家数量上限与整体截止时间（秒）
+HISTORY_BATCH_MAX_PLAYERS = 16
+HISTORY_BATCH_DEADLINE = 25
+
+# 按 match_id 查询的对局详情不会变化，允许客户端直接复用一天
+MATCH_CACHE_CONTROL = 'private, max-age=86400'
 
 # 创建数据 API 蓝图
 data_bp = Blueprint('data', __name__)
+# 按 Accept-Encoding 压缩 JSON 响应
+data_bp.after_request(compress_response)
+
+
+def _wants_stream():
+    """查询参数 stream=1 时以 NDJSON 流式返回战绩"""
+    return request.args.get('stream', '').lower() in ('1', 'true')
+
+
+def _ndjson_response(meta, items):
+    """
+    NDJSON 流式响应：第一行为 meta（含 success），之后每处理完一场就发送一行对局摘要。
+
+    不在内存中保留整份摘要列表，前端可以边接收边渲染。
+    """
+    def generate():
+        yield current_app.json.dumps(meta) + '\n'
+        for item in items:
+            yield current_app.json.dumps(item) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def _lol_history_etag(puuid, page, count, history):
+    game_ids = [g.get('gameId') for g in history.get('games', {}).get('games', [])]
+    return history_etag('lol', puuid, page, count, game_ids)
+
+
+def _tft_history_etag(puuid, count, history):
+    game_ids = [
+        g.get('gameId') or (g.get('metadata') or {}).get('match_id')
+        for g in history.get('games', {}).get('games', []) if isinstance(g, dict)
+    ]
+    return history_etag('tft', puuid, 1, count, game_ids)
+
+
+def _cached_not_modified(puuid, summoner_name, lookup_cached, make_etag):
+    """
+    只用缓存校验 If-None-Match：PUUID 和战绩都在缓存中且 ETag 命中时返回 304 响应，否则返回 None。
+
+    ETag 由本页对局 ID 计算，缓存未命中时只能先向 LCU 获取战绩再校验。
+    """
+    if not request.if_none_match:
+        return None
+    puuid = puuid or lcu.get_cached_puuid(summoner_name)
+    history = lookup_cached(puuid) if puuid else None
+    if not history:
+        return None
+    etag = make_etag(puuid, history)
+    return not_modified(etag, weak=True) if is_not_modified(etag) else None
 
 
 @data_bp.route('/get_history', methods=['GET'])
@@ -25,6 +101,10 @@ def get_history():
         puuid: 或直接使用 puuid
         count: 每页数量 (默认20，最大200)
         page: 页码 (默认1，表示第1-20场；page=2表示第21-40场)
+        stream: 为 1 时以 NDJSON 流式返回（第一行 {"success", "page", "count"}，之后每行一场）
+
+    带 If-None-Match 时先用缓存中的 PUUID 和本页战绩校验，命中直接返回 304，不访问 LCU；
+    缓存未命中时需先从 LCU 获取战绩才能计算 ETag。
     
     Returns:
         JSON: 包含战绩数据的响应
@@ -45,6 +125,24 @@ def get_history():
             "message": "未连接到客户端"
         })
 
+    # 🚀 优化：默认只查询 20 场，支持分页查询
+    count = request.args.get('count', 20, type=int)  # 每页数量
+    count = min(max(count, 1), 200)  # 限制在1-200之间
+    
+    page = request.args.get('page', 1, type=int)  # 页码，从1开始
+    page = max(page, 1)  # 确保页码至少为1
+    
+    # 计算beginIndex: page=1 -> beginIndex=0; page=2 -> beginIndex=20
+    begin_index = (page - 1) * count
+
+    cached_response = _cached_not_modified(
+        puuid, summoner_name,
+        lambda p: lcu.get_cached_history_page(p, count, begin_index),
+        lambda p, h: _lol_history_etag(p, page, count, h),
+    )
+    if cached_response is not None:
+        return cached_response
+
     # 获取PUUID（若客户端未直接提供）
     token = app_state.lcu_credentials["auth_token"]
     port = app_state.lcu_credentials["app_port"]
@@ -56,16 +154,6 @@ def get_history():
                 "message": f"找不到召唤师 '{summoner_name}' 或 LCU API 失败"
             })
 
-    # 🚀 优化：默认只查询 20 场，支持分页查询
-    count = request.args.get('count', 20, type=int)  # 每页数量
-    count = min(max(count, 1), 200)  # 限制在1-200之间
-    
-    page = request.args.get('page', 1, type=int)  # 页码，从1开始
-    page = max(page, 1)  # 确保页码至少为1
-    
-    # 计算beginIndex: page=1 -> beginIndex=0; page=2 -> beginIndex=20
-    begin_index = (page - 1) * count
-    
     # 获取战绩
     history = lcu.get_match_history(token, port, puuid, count=count, begin_index=begin_index)
     if not history:
@@ -74,16 +162,99 @@ def get_history():
             "message": "获取战绩失败"
         })
     
+    # 本页对局未变化时直接返回 304，不重新处理
+    etag = _lol_history_etag(puuid, page, count, history)
+    if is_not_modified(etag):
+        return not_modified(etag, weak=True)
+
+    if _wants_stream():
+        return with_etag(_ndjson_response(
+            {"success": True, "page": page, "count": count},
+            iter_lol_match_history(history, puuid)
+        ), etag, weak=True)
+
     # 处理数据
     processed_games = process_lol_match_history(history, puuid)
     
     # OP.GG integration removed: processed_games contains core match info only.
     
-    return jsonify({
+    return with_etag(jsonify({
         "success": True, 
         "games": processed_games,
         "page": page,
         "count": count
+    }), etag, weak=True)
+
+
+@data_bp.route('/get_history_batch', methods=['POST'])
+def get_history_batch():
+    """
+    批量获取多名召唤师的战绩（整队分析时代替逐个请求 /get_history）
+
+    请求体 (JSON):
+        players: [{"name": "名称#TAG"} 或 {"puuid": "..."}]，最多 16 名
+        count: 每名玩家的场次 (默认20，最大200)
+
+    所有玩家并发查询，重复的名称 / puuid 只查询一次；与同时进行的 /get_history 请求共用同一次 LCU 查询。
+
+    Returns:
+        JSON: players 与请求顺序一致，每项为
+              {"name", "puuid", "success", "games"} 或 {"name", "puuid", "success": false, "message"}
+    """
+    body = request.get_json(silent=True) or {}
+    players = body.get('players')
+    if not isinstance(players, list) or not players:
+        return jsonify({
+            "success": False,
+            "message": "请求缺少玩家列表 (players)"
+        })
+    if len(players) > HISTORY_BATCH_MAX_PLAYERS:
+        return jsonify({
+            "success": False,
+            "message": f"一次最多查询 {HISTORY_BATCH_MAX_PLAYERS} 名玩家"
+        })
+    if any(not isinstance(p, dict) or not (p.get('name') or p.get('puuid')) for p in players):
+        return jsonify({
+            "success": False,
+            "message": "每名玩家需要提供召唤师名称 (name) 或 puuid"
+        })
+
+    if not app_state.is_lcu_connected():
+        return jsonify({
+            "success": False,
+            "message": "未连接到客户端"
+        })
+
+    token = app_state.lcu_credentials["auth_token"]
+    port = app_state.lcu_credentials["app_port"]
+
+    try:
+        count = int(body.get('count', 20))
+    except (TypeError, ValueError):
+        count = 20
+    count = min(max(count, 1), 200)
+
+    players = [{'name': p.get('name'), 'puuid': p.get('puuid')} for p in players]
+    results = aio.fetch_histories_sync(token, port, players, count=count, deadline=HISTORY_BATCH_DEADLINE)
+
+    messages = {
+        'not_found': "找不到该召唤师或 LCU API 失败",
+        'history_failed': "获取战绩失败",
+        'timeout': "查询超时",
+    }
+    entries = []
+    for player, result in zip(players, results, strict=True):
+        entry = {"name": player['name'], "puuid": result['puuid']}
+        if result['error']:
+            entry.update(success=False, message=messages[result['error']])
+        else:
+            entry.update(success=True, games=process_lol_match_history(result['history'], result['puuid']))
+        entries.append(entry)
+
+    return jsonify({
+        "success": True,
+        "players": entries,
+        "count": count
     })
 
 
@@ -96,6 +267,10 @@ def get_tft_history():
         name: 召唤师名称 (格式: 名称#TAG) 或
         puuid: 直接使用 puuid
         count: 可选，查询数量（默认20）
+        stream: 为 1 时以 NDJSON 流式返回全部 count 场（第一行 {"success", "count"}，之后每行一场）；
+                非流式只返回前 20 场
+
+    If-None-Match 的处理与 /get_history 相同（缓存命中时不访问 LCU）。
     """
     summoner_name = request.args.get('name')
     puuid = request.args.get('puuid')
@@ -112,6 +287,17 @@ def get_tft_history():
             "message": "未连接到客户端"
         })
 
+    count = request.args.get('count', 20, type=int)
+    count = min(max(count, 1), 200)
+
+    cached_response = _cached_not_modified(
+        puuid, summoner_name,
+        lambda p: lcu.get_cached_tft_history(p, count),
+        lambda p, h: _tft_history_etag(p, count, h),
+    )
+    if cached_response is not None:
+        return cached_response
+
     token = app_state.lcu_credentials["auth_token"]
     port = app_state.lcu_credentials["app_port"]
     if not puuid:
@@ -122,9 +308,6 @@ def get_tft_history():
                 "message": f"找不到召唤师 '{summoner_name}' 或 LCU API 失败"
             })
 
-    count = request.args.get('count', 20, type=int)
-    count = min(max(count, 1), 200)
-
     history = lcu.get_tft_match_history(token, port, puuid, count=count)
     if not history:
         return jsonify({
@@ -132,22 +315,23 @@ def get_tft_history():
             "message": "获取 TFT 战绩失败"
         })
 
+    etag = _tft_history_etag(puuid, count, history)
+    if is_not_modified(etag):
+        return not_modified(etag, weak=True)
+
+    if _wants_stream():
+        return with_etag(
+            _ndjson_response({"success": True, "count": count}, iter_tft_match_history(history, puuid, count)),
+            etag, weak=True
+        )
+
     # 只返回摘要字段供前端快速显示，不返回完整游戏数据
-    games = history.get('games', {}).get('games', [])[:20]
-    
-    # 为每场比赛提取摘要字段
-    summary_games = []
-    for idx, game in enumerate(games):
-        # 只添加摘要字段（快速显示在卡片上）
-        summary = process_single_tft_game(game, puuid)
-        summary['match_index'] = idx
-        
-        summary_games.append(summary)
+    summary_games = list(iter_tft_match_history(history, puuid))
 
-    return jsonify({
+    return with_etag(jsonify({
         "success": True,
         "games": summary_games
-    })
+    }), etag, weak=True)
 
 
 @data_bp.route('/get_summoner_rank', methods=['GET'])
@@ -213,11 +397,19 @@ def get_match():
         index: 在 /get_history 返回的 games 列表中的索引 (整数，0 表示最近一场)
         match_id: 对局 ID（可选，直接通过对局ID查询）
         is_tft: 是否为 TFT 对局（true/false）
+
+    对局数据按 gameId 带强 ETag；按 match_id 查询时 If-None-Match 命中直接返回 304，不访问 LCU。
+    召唤师信息补全不完整（部分参与者查询超时或失败）的对局不带 ETag，客户端下次重新请求。
     """
     summoner_name = request.args.get('name')
     index = request.args.get('index', type=int)
     match_id = request.args.get('match_id')
     is_tft = request.args.get('is_tft', 'false').lower() == 'true'
+    kind = 'tft' if is_tft else 'lol'
+
+    by_id = bool(match_id) and not is_tft
+    if by_id and is_not_modified(match_etag(kind, match_id)):
+        return not_modified(match_etag(kind, match_id), cache_control=MATCH_CACHE_CONTROL)
 
     if not app_state.is_lcu_connected():
         return jsonify({"success": False, "message": "未连接到客户端"}), 400
@@ -226,8 +418,17 @@ def get_match():
     port = app_state.lcu_credentials["app_port"]
 
     try:
-        game = get_match_detail(token, port, summoner_name, index, match_id, is_tft)
-        return jsonify({"success": True, "game": game})
+        game, complete = get_match_detail(token, port, summoner_name, index, match_id, is_tft)
+        game_id = match_id if by_id else (game.get('gameId') if isinstance(game, dict) else None)
+        if not game_id or not complete:
+            return jsonify({"success": True, "game": game})
+
+        # 按索引查询时索引对应的对局会随新对局变化，需要每次重新验证
+        etag = match_etag(kind, game_id)
+        cache_control = MATCH_CACHE_CONTROL if by_id else None
+        if is_not_modified(etag):
+            return not_modified(etag, cache_control=cache_control)
+        return with_etag(jsonify({"success": True, "game": game}), etag, cache_control=cache_control)
     except ValueError as e:
         return jsonify({"success": False, "message": str(e)}), 400
     except RuntimeError as e:
@@ -241,39 +442,16 @@ def get_match():
 def get_live_game_data():
     """
     获取实时游戏数据（从游戏API 2999端口）
+
+    有页面在观看时直接返回共享轮询器的最新快照，不再额外请求游戏 API。
     
     Returns:
         JSON: 格式化后的游戏数据（队友、敌人、游戏信息等）
     """
-    try:
-        # 尝试连接游戏客户端API（端口2999，减少timeout）
-        response = requests.get('https://127.0.0.1:2999/liveclientdata/allgamedata', 
-                               verify=False, timeout=2)
-        
-        if response.status_code == 200:
-            all_game_data = response.json()
-            formatted_data = format_game_data(all_game_data)
-            
-            # OP.GG integration removed: returning formatted game data without external stats.
-            
-            return jsonify({
-                "success": True,
-                "inGame": True,
-                "data": formatted_data
-            })
-        else:
-            return jsonify({
-                "success": False,
-                "inGame": False,
-                "message": "无法连接到游戏客户端"
-            })
-            
-    except requests.exceptions.RequestException:
-        return jsonify({
-            "success": False,
-            "inGame": False,
-            "message": "未在游戏中或游戏API不可用"
-        })
+    payload = live_game_poller.latest(max_age=LIVE_SNAPSHOT_MAX_AGE)
+    if payload is None:
+        payload = build_live_payload(lcu.get_live_game_data(timeout=2))
+    return jsonify(payload)
 
 
 @data_bp.route('/external/champion_stats', methods=['GET'])
@@ -299,3 +477,29 @@ def external_champion_stats():
         return jsonify({'success': True, 'data': data})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@data_bp.route('/get_perf_stats', methods=['GET'])
+def get_perf_stats():
+    """
+    返回内部性能计数器（连接池复用情况等），用于确认优化效果
+
+    Returns:
+        JSON: 各组件的统计信息
+    """
+    return jsonify({
+        "success": True,
+        "lcu_session": lcu.get_session_stats(),
+        "singleflight": lcu.get_singleflight_stats(),
+        "caches": lcu.get_cache_stats(),
+        "history_sync": lcu.get_history_sync_stats(),
+        "bulk_summoner": lcu.get_bulk_summoner_stats(),
+        "ranked_endpoint": lcu.get_ranked_endpoint_stats(),
+        "live_game_poller": live_game_poller.stats(),
+        "live_recording": lcu.get_live_recording_stats(),
+        "match_archive": match_archive.stats(),
+        "phase_monitor": phase_monitor.stats(),
+        "cache_warmup": cache_warmer.stats(),
+        "banpick_latency": get_banpick_latency_stats(),
+        "aio_client": aio.get_aio_stats(),
+    })
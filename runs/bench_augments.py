@@ -0,0 +1,89 @@
+"""
+海克斯天赋补全微基准
+
+比较旧实现（每个槽位调用 get_augment_info() 重建字典并线性查找）
+与预构建索引（每个槽位一次字典查找）处理一场 16 人斗魂竞技场对局的耗时。
+
+用法:
+    python runs/bench_augments.py [--rounds 200]
+"""
+import argparse
+import copy
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import constants  # noqa: E402
+from core.lcu.enrichment import enrich_game_with_augments  # noqa: E402
+
+
+def legacy_enrich_game_with_augments(game):
+    """优化前的实现（保留用于对比）"""
+    game_mode = game.get('gameMode')
+    for p in game.get('participants') or []:
+        stats = p.get('stats') or {}
+        for i in range(1, 7):
+            augment_id = stats.get(f'playerAugment{i}')
+            if augment_id and augment_id > 0:
+                mapped_id = augment_id + 1000 if game_mode == 'CHERRY' else augment_id
+                stats[f'augmentIcon{i}'] = constants.get_augment_icon_url(mapped_id)
+                aug_info_map = constants.get_augment_info()
+                aug = {}
+                for k, v in aug_info_map.items():
+                    if k == mapped_id or str(k) == str(mapped_id):
+                        aug = v or {}
+                        break
+                if aug and isinstance(aug, dict):
+                    stats[f'augmentName{i}'] = aug.get('name', '') or aug.get('title', '')
+                    stats[f'augmentDesc{i}'] = aug.get('desc', '') or aug.get('description', '')
+                else:
+                    stats[f'augmentName{i}'] = None
+                    stats[f'augmentDesc{i}'] = None
+            else:
+                stats[f'augmentIcon{i}'] = None
+                stats[f'augmentName{i}'] = None
+                stats[f'augmentDesc{i}'] = None
+    return game
+
+
+def make_arena_game():
+    ids = sorted(constants.get_augment_info())
+    # CHERRY 模式的原始ID = 映射ID - 1000，取靠后的ID让线性查找接近真实情况
+    raw_ids = [augment_id - 1000 for augment_id in ids[len(ids) // 2:]]
+    participants = []
+    for player in range(16):
+        stats = {f'playerAugment{i}': raw_ids[(player * 6 + i) % len(raw_ids)] for i in range(1, 7)}
+        participants.append({'participantId': player + 1, 'stats': stats})
+    return {'gameMode': 'CHERRY', 'participants': participants}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+
+    template = make_arena_game()
+    constants.get_augment_index()
+
+    legacy_result = legacy_enrich_game_with_augments(copy.deepcopy(template))
+    indexed_result = enrich_game_with_augments(copy.deepcopy(template))
+    if legacy_result != indexed_result:
+        print("❌ 新旧实现结果不一致")
+        return 1
+
+    games = [copy.deepcopy(template) for _ in range(args.rounds)]
+    legacy = timeit.timeit(lambda: legacy_enrich_game_with_augments(games.pop()), number=args.rounds)
+    games = [copy.deepcopy(template) for _ in range(args.rounds)]
+    indexed = timeit.timeit(lambda: enrich_game_with_augments(games.pop()), number=args.rounds)
+
+    print(f"16 人 × 6 槽位，{args.rounds} 轮")
+    print(f"旧实现:   {legacy / args.rounds * 1000:8.3f} ms/场")
+    print(f"预构建索引: {indexed / args.rounds * 1000:8.3f} ms/场")
+    print(f"加速比:   {legacy / indexed:8.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
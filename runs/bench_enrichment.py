@@ -0,0 +1,101 @@
+"""
+参与者信息补全基准测试
+
+用注入延迟的假 LCU（替换 core.lcu.summoner 的 make_request / request_with_status）比较三种方式的耗时与请求数:
+- 串行:   不支持批量接口，单线程逐个查询
+- 并发:   不支持批量接口，回退为并发单个查询
+- 批量:   使用 /lol-summoner/v2 批量接口
+
+用法:
+    python runs/bench_enrichment.py [--latency-ms 40] [--participants 10] [--rounds 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.lcu import enrichment, summoner  # noqa: E402
+
+
+def make_fake_lcu(latency, counter, bulk=False):
+    """返回一个模拟 LCU 延迟的 request_with_status：每三个 puuid 中有一个查不到，需回退到 summonerId"""
+    def by_puuid(puuid):
+        if int(puuid.split('-')[1]) % 3 == 0:
+            return None
+        return {'puuid': puuid, 'summonerId': 0, 'displayName': f'name-{puuid}', 'profileIconId': 1}
+
+    def by_id(sid):
+        return {'puuid': f'sid-{sid}', 'summonerId': int(sid), 'displayName': f'name-{sid}', 'profileIconId': 2}
+
+    def fake_request_with_status(method, endpoint, token, port, **kwargs):
+        counter.append(endpoint)
+        time.sleep(latency)
+        if endpoint == '/lol-summoner/v2/summoners/puuid':
+            return (200, [info for info in map(by_puuid, kwargs['json']) if info]) if bulk else (404, None)
+        if endpoint == '/lol-summoner/v2/summoners':
+            return (200, [by_id(sid) for sid in json.loads(kwargs['params']['ids'])]) if bulk else (404, None)
+        if '/by-puuid/' in endpoint:
+            info = by_puuid(endpoint.rsplit('/', 1)[-1])
+        elif endpoint.startswith('/lol-summoner/v1/summoners/'):
+            info = by_id(endpoint.rsplit('/', 1)[-1])
+        else:
+            info = None
+        return (200, info) if info else (404, None)
+    return fake_request_with_status
+
+
+def make_game(participants):
+    return {
+        'participants': [
+            {'participantId': i + 1, 'puuid': f'puuid-{i}', 'summonerId': 1000 + i}
+            for i in range(participants)
+        ],
+        'participantIdentities': [],
+    }
+
+
+def run(rounds, participants, latency, bulk=False):
+    """返回 (平均耗时 ms, 平均请求数)"""
+    timings = []
+    counter = []
+    fake = make_fake_lcu(latency, counter, bulk=bulk)
+    summoner.request_with_status = fake
+    summoner.make_request = lambda *args, **kwargs: fake(*args, **kwargs)[1]
+    for _ in range(rounds):
+        # 每轮清空缓存与批量接口探测结果，模拟首次查看对局
+        summoner._summoner_cache.clear()
+        summoner._bulk_support.clear()
+        game = make_game(participants)
+        started = time.perf_counter()
+        enrichment.enrich_game_with_summoner_info('token', 0, game)
+        timings.append(time.perf_counter() - started)
+        assert all(p.get('summonerName') for p in game['participants'])
+    return sum(timings) / len(timings) * 1000, len(counter) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=40)
+    parser.add_argument('--participants', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    pools = (enrichment._enrich_pool, summoner._single_lookup_pool)
+    enrichment._enrich_pool = summoner._single_lookup_pool = ThreadPoolExecutor(max_workers=1)
+    serial = run(args.rounds, args.participants, latency)
+    enrichment._enrich_pool, summoner._single_lookup_pool = pools
+    concurrent = run(args.rounds, args.participants, latency)
+    bulk = run(args.rounds, args.participants, latency, bulk=True)
+
+    print(f"参与者: {args.participants}，单次 LCU 延迟: {args.latency_ms:.0f} ms，轮数: {args.rounds}")
+    for label, (elapsed, requests) in (('串行', serial), ('并发', concurrent), ('批量', bulk)):
+        print(f"{label}补全: {elapsed:8.1f} ms  {requests:5.1f} 次请求  加速比 {serial[0] / elapsed:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+JSON 编解码基准测试
+
+比较标准库 json 与 utils/json_codec（当前后端，安装 orjson 时为 orjson）在战绩数据上的编码/解码耗时:
+- 单场对局:        /lol-match-history/v1/games/{id} 的原始响应（对局详情、存档）
+- 战绩 20 / 200 场: /lol-match-history/v1/products/lol/{puuid}/matches 的响应（make_request 解码）
+- 对局摘要 200 场:  process_lol_match_history 的结果（/get_history 的 jsonify）
+
+输入优先使用本地对局存档（core/match_archive.py 记录的真实对局），没有存档时用 --generate 生成模拟对局:
+    python runs/bench_json_codec.py
+    python runs/bench_json_codec.py --archive data/match_archive.db
+    python runs/bench_json_codec.py --generate 200
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import MATCH_ARCHIVE_PATH  # noqa: E402
+from services.match_service import process_lol_match_history  # noqa: E402
+from utils import json_codec  # noqa: E402
+
+CHAMPIONS = [1, 22, 51, 64, 81, 99, 103, 157, 222, 412]
+
+
+def load_archived_games(path, limit):
+    """读取存档中的原始对局（raw_games）"""
+    if not path or not os.path.exists(path):
+        return []
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("SELECT payload FROM raw_games LIMIT ?", (limit,)).fetchall()
+    except sqlite3.Error:
+        rows = []
+    finally:
+        conn.close()
+    return [json.loads(row[0]) for row in rows]
+
+
+def generate_games(count, seed=0):
+    """生成与 LCU 对局结构相同的模拟对局（10 名参赛者，完整 stats）"""
+    rng = random.Random(seed)
+    games = []
+    for n in range(count):
+        participants, identities = [], []
+        for i in range(10):
+            stats = {
+                key: rng.randint(0, 30000)
+                for key in (
+                    'kills', 'deaths', 'assists', 'goldEarned', 'totalMinionsKilled', 'neutralMinionsKilled',
+                    'totalDamageDealtToChampions', 'totalDamageTaken', 'visionScore', 'wardsPlaced',
+                    'champLevel', 'largestMultiKill', 'doubleKills', 'tripleKills', 'damageSelfMitigated',
+                    'magicDamageDealtToChampions', 'physicalDamageDealtToChampions', 'trueDamageDealt',
+                )
+            }
+            stats.update({f'item{k}': rng.randint(1000, 8000) for k in range(7)})
+            stats.update({f'perk{k}': rng.randint(8000, 8500) for k in range(6)})
+            stats['win'] = i < 5
+            participants.append({
+                'participantId': i + 1, 'teamId': 100 if i < 5 else 200,
+                'championId': CHAMPIONS[i], 'spell1Id': 4, 'spell2Id': 14, 'stats': stats,
+                'timeline': {'lane': 'MIDDLE', 'role': 'SOLO'},
+            })
+            identities.append({
+                'participantId': i + 1,
+                'player': {
+                    'puuid': f'{n:04d}-{i:02d}-' + 'a' * 60, 'gameName': f'玩家{i}', 'tagLine': 'TEST',
+                    'summonerId': 10 ** 9 + i, 'profileIcon': 29,
+                },
+            })
+        games.append({
+            'gameId': 7_000_000_000 + n, 'gameCreation': 1_700_000_000_000 + n * 3_600_000,
+            'gameDuration': rng.randint(900, 2400), 'gameMode': 'CLASSIC', 'queueId': 420, 'mapId': 11,
+            'gameVersion': '15.21.1', 'participants': participants, 'participantIdentities': identities,
+            'teams': [{'teamId': 100, 'win': 'Win'}, {'teamId': 200, 'win': 'Fail'}],
+        })
+    return games
+
+
+def timed(fn, arg, min_time=0.5):
+    """重复执行直到累计至少 min_time 秒，返回每次耗时（毫秒）"""
+    runs, started = 0, time.perf_counter()
+    while True:
+        fn(arg)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            return elapsed / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--archive', default=MATCH_ARCHIVE_PATH)
+    parser.add_argument('--generate', type=int, metavar='N', help='不读取存档，生成 N 场模拟对局')
+    args = parser.parse_args()
+
+    games = [] if args.generate else load_archived_games(args.archive, 200)
+    source = f'存档 {args.archive}'
+    if not games:
+        games = generate_games(args.generate or 200)
+        source = '模拟对局'
+    # 存档不足 200 场时循环填充
+    history = [games[i % len(games)] for i in range(200)]
+    puuid = history[0]['participantIdentities'][0]['player']['puuid'] if history[0].get('participantIdentities') else None
+
+    payloads = [
+        ('单场对局', history[0]),
+        ('战绩 20 场', {'games': {'games': history[:20]}}),
+        ('战绩 200 场', {'games': {'games': history}}),
+        ('对局摘要 200 场', process_lol_match_history({'games': {'games': history}}, puuid)),
+    ]
+
+    print(f"输入: {source}（{len(games)} 场），当前后端: {json_codec.BACKEND}")
+    print(f"{'数据':<14}{'大小':>9}  {'json 编码':>10}{'codec 编码':>11}{'json 解码':>10}{'codec 解码':>11}  加速(编/解)")
+    for name, payload in payloads:
+        encoded = json.dumps(payload).encode('utf-8')
+        std_enc = timed(lambda p: json.dumps(p).encode('utf-8'), payload)
+        codec_enc = timed(json_codec.dumps_bytes, payload)
+        std_dec = timed(json.loads, encoded)
+        codec_dec = timed(json_codec.loads, encoded)
+        print(
+            f"{name:<14}{len(encoded) / 1024:>7.0f}KB  {std_enc:>8.2f}ms{codec_enc:>9.2f}ms"
+            f"{std_dec:>8.2f}ms{codec_dec:>9.2f}ms  {std_enc / codec_enc:>5.1f}x / {std_dec / codec_dec:.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+实时对局数据处理基准测试
+
+以录制文件（见 core/lcu/live_recording.py）作为可复现的输入，测量:
+- format_game_data:            每帧完整格式化（遍历整局事件）
+- format_game_data + 增量事件: 轮询器的路径（LiveEventIngester 只处理新事件）
+- get_all_players_from_game:   队友/敌人分类（get_puuid 替换为本地查表，不访问 LCU）
+
+没有录制文件时可以用 --generate 生成一份模拟对局:
+    python runs/bench_live_game.py --generate runs/sample.lgr --minutes 30
+    python runs/bench_live_game.py runs/sample.lgr
+
+录制真实对局: 启动程序前设置环境变量 LOLHELPER_LIVE_RECORD=路径
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.lcu import live_game, summoner  # noqa: E402
+from core.lcu.live_recording import LiveRecorder, LiveRecording  # noqa: E402
+from services.live_events import LiveEventIngester  # noqa: E402
+from utils.game_data_formatter import format_game_data  # noqa: E402
+from utils.logger import logger  # noqa: E402
+
+CHAMPIONS = ['Ahri', 'Garen', 'Lux', 'Jinx', 'Thresh', 'LeeSin', 'Yasuo', 'Ezreal', 'Leona', 'Darius']
+
+
+def generate(path, minutes, seed=0):
+    """生成一份模拟 5v5 对局录制（每秒一帧，平均每 15 秒一次击杀）"""
+    rng = random.Random(seed)
+    players = [
+        {
+            'summonerName': f'player{i}#TEST',
+            'riotIdGameName': f'player{i}',
+            'riotIdTagLine': 'TEST',
+            'championName': CHAMPIONS[i],
+            'team': 'ORDER' if i < 5 else 'CHAOS',
+            'level': 1,
+            'scores': {'kills': 0, 'deaths': 0, 'assists': 0, 'creepScore': 0, 'wardScore': 0.0},
+            'items': [],
+        }
+        for i in range(10)
+    ]
+    events = [{'EventID': 0, 'EventName': 'GameStart', 'EventTime': 0.0}]
+    with mock.patch('core.lcu.live_recording.time.monotonic', side_effect=iter(range(10 ** 9))):
+        recorder = LiveRecorder(path)
+        for second in range(minutes * 60):
+            if rng.random() < 1 / 15:
+                killer, victim = rng.sample(range(10), 2)
+                players[killer]['scores']['kills'] += 1
+                players[victim]['scores']['deaths'] += 1
+                events.append({
+                    'EventID': len(events), 'EventName': 'ChampionKill', 'EventTime': float(second),
+                    'KillerName': players[killer]['summonerName'],
+                    'VictimName': players[victim]['summonerName'], 'Assisters': [],
+                })
+            for player in players:
+                player['level'] = min(18, 1 + second // 90)
+                player['scores']['creepScore'] = second // 8
+            recorder.record({
+                'activePlayer': {'summonerName': players[0]['summonerName'], 'level': players[0]['level']},
+                'allPlayers': [dict(p, scores=dict(p['scores'])) for p in players],
+                'events': {'Events': list(events)},
+                'gameData': {'gameMode': 'CLASSIC', 'gameTime': float(second), 'mapNumber': 11},
+            })
+        recorder.close()
+    print(f"已生成 {minutes} 分钟模拟对局（{len(events) - 1} 次击杀）: {path}")
+
+
+def timed(frames, fn):
+    started = time.perf_counter()
+    for frame in frames:
+        fn(frame)
+    return (time.perf_counter() - started) / len(frames) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('recording', nargs='?')
+    parser.add_argument('--generate', metavar='PATH')
+    parser.add_argument('--minutes', type=int, default=30)
+    args = parser.parse_args()
+
+    if args.generate:
+        generate(args.generate, args.minutes)
+        if not args.recording:
+            return
+    if not args.recording:
+        parser.error('需要录制文件路径（或使用 --generate 生成）')
+
+    logger.setLevel(logging.WARNING)
+    recording = LiveRecording(args.recording)
+    started = time.perf_counter()
+    frames = [frame for _, frame in recording.frames()]
+    load_ms = (time.perf_counter() - started) * 1000
+    recording.close()
+
+    ingester = LiveEventIngester()
+    seen = {'count': 0}
+
+    def incremental(frame):
+        events = frame['events']['Events']
+        ingester.ingest(events[seen['count']:], frame['allPlayers'])
+        seen['count'] = len(events)
+        format_game_data(
+            {**frame, 'events': {'Events': []}},
+            recent_kills=ingester.recent_kills(), kill_counters=ingester.counters(),
+        )
+
+    def classify(frame):
+        with mock.patch.object(live_game, 'get_live_game_data', return_value=frame):
+            return live_game.get_all_players_from_game('token', 0)
+
+    full_ms = timed(frames, format_game_data)
+    incremental_ms = timed(frames, incremental)
+    with mock.patch.object(summoner, 'get_puuid', side_effect=lambda token, port, name: f'puuid-{name}'):
+        classify_ms = timed(frames, classify)
+
+    size_kb = os.path.getsize(args.recording) / 1024
+    print(f"录制: {len(frames)} 帧，{recording.duration:.0f} 秒，{size_kb:.0f} KB，解码 {load_ms:.0f} ms")
+    print(f"format_game_data（完整事件）:  {full_ms:8.3f} ms/帧")
+    print(f"format_game_data（增量事件）:  {incremental_ms:8.3f} ms/帧")
+    print(f"get_all_players_from_game:     {classify_ms:8.3f} ms/帧")
+
+
+if __name__ == '__main__':
+    main()
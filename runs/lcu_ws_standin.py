@@ -0,0 +1,193 @@
+"""
+本地 LCU WebSocket 替身服务器
+
+实现 LCU 事件通道的最小子集（WAMP 订阅 + OnJsonApiEvent 推送），
+用于在没有英雄联盟客户端的机器上验证 core.lcu.events 的订阅/分发逻辑。
+
+用法:
+    python runs/lcu_ws_standin.py
+
+也可以在其他脚本中使用:
+    server = StandInLcuServer()
+    server.start()
+    event_bus.start('token', 0, url=server.url)
+    server.publish('/lol-gameflow/v1/gameflow-phase', 'ReadyCheck')
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+from wsproto import ConnectionType, WSConnection
+from wsproto.events import AcceptConnection, CloseConnection, Ping, Request, TextMessage
+from wsproto.utilities import RemoteProtocolError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.lcu.events import (  # noqa: E402
+    GAMEFLOW_PHASE_URI,
+    READY_CHECK_URI,
+    LcuEventBus,
+    topic_for_uri,
+)
+
+
+class _StandInClient:
+    def __init__(self, conn):
+        self.conn = conn
+        self.ws = WSConnection(ConnectionType.SERVER)
+        self.topics = set()
+        self.lock = threading.Lock()
+
+    def send(self, event):
+        with self.lock:
+            self.conn.sendall(self.ws.send(event))
+
+
+class StandInLcuServer:
+    """只接受本机连接的 WAMP 事件替身服务器"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._sock.listen()
+        self.host, self.port = self._sock.getsockname()
+        self._clients = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/"
+
+    def start(self):
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self
+
+    def wait_subscribed(self, uri, timeout=5):
+        """等待至少一个客户端订阅了指定 URI"""
+        topic = topic_for_uri(uri)
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._lock:
+                if any(topic in c.topics for c in self._clients):
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def publish(self, uri, data, event_type='Update'):
+        """向订阅了该 URI 的客户端推送一条事件"""
+        topic = topic_for_uri(uri)
+        message = json.dumps([8, topic, {'uri': uri, 'eventType': event_type, 'data': data}])
+        with self._lock:
+            clients = [c for c in self._clients if topic in c.topics]
+        for client in clients:
+            try:
+                client.send(TextMessage(data=message))
+            except OSError:
+                pass
+
+    def close(self):
+        self._closed = True
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.conn.close()
+            except OSError:
+                pass
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            client = _StandInClient(conn)
+            with self._lock:
+                self._clients.append(client)
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client):
+        buffer = ''
+        try:
+            while True:
+                data = client.conn.recv(4096)
+                if not data:
+                    break
+                client.ws.receive_data(data)
+                for event in client.ws.events():
+                    if isinstance(event, Request):
+                        subprotocol = 'wamp' if 'wamp' in event.subprotocols else None
+                        client.send(AcceptConnection(subprotocol=subprotocol))
+                    elif isinstance(event, TextMessage):
+                        buffer += event.data
+                        if not event.message_finished:
+                            continue
+                        message, buffer = buffer, ''
+                        try:
+                            parsed = json.loads(message)
+                        except ValueError:
+                            continue
+                        if isinstance(parsed, list) and len(parsed) >= 2 and parsed[0] == 5:
+                            client.topics.add(parsed[1])
+                    elif isinstance(event, Ping):
+                        client.send(event.response())
+                    elif isinstance(event, CloseConnection):
+                        client.send(event.response())
+                        return
+        except (OSError, RemoteProtocolError):
+            # 非 WebSocket 请求（例如误发到此端口的 HTTPS 请求）直接断开
+            pass
+        finally:
+            with self._lock:
+                if client in self._clients:
+                    self._clients.remove(client)
+            try:
+                client.conn.close()
+            except OSError:
+                pass
+
+
+def main():
+    server = StandInLcuServer().start()
+    bus = LcuEventBus()
+    bus.start('standin-token', server.port, url=server.url)
+
+    with bus.listen([GAMEFLOW_PHASE_URI, READY_CHECK_URI]) as subscription:
+        subscribed = all(server.wait_subscribed(uri) for uri in (GAMEFLOW_PHASE_URI, READY_CHECK_URI))
+        if not bus.wait_connected(5) or not subscribed:
+            print("❌ 事件总线未能连接到替身服务器")
+            return 1
+
+        latencies = []
+        for phase in ('Lobby', 'Matchmaking', 'ReadyCheck', 'ChampSelect'):
+            started = time.perf_counter()
+            server.publish(GAMEFLOW_PHASE_URI, phase)
+            event = subscription.get(timeout=2)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if event is None or event.data != phase:
+                print(f"❌ 未收到阶段推送: {phase}")
+                return 1
+
+        server.publish(READY_CHECK_URI, {'state': 'InProgress', 'playerResponse': 'None'})
+        event = subscription.get(timeout=2)
+        if event is None or event.uri != READY_CHECK_URI:
+            print("❌ 未收到 ready-check 推送")
+            return 1
+
+    bus.stop()
+    server.close()
+    print(f"✅ 收到 {bus.events_received} 条事件，平均推送延迟 {sum(latencies) / len(latencies):.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,57 +4,74 @@
 import time
 from config import app_state
 from core import lcu
+from core.lcu import events
+from services.phase_monitor import phase_monitor, PhaseTransition
 
 from utils.logger import logger
 
+# 单次等待阶段变化/事件的超时（秒），超时后重新检查开关状态
+EVENT_WAIT_TIMEOUT = 1.0
+
+
+def _is_ready_check_pending(ready_check):
+    """判断 ready-check 推送是否表示一个尚未响应的准备检查"""
+    if not isinstance(ready_check, dict):
+        return False
+    return ready_check.get('state') == 'InProgress' and ready_check.get('playerResponse') == 'None'
+
 
 def auto_accept_task(socketio):
     """
     自动接受对局的后台任务
+
+    阶段变化来自共享的 phase_monitor，ready-check 推送可用时会更早触发接受。
     
     Args:
         socketio: Flask-SocketIO实例，用于发送消息到前端
     """
-    last_phase = None
+    phase = None
     accepted_this_phase = False
 
     try:
-        while app_state.auto_accept_enabled:
-            if not app_state.is_lcu_connected():
-                time.sleep(0.5)
-                continue
-
-            try:
-                token = app_state.lcu_credentials["auth_token"]
-                port = app_state.lcu_credentials["app_port"]
-
-                phase = lcu.get_gameflow_phase(token, port)
-
-                # 状态重置逻辑：当阶段发生变化时
-                if phase != last_phase:
-                    last_phase = phase
-                    # 如果离开了 ReadyCheck 阶段，重置接受标志
-                    if phase != "ReadyCheck":
-                        accepted_this_phase = False
-
-                # ReadyCheck 阶段：自动接受对局
-                if phase == "ReadyCheck" and not accepted_this_phase:
-                    try:
-                        lcu.accept_ready_check(token, port)
-                        socketio.emit('status_update', {'type': 'biz', 'message': '✅ 已自动接受对局!'})
-                        logger.info("✅ 自动接受对局成功")
-                        accepted_this_phase = True
-                    except Exception as accept_error:
-                        # 如果接受失败，可能还需要重试，所以不设置 accepted_this_phase = True
-                        # 但为了避免刷屏，可以控制错误日志的频率（这里暂不处理，假设失败是少数情况）
-                        logger.warning(f"⚠️ 自动接受对局失败: {accept_error}")
-                        socketio.emit('status_update', {'type': 'biz', 'message': f'⚠️ 自动接受失败: {accept_error}'})
-                        time.sleep(1) # 失败后稍作等待
-
-            except Exception as e:
-                logger.error(f"❌ 自动接受任务异常: {e}")
-
-            time.sleep(1)
+        with phase_monitor.listen(extra_uris=[events.READY_CHECK_URI]) as inbox:
+            while app_state.auto_accept_enabled:
+                item = inbox.get(timeout=EVENT_WAIT_TIMEOUT)
+
+                if not app_state.is_lcu_connected():
+                    continue
+
+                try:
+                    token = app_state.lcu_credentials["auth_token"]
+                    port = app_state.lcu_credentials["app_port"]
+
+                    if isinstance(item, PhaseTransition):
+                        phase = item.new_phase
+                        # 如果离开了 ReadyCheck 阶段，重置接受标志
+                        if phase != "ReadyCheck":
+                            accepted_this_phase = False
+                        ready_check_pending = phase == "ReadyCheck"
+                    elif item is not None:
+                        ready_check_pending = _is_ready_check_pending(item.data)
+                    else:
+                        # 超时：仅在上次接受失败时重试
+                        ready_check_pending = phase == "ReadyCheck"
+
+                    # ReadyCheck 阶段：自动接受对局
+                    if ready_check_pending and not accepted_this_phase:
+                        try:
+                            lcu.accept_ready_check(token, port)
+                            socketio.emit('status_update', {'type': 'biz', 'message': '✅ 已自动接受对局!'})
+                            logger.info("✅ 自动接受对局成功")
+                            accepted_this_phase = True
+                        except Exception as accept_error:
+                            # 如果接受失败，可能还需要重试，所以不设置 accepted_this_phase = True
+                            # 但为了避免刷屏，可以控制错误日志的频率（这里暂不处理，假设失败是少数情况）
+                            logger.warning(f"⚠️ 自动接受对局失败: {accept_error}")
+                            socketio.emit('status_update', {'type': 'biz', 'message': f'⚠️ 自动接受失败: {accept_error}'})
+                            time.sleep(1) # 失败后稍作等待
+
+                except Exception as e:
+                    logger.error(f"❌ 自动接受任务异常: {e}")
     finally:
         app_state.auto_accept_thread = None
         app_state.auto_accept_enabled = False
@@ -2,10 +2,22 @@
 敌我分析服务
 """
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from config import app_state
 from core import lcu
+from services.cache_warmup import cache_warmer
+from services.phase_monitor import phase_monitor, PhaseTransition
+from services.player_form import push_roster_form
 from utils.logger import logger
 
+# 段位查询的并发线程数（需小于 LCU 连接池大小）
+RANK_MAX_WORKERS = 8
+# 首次推送前等待段位结果的最长时间（秒），之后返回的结果通过 rank_update 单独推送
+RANK_DEADLINE = 2.0
+
+_UNRANKED = {'tier': 'UNRANKED', 'division': '', 'lp': 0}
+
+_rank_pool = ThreadPoolExecutor(max_workers=RANK_MAX_WORKERS, thread_name_prefix='rank-lookup')
 
 
 def _get_player_rank_info(token, port, puuid):
@@ -23,11 +35,11 @@ def _get_player_rank_info(token, port, puuid):
     try:
         ranked_stats = lcu.get_ranked_stats(token, port, puuid=puuid)
         if not ranked_stats or not isinstance(ranked_stats, dict):
-            return {'tier': 'UNRANKED', 'division': '', 'lp': 0}
+            return dict(_UNRANKED)
         
         queues = ranked_stats.get('queues', [])
         if not queues:
-            return {'tier': 'UNRANKED', 'division': '', 'lp': 0}
+            return dict(_UNRANKED)
         
         # 查找单双排段位
         solo_queue = None
@@ -52,15 +64,65 @@ def _get_player_rank_info(token, port, puuid):
                 'lp': lp
             }
         
-        return {'tier': 'UNRANKED', 'division': '', 'lp': 0}
+        return dict(_UNRANKED)
     except Exception as e:
         logger.warning(f"⚠️ 获取段位信息失败: {str(e)}")
-        return {'tier': 'UNRANKED', 'division': '', 'lp': 0}
+        return dict(_UNRANKED)
+
+
+def _resolve_ranks(token, port, puuids, socketio, deadline=RANK_DEADLINE):
+    """
+    并发查询一组玩家的段位，最多等待 deadline 秒。
+
+    超时未返回的玩家先标记为查询中（rank.pending），结果返回后
+    通过 rank_update 事件推送给前端，不阻塞首次的 teammates_found / enemies_found。
+
+    Args:
+        token: LCU认证令牌
+        port: LCU端口
+        puuids: 玩家PUUID列表
+        socketio: SocketIO实例，用于推送迟到的结果
+        deadline: 最长等待时间（秒）
+
+    Returns:
+        dict: {puuid: rank_info}
+    """
+    futures = {}
+    for puuid in puuids:
+        if puuid and puuid not in futures:
+            futures[puuid] = _rank_pool.submit(_get_player_rank_info, token, port, puuid)
+    if not futures:
+        return {}
+
+    _, not_done = wait(futures.values(), timeout=deadline)
+    ranks = {}
+    for puuid, future in futures.items():
+        if future in not_done:
+            ranks[puuid] = {**_UNRANKED, 'pending': True}
+            future.add_done_callback(lambda f, puuid=puuid: _emit_late_rank(socketio, puuid, f))
+        else:
+            ranks[puuid] = future.result()
+
+    if not_done:
+        logger.info(f"⏱️ {len(not_done)}/{len(futures)} 名玩家段位未在 {deadline}s 内返回，稍后单独推送")
+    return ranks
+
+
+def _emit_late_rank(socketio, puuid, future):
+    """迟到的段位结果单独推送（_get_player_rank_info 内部已处理异常）"""
+    try:
+        rank_info = future.result()
+    except Exception as e:
+        logger.warning(f"⚠️ 获取段位信息失败: {e}")
+        rank_info = dict(_UNRANKED)
+    socketio.emit('rank_update', {'puuid': puuid, 'rank': rank_info})
 
 
 def auto_analyze_task(socketio):
     """
     敌我分析的后台任务
+
+    阶段变化来自共享的 phase_monitor（推送或统一轮询），本任务不再单独查询阶段。
     
     Args:
         socketio: Flask-SocketIO实例，用于发送消息到前端
@@ -68,76 +130,80 @@ def auto_analyze_task(socketio):
     enemy_retry_count = 0
     MAX_ENEMY_RETRIES = 10
     last_phase = None
+    phase = None
 
+    # 运行期间在选人/游戏阶段预热本局玩家的缓存
+    cache_warmer.enable()
     try:
-        while app_state.auto_analyze_enabled:
-            if not app_state.is_lcu_connected():
-                time.sleep(2)
-                continue
-
-            phase = None
-
-            try:
-                token = app_state.lcu_credentials["auth_token"]
-                port = app_state.lcu_credentials["app_port"]
-
-                phase = lcu.get_gameflow_phase(token, port)
-
-                # 检测到新的游戏流程开始，重置状态
-                if last_phase in ["Lobby", "None", None] and phase not in ["Lobby", "None"]:
-                    app_state.reset_analysis_state()
-                    enemy_retry_count = 0
-                    logger.info(f"🔄 检测到新游戏流程开始 ({last_phase} -> {phase})，重置分析状态")
-
-                # ChampSelect 阶段：分析队友战绩
-                elif phase == "ChampSelect" and not app_state.teammate_analysis_done:
-                    _analyze_teammates(token, port, socketio)
-
-                # InProgress/GameStart 阶段：分析敌人战绩
-                elif phase in ["InProgress", "GameStart"] and not app_state.enemy_analysis_done:
-                    if enemy_retry_count < MAX_ENEMY_RETRIES:
-                        enemy_retry_count += 1
-                        success = _analyze_enemies(token, port, socketio, enemy_retry_count, MAX_ENEMY_RETRIES)
-                        if not success:
-                            time.sleep(3)  # 失败后等待3秒重试
-                    else:
-                        # 达到最大重试次数
-                        socketio.emit('status_update', {'type': 'biz', 'message': '❌ 无法获取敌方信息，已停止重试'})
-                        app_state.enemy_analysis_done = True
-                        logger.error(f"❌ 达到最大重试次数 ({MAX_ENEMY_RETRIES})，停止尝试")
-
-                # EndOfGame 阶段：显示提示
-                elif phase == "EndOfGame":
-                    # 只在刚进入 EndOfGame 时提示一次
-                    if last_phase != "EndOfGame":
-                        if app_state.teammate_analysis_done or app_state.enemy_analysis_done:
-                            socketio.emit('status_update', {'type': 'biz', 'message': '🏁 比赛结束，等待下一局...'})
-                            logger.info("🏁 游戏结束")
-
-                # 更新上一次的阶段
-                last_phase = phase
-
-            except Exception as e:
-                error_msg = f'敌我分析任务出错: {str(e)}'
-                socketio.emit('status_update', {'type': 'biz', 'message': f'❌ {error_msg}'})
-                logger.error(f"❌ 异常: {error_msg}")
-                time.sleep(5)
-                continue
-
-            if not app_state.auto_analyze_enabled:
-                break
+        with phase_monitor.listen() as inbox:
+            while app_state.auto_analyze_enabled:
+                if not app_state.is_lcu_connected():
+                    time.sleep(2)
+                    continue
+
+                # 等待阶段变化代替固定休眠：变化会立即唤醒，超时则沿用当前阶段继续处理（重试等）
+                item = inbox.get(timeout=_wait_interval(phase))
+                if isinstance(item, PhaseTransition):
+                    last_phase, phase = item.old_phase, item.new_phase
+                else:
+                    last_phase = phase
+
+                try:
+                    token = app_state.lcu_credentials["auth_token"]
+                    port = app_state.lcu_credentials["app_port"]
+
+                    # 检测到新的游戏流程开始，重置状态
+                    if last_phase in ["Lobby", "None", None] and phase not in ["Lobby", "None"]:
+                        app_state.reset_analysis_state()
+                        enemy_retry_count = 0
+                        logger.info(f"🔄 检测到新游戏流程开始 ({last_phase} -> {phase})，重置分析状态")
+
+                    # ChampSelect 阶段：分析队友战绩（重置后立即开始，不再等待下一轮）
+                    if phase == "ChampSelect" and not app_state.teammate_analysis_done:
+                        _analyze_teammates(token, port, socketio)
+
+                    # InProgress/GameStart 阶段：分析敌人战绩
+                    elif phase in ["InProgress", "GameStart"] and not app_state.enemy_analysis_done:
+                        if enemy_retry_count < MAX_ENEMY_RETRIES:
+                            enemy_retry_count += 1
+                            success = _analyze_enemies(token, port, socketio, enemy_retry_count, MAX_ENEMY_RETRIES)
+                            if not success:
+                                time.sleep(3)  # 失败后等待3秒重试
+                        else:
+                            # 达到最大重试次数
+                            socketio.emit('status_update', {'type': 'biz', 'message': '❌ 无法获取敌方信息，已停止重试'})
+                            app_state.enemy_analysis_done = True
+                            logger.error(f"❌ 达到最大重试次数 ({MAX_ENEMY_RETRIES})，停止尝试")
+
+                    # EndOfGame 阶段：显示提示
+                    elif phase == "EndOfGame":
+                        # 只在刚进入 EndOfGame 时提示一次
+                        if last_phase != "EndOfGame":
+                            if app_state.teammate_analysis_done or app_state.enemy_analysis_done:
+                                socketio.emit('status_update', {'type': 'biz', 'message': '🏁 比赛结束，等待下一局...'})
+                                logger.info("🏁 游戏结束")
+
+                except Exception as e:
+                    error_msg = f'敌我分析任务出错: {str(e)}'
+                    socketio.emit('status_update', {'type': 'biz', 'message': f'❌ {error_msg}'})
+                    logger.error(f"❌ 异常: {error_msg}")
+                    time.sleep(5)
+                    continue
 
-            # 循环等待时间
-            if phase in ["InProgress", "GameStart"] and not app_state.enemy_analysis_done:
-                time.sleep(1)
-            else:
-                time.sleep(2)
     finally:
+        cache_warmer.disable()
         app_state.auto_analyze_thread = None
         app_state.auto_analyze_enabled = False
         logger.info("🛑 敌我分析任务已退出")
 
 
+def _wait_interval(phase):
+    """根据当前阶段决定下一次检查前的等待时间"""
+    if phase in ["InProgress", "GameStart"] and not app_state.enemy_analysis_done:
+        return 1
+    return 2
+
+
 def _analyze_teammates(token, port, socketio):
     """
     分析队友战绩（ChampSelect阶段）
@@ -149,25 +215,26 @@ def _analyze_teammates(token, port, socketio):
     """
     session = lcu.get_champ_select_session(token, port)
     if session:
-        teammates = []
-        for team_member in session.get('myTeam', []):
-            puuid = team_member.get('puuid')
-            if puuid:
-                app_state.current_teammates.add(puuid)  # 记录队友PUUID
-                
-                # 获取段位信息
-                rank_info = _get_player_rank_info(token, port, puuid)
-                
-                teammates.append({
-                    'gameName': team_member.get('gameName', '未知'),
-                    'tagLine': team_member.get('tagLine', ''),
-                    'puuid': puuid,
-                    'rank': rank_info
-                })
+        members = [m for m in lcu.ChampSelectState.from_session(session).my_team if m.get('puuid')]
+        app_state.current_teammates.update(m['puuid'] for m in members)  # 记录队友PUUID
+        
+        # 并发获取段位信息
+        ranks = _resolve_ranks(token, port, [m['puuid'] for m in members], socketio)
+        
+        teammates = [
+            {
+                'gameName': team_member.get('gameName', '未知'),
+                'tagLine': team_member.get('tagLine', ''),
+                'puuid': team_member['puuid'],
+                'rank': ranks.get(team_member['puuid'], _UNRANKED)
+            }
+            for team_member in members
+        ]
         
         if teammates:
             socketio.emit('teammates_found', {'teammates': teammates})
             socketio.emit('status_update', {'type': 'biz', 'message': f'👥 发现 {len(teammates)} 名队友，开始分析战绩...'})
+            push_roster_form(token, port, [tm['puuid'] for tm in teammates], socketio)
             app_state.teammate_analysis_done = True
             logger.info(f"✅ 队友分析完成，共 {len(teammates)} 人")
             logger.info(f"📝 记录队友PUUID集合: {len(app_state.current_teammates)} 人")
@@ -182,24 +249,24 @@ def _ensure_teammates_from_live_game(token, port, socketio, players_data):
     if not teammate_entries:
         return
 
-    teammates = []
-    for entry in teammate_entries:
-        puuid = entry.get('puuid')
-        if not puuid:
-            continue
+    entries = [entry for entry in teammate_entries if entry.get('puuid')]
+    app_state.current_teammates.update(entry['puuid'] for entry in entries)
+    ranks = _resolve_ranks(token, port, [entry['puuid'] for entry in entries], socketio)
 
-        app_state.current_teammates.add(puuid)
-        rank_info = _get_player_rank_info(token, port, puuid)
-        teammates.append({
+    teammates = [
+        {
             'gameName': entry.get('gameName') or entry.get('summonerName', '未知'),
             'tagLine': entry.get('tagLine', ''),
-            'puuid': puuid,
-            'rank': rank_info
-        })
+            'puuid': entry['puuid'],
+            'rank': ranks.get(entry['puuid'], _UNRANKED)
+        }
+        for entry in entries
+    ]
 
     if teammates:
         socketio.emit('teammates_found', {'teammates': teammates})
         socketio.emit('status_update', {'type': 'biz', 'message': f'👥 发现 {len(teammates)} 名队友，开始分析战绩...'})
+        push_roster_form(token, port, [tm['puuid'] for tm in teammates], socketio)
         app_state.teammate_analysis_done = True
         logger.info(f"✅ (实时) 队友分析完成，共 {len(teammates)} 人")
         logger.info(f"📝 记录队友PUUID集合: {len(app_state.current_teammates)} 人")
@@ -241,16 +308,17 @@ def _analyze_enemies(token, port, socketio, retry_count, max_retries):
                     logger.info(f"🚫 过滤队友: {enemy.get('summonerName', '未知')}")
             enemies = filtered_enemies
         
-        # 为每个敌人添加段位信息
+        # 为每个敌人添加段位信息（整队并发查询）
+        ranks = _resolve_ranks(token, port, [enemy.get('puuid') for enemy in enemies], socketio)
         for enemy in enemies:
             puuid = enemy.get('puuid')
             if puuid:
-                rank_info = _get_player_rank_info(token, port, puuid)
-                enemy['rank'] = rank_info
+                enemy['rank'] = ranks[puuid]
         
         if len(enemies) > 0:
             socketio.emit('enemies_found', {'enemies': enemies})
             socketio.emit('status_update', {'type': 'biz', 'message': f'💥 发现 {len(enemies)} 名敌人，开始分析战绩...'})
+            push_roster_form(token, port, [enemy.get('puuid') for enemy in enemies], socketio)
             app_state.enemy_analysis_done = True
             logger.info(f"✅ 敌人分析完成，共 {len(enemies)} 人")
             return True
@@ -3,31 +3,28 @@
 在英雄选择阶段自动执行 ban 和 pick 操作
 """
 import time
+
 from config import app_state
 from core import lcu
+from core.lcu import events
+from core.lcu.champ_select import ChampSelectState
+from services.phase_monitor import phase_monitor, PhaseTransition
+from utils.latency_histogram import LatencyHistogram
+from utils.logger import logger
 
+# 等待阶段变化/会话推送的超时（秒）；事件通道不可用时也是选人会话的轮询间隔
+SESSION_POLL_INTERVAL = 0.5
 
-def _get_banned_and_picked_ids(session):
-    """获取已被禁用和已被选取的英雄ID集合"""
-    banned_ids = set()
-    picked_ids = set()
+# 动作从 isInProgress 到 PATCH 成功的延迟分布
+_action_latency = {
+    'ban': LatencyHistogram('ban_action'),
+    'pick': LatencyHistogram('pick_action'),
+}
 
-    for team in session.get('teams', []):
-        for ban in team.get('bans', []):
-            cid = ban.get('championId')
-            if cid:
-                banned_ids.add(cid)
 
-    actions = session.get('actions', [])
-    for action_group in actions:
-        if not isinstance(action_group, list):
-            continue
-        for a in action_group:
-            cid = a.get('championId')
-            if cid and a.get('completed'):
-                picked_ids.add(cid)
-    
-    return banned_ids, picked_ids
+def get_banpick_latency_stats():
+    """返回 ban/pick 动作延迟直方图"""
+    return {action_type: histogram.stats() for action_type, histogram in _action_latency.items()}
 
 
 def _get_candidates(ban_champion_id, pick_champion_id):
@@ -46,23 +43,23 @@ def _get_candidates(ban_champion_id, pick_champion_id):
     return ban_candidates, pick_candidates
 
 
-def _try_ban_champion(socketio, token, port, action_id, candidates, unavailable_ids):
-    """尝试自动禁用英雄"""
+def _try_ban_champion(socketio, token, port, action, candidates, unavailable_ids):
+    """尝试自动禁用英雄（action 为当前会话快照中的动作，无需再次请求会话）"""
     for cid in candidates:
         if not cid or cid in unavailable_ids:
             continue
         try:
-            success = complete_action(token, port, action_id, cid, action_type='ban')
+            success = complete_action(token, port, action.get('id'), cid, action_type='ban', action=action)
             if success:
                 app_state.ban_champion_id = cid
                 socketio.emit('status_update', {
                     'type': 'success',
                     'message': f'✅ 已自动禁用英雄 (ID: {cid})'
                 })
-                print(f"✅ 自动禁用英雄成功: {cid}")
+                logger.info(f"✅ 自动禁用英雄成功: {cid}")
                 return True
         except Exception as e:
-            print(f"⚠️ 自动禁用英雄失败: {e}")
+            logger.warning(f"⚠️ 自动禁用英雄失败: {e}")
             socketio.emit('status_update', {
                 'type': 'warning',
                 'message': f'⚠️ 自动禁用失败: {e}'
@@ -70,23 +67,23 @@ def _try_ban_champion(socketio, token, port, action_id, candidates, unavailable_
     return False
 
 
-def _try_pick_champion(socketio, token, port, action_id, candidates, unavailable_ids):
-    """尝试自动选择英雄"""
+def _try_pick_champion(socketio, token, port, action, candidates, unavailable_ids):
+    """尝试自动选择英雄（action 为当前会话快照中的动作，无需再次请求会话）"""
     for cid in candidates:
         if not cid or cid in unavailable_ids:
             continue
         try:
-            success = complete_action(token, port, action_id, cid, action_type='pick')
+            success = complete_action(token, port, action.get('id'), cid, action_type='pick', action=action)
             if success:
                 app_state.pick_champion_id = cid
                 socketio.emit('status_update', {
                     'type': 'success',
                     'message': f'✅ 已自动选择英雄 (ID: {cid})'
                 })
-                print(f"✅ 自动选择英雄成功: {cid}")
+                logger.info(f"✅ 自动选择英雄成功: {cid}")
                 return True
         except Exception as e:
-            print(f"⚠️ 自动选择英雄失败: {e}")
+            logger.warning(f"⚠️ 自动选择英雄失败: {e}")
             socketio.emit('status_update', {
                 'type': 'warning',
                 'message': f'⚠️ 自动选择失败: {e}'
@@ -105,179 +102,114 @@ def auto_banpick_task(socketio, ban_champion_id=None, pick_champion_id=None):
     """
     try:
         last_phase = None
+        phase = None
         ban_done = False
         pick_done = False
-        
-        while app_state.auto_banpick_enabled:
-            if not app_state.is_lcu_connected():
-                time.sleep(0.5)
-                continue
-
-            try:
-                token = app_state.lcu_credentials["auth_token"]
-                port = app_state.lcu_credentials["app_port"]
-
-                phase = lcu.get_gameflow_phase(token, port)
-
-                # ChampSelect 阶段：自动 ban/pick
-                if phase == "ChampSelect":
-                    if phase != last_phase:
-                        print("🎮 进入英雄选择阶段")
-                        socketio.emit('status_update', {
-                            'type': 'biz', 
-                            'message': '🎮 进入英雄选择阶段，准备自动 Ban/Pick'
-                        })
-                        last_phase = phase
-                        ban_done = False
-                        pick_done = False
-                    
-                    # 获取选人会话数据
-                    session = lcu.get_champ_select_session(token, port)
-                    if not session:
-                        time.sleep(0.5)
-                        continue
-                    
-                    # 获取本地玩家的 cellId
-                    local_player_cell_id = session.get('localPlayerCellId')
-                    if local_player_cell_id is None:
-                        time.sleep(0.5)
-                        continue
-                    
-                    # 收集当前已被禁用/已被选中的英雄ID
-                    banned_ids, picked_ids = _get_banned_and_picked_ids(session)
-                    unavailable_ids = banned_ids | picked_ids
-
-                    # 构建 Ban/Pick 候选列表
-                    ban_candidates, pick_candidates = _get_candidates(
-                        app_state.ban_champion_id, 
-                        app_state.pick_champion_id
-                    )
-                    
-                    # 处理 actions
-                    actions = session.get('actions', [])
-                    # 收集当前已被禁用/已被选中的英雄ID，用于跳过不可用的候选
-                    banned_ids = set()
-                    picked_ids = set()
-
-                    for team in session.get('teams', []):
-                        for ban in team.get('bans', []):
-                            cid = ban.get('championId')
-                            if cid:
-                                banned_ids.add(cid)
-
-                    for action_group in actions:
-                        if not isinstance(action_group, list):
+        in_progress_since = {}  # {action_id: 首次观察到 isInProgress 的时间}
+        state = ChampSelectState()
+        retry_pending = False  # 上一次尝试未成功，下一次即使没有变化也需要重试
+
+        with phase_monitor.listen(extra_uris=[events.CHAMP_SELECT_SESSION_URI]) as inbox:
+            while app_state.auto_banpick_enabled:
+                item = inbox.get(timeout=SESSION_POLL_INTERVAL)
+
+                if not app_state.is_lcu_connected():
+                    continue
+
+                push_mode = events.event_bus.connected
+                try:
+                    token = app_state.lcu_credentials["auth_token"]
+                    port = app_state.lcu_credentials["app_port"]
+
+                    session = None
+                    if isinstance(item, PhaseTransition):
+                        phase = item.new_phase
+                    elif item is not None:
+                        # 选人会话的推送本身就带有完整 session，无需再次请求
+                        if item.event_type == 'Delete' or phase != "ChampSelect":
                             continue
-                        for a in action_group:
-                            cid = a.get('championId')
-                            if cid and a.get('completed'):
-                                picked_ids.add(cid)
-
-                    # 构建 Ban/Pick 候选列表（主目标优先，其次备选队列）
-                    ban_candidates = []
-                    pick_candidates = []
-                    if ban_champion_id:
-                        ban_candidates.append(ban_champion_id)
-                    ban_candidates.extend(getattr(app_state, 'ban_candidate_ids', []) or [])
-
-                    if pick_champion_id:
-                        pick_candidates.append(pick_champion_id)
-                    pick_candidates.extend(getattr(app_state, 'pick_candidate_ids', []) or [])
-                    for action_group in actions:
-                        if not isinstance(action_group, list):
+                        session = item.data
+                    elif push_mode and phase == last_phase and not retry_pending:
+                        # 推送模式下会话变化会主动到达，超时无需处理；
+                        # 上次 ban/pick 未成功时会话可能不再变化，仍需在超时后主动拉取会话重试
+                        continue
+
+                    # ChampSelect 阶段：自动 ban/pick
+                    if phase == "ChampSelect":
+                        if phase != last_phase:
+                            logger.info("🎮 进入英雄选择阶段")
+                            socketio.emit('status_update', {
+                                'type': 'biz', 
+                                'message': '🎮 进入英雄选择阶段，准备自动 Ban/Pick'
+                            })
+                            last_phase = phase
+                            ban_done = False
+                            pick_done = False
+                            in_progress_since = {}
+                            state.reset()
+                        
+                        # 获取选人会话数据（推送模式下直接使用事件中的 session）
+                        if not isinstance(session, dict):
+                            session = lcu.get_champ_select_session(token, port)
+                        if not session:
                             continue
                         
-                        for action in action_group:
-                            if action.get('actorCellId') != local_player_cell_id:
-                                continue
-                            
+                        # 只在会话有变化（或上次尝试失败需要重试）时重新处理
+                        changes = state.ingest(session)
+                        if not changes and not retry_pending:
+                            continue
+                        if state.local_cell_id is None:
+                            continue
+
+                        # 当前已被禁用/已被选中的英雄ID，用于跳过不可用的候选
+                        unavailable_ids = state.unavailable_ids
+
+                        # 构建 Ban/Pick 候选列表（主目标优先，其次备选队列）
+                        ban_candidates, pick_candidates = _get_candidates(ban_champion_id, pick_champion_id)
+
+                        retry_pending = False
+                        for action in state.local_actions_in_progress():
                             action_id = action.get('id')
                             action_type = action.get('type', '').lower()
-                            is_in_progress = action.get('isInProgress', False)
-                            completed = action.get('completed', False)
-                            
-                            # 跳过已完成或未开始的动作
-                            if completed or not is_in_progress:
-                                continue
-                            
-                            # 自动 Ban：按候选顺序寻找第一个可用英雄
+                            # 记录动作开始进行的时间，用于统计到 PATCH 成功的延迟
+                            started = in_progress_since.setdefault(action_id, time.monotonic())
+
+                            # 自动 Ban / Pick：按候选顺序寻找第一个可用英雄
                             if action_type == 'ban' and not ban_done and ban_candidates:
-                                for cid in ban_candidates:
-                                    if not cid:
-                                        continue
-                                    if cid in banned_ids or cid in picked_ids:
-                                        continue
-                                    try:
-                                        success = complete_action(
-                                            token, port, action_id, cid,
-                                            action_type='ban'
-                                        )
-                                        if success:
-                                            ban_done = True
-                                            app_state.ban_champion_id = cid
-                                            socketio.emit('status_update', {
-                                                'type': 'success',
-                                                'message': f'✅ 已自动禁用英雄 (ID: {cid})'
-                                            })
-                                            print(f"✅ 自动禁用英雄成功: {cid}")
-                                            break
-                                    except Exception as e:
-                                        print(f"⚠️ 自动禁用英雄失败: {e}")
-                                        socketio.emit('status_update', {
-                                            'type': 'warning',
-                                            'message': f'⚠️ 自动禁用失败: {e}'
-                                        })
-                            
-                            # 自动 Pick：按候选顺序寻找第一个可用英雄
+                                ban_done = _try_ban_champion(
+                                    socketio, token, port, action, ban_candidates, unavailable_ids
+                                )
+                                if ban_done:
+                                    _action_latency['ban'].record(time.monotonic() - started)
+                                retry_pending = retry_pending or not ban_done
                             elif action_type == 'pick' and not pick_done and pick_candidates:
-                                for cid in pick_candidates:
-                                    if not cid:
-                                        continue
-                                    if cid in banned_ids or cid in picked_ids:
-                                        continue
-                                    try:
-                                        success = complete_action(
-                                            token, port, action_id, cid,
-                                            action_type='pick'
-                                        )
-                                        if success:
-                                            pick_done = True
-                                            app_state.pick_champion_id = cid
-                                            socketio.emit('status_update', {
-                                                'type': 'success',
-                                                'message': f'✅ 已自动选择英雄 (ID: {cid})'
-                                            })
-                                            print(f"✅ 自动选择英雄成功: {cid}")
-                                            break
-                                    except Exception as e:
-                                        print(f"⚠️ 自动选择英雄失败: {e}")
-                                        socketio.emit('status_update', {
-                                            'type': 'warning',
-                                            'message': f'⚠️ 自动选择失败: {e}'
-                                        })
-                
-                elif phase != "ChampSelect" and last_phase == "ChampSelect":
-                    print("🏁 离开英雄选择阶段")
-                    last_phase = phase
-                    ban_done = False
-                    pick_done = False
-                    socketio.emit("status_update", {
-                        "type": "auto_banpick_stopped",
-                        "message": "自动 Ban/Pick 已结束（离开英雄选择阶段）",
-})
-
-            except Exception as e:
-                print(f"❌ 自动 Ban/Pick 任务异常: {e}")
-
-            time.sleep(0.5)  # 更快的轮询以确保及时响应
+                                pick_done = _try_pick_champion(
+                                    socketio, token, port, action, pick_candidates, unavailable_ids
+                                )
+                                if pick_done:
+                                    _action_latency['pick'].record(time.monotonic() - started)
+                                retry_pending = retry_pending or not pick_done
+
+                    elif phase != "ChampSelect" and last_phase == "ChampSelect":
+                        logger.info("🏁 离开英雄选择阶段")
+                        last_phase = phase
+                        ban_done = False
+                        pick_done = False
+                        socketio.emit("status_update", {
+                            "type": "auto_banpick_stopped",
+                            "message": "自动 Ban/Pick 已结束（离开英雄选择阶段）",
+    })
+
+                except Exception as e:
+                    logger.error(f"❌ 自动 Ban/Pick 任务异常: {e}")
             
     finally:
         app_state.auto_banpick_thread = None
         app_state.auto_banpick_enabled = False
-        print("🛑 自动 Ban/Pick 任务已退出")
+        logger.info("🛑 自动 Ban/Pick 任务已退出")
 
 
-def complete_action(token, port, action_id, champion_id, action_type='pick'):
+def complete_action(token, port, action_id, champion_id, action_type='pick', action=None):
     """
     完成一个选人/禁用动作
     
@@ -287,6 +219,7 @@ def complete_action(token, port, action_id, champion_id, action_type='pick'):
         action_id: 动作ID
         champion_id: 英雄ID
         action_type: 动作类型 ('ban' 或 'pick')
+        action: 可选，调用方已持有的会话快照中的动作数据；提供时不再请求会话
     
     Returns:
         bool: 是否成功
@@ -295,22 +228,22 @@ def complete_action(token, port, action_id, champion_id, action_type='pick'):
 
     # LCU 要求完整的 TeamBuilderDirect-ChampSelectAction 结构，这里在原 action
     # 的基础上只覆盖 championId / completed / type，避免缺字段导致 500。
-    action = lcu.get_champ_select_session(token, port)
-    if not action:
-        return False
-
-    # 从当前 session 中找到对应 action 的完整数据
-    actions = action.get("actions", [])
-    found = None
-    for group in actions:
-        if not isinstance(group, list):
-            continue
-        for a in group:
-            if a.get("id") == action_id:
-                found = a
+    found = action if isinstance(action, dict) and action.get("id") == action_id else None
+    if found is None:
+        session = lcu.get_champ_select_session(token, port)
+        if not session:
+            return False
+
+        # 从当前 session 中找到对应 action 的完整数据
+        for group in session.get("actions", []):
+            if not isinstance(group, list):
+                continue
+            for a in group:
+                if a.get("id") == action_id:
+                    found = a
+                    break
+            if found:
                 break
-        if found:
-            break
 
     if not found:
         return False
@@ -322,11 +255,9 @@ def complete_action(token, port, action_id, champion_id, action_type='pick'):
         "type": action_type,
     }
 
-    # core.lcu.client.make_request expects "json" keyword for JSON body
-    response = lcu.make_request("PATCH", endpoint, token, port, json=payload)
-    
-    # 如果响应不为空且没有错误，认为成功
-    return response is not None
+    # LCU 对动作 PATCH 通常返回 204 No Content（无响应体），按状态码判断是否成功
+    status, _ = lcu.request_with_status("PATCH", endpoint, token, port, json=payload)
+    return status is not None and 200 <= status < 300
 
 
 def hover_champion(token, port, action_id, champion_id):
@@ -0,0 +1,217 @@
+"""
+对局缓存预热服务
+利用英雄选择阶段的空闲时间，提前把本局玩家的战绩、召唤师信息、段位写入缓存，
+之后点击任意玩家查看详情都直接命中内存。
+
+- ChampSelect:            预热 get_champ_select_session 中 myTeam 的所有玩家
+- GameStart / InProgress: 预热 get_all_players_from_game 中的所有玩家（队友已预热的直接命中缓存）
+- 阶段变化时取消尚未完成的预热；并发数受 WARMUP_MAX_WORKERS 限制
+- 每次预热的覆盖情况通过 stats() 输出（/get_perf_stats 的 cache_warmup）
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from config import app_state
+from core import lcu
+from services.phase_monitor import phase_monitor, PhaseTransition
+from utils.logger import logger
+
+# 预热的并发线程数（需小于 LCU 连接池大小，给界面请求留出连接）
+WARMUP_MAX_WORKERS = 4
+# 预热的战绩数量，与 /get_history 默认每页数量一致
+WARMUP_HISTORY_COUNT = 20
+# 游戏加载期间游戏内 API 尚不可用，获取玩家列表的重试间隔与次数
+ROSTER_RETRY_INTERVAL = 2.0
+ROSTER_MAX_ATTEMPTS = 30
+
+# 阶段 -> 预热阶段（GameStart 与 InProgress 视为同一阶段，不重复预热）
+_STAGES = {
+    'ChampSelect': 'champ_select',
+    'GameStart': 'in_game',
+    'InProgress': 'in_game',
+}
+
+
+class _WarmupJob:
+    """一次预热任务及其覆盖统计"""
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.cancelled = threading.Event()
+        self.started_at = time.time()
+        self.finished_at = None
+        self.players = 0
+        self.warmed = 0
+        self.partial = 0
+        self.failed = 0
+        self.futures = []
+
+    def snapshot(self):
+        done = self.warmed + self.partial + self.failed
+        return {
+            'stage': self.stage,
+            'players': self.players,
+            'warmed': self.warmed,
+            'partial': self.partial,
+            'failed': self.failed,
+            'skipped': max(self.players - done, 0) if self.finished_at else 0,
+            'coverage': round(self.warmed / self.players, 2) if self.players else 0.0,
+            'cancelled': self.cancelled.is_set(),
+            'elapsed': round((self.finished_at or time.time()) - self.started_at, 2),
+        }
+
+
+class CacheWarmer:
+    """
+    阶段驱动的缓存预热器。
+
+    enable() / disable() 按引用计数注册阶段监听，由使用方（敌我分析任务）在运行期间开启。
+    """
+
+    def __init__(self, max_workers=WARMUP_MAX_WORKERS):
+        self._lock = threading.Lock()
+        self._users = 0
+        self._job = None
+        self._last = None
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cache-warmup')
+        self._totals = {'jobs': 0, 'players': 0, 'warmed': 0, 'cancelled_jobs': 0}
+
+    def enable(self):
+        with self._lock:
+            self._users += 1
+            first = self._users == 1
+        if first:
+            phase_monitor.add_listener(self._on_transition, replay=True)
+
+    def disable(self):
+        with self._lock:
+            self._users = max(self._users - 1, 0)
+            last = self._users == 0
+        if last:
+            phase_monitor.remove_listener(self._on_transition)
+            self._cancel()
+
+    def stats(self):
+        with self._lock:
+            job, last = self._job, self._last
+            snapshot = dict(self._totals)
+            snapshot['enabled'] = self._users > 0
+        snapshot['current'] = job.snapshot() if job is not None else None
+        snapshot['last'] = last
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # 阶段驱动
+    # ------------------------------------------------------------------
+    def _on_transition(self, transition):
+        if not isinstance(transition, PhaseTransition):
+            return
+        stage = _STAGES.get(transition.new_phase)
+        with self._lock:
+            current = self._job
+        if current is not None and current.stage == stage and not current.cancelled.is_set():
+            return
+        self._cancel()
+        if stage is None or not app_state.is_lcu_connected():
+            return
+
+        job = _WarmupJob(stage)
+        with self._lock:
+            self._job = job
+        # 回调在推送/监视线程中执行，预热放到独立线程
+        threading.Thread(target=self._run_job, args=(job,), name='cache-warmup-job', daemon=True).start()
+
+    def _cancel(self):
+        with self._lock:
+            job, self._job = self._job, None
+        if job is None:
+            return
+        job.cancelled.set()
+        for future in job.futures:
+            future.cancel()
+
+    # ------------------------------------------------------------------
+    # 预热任务
+    # ------------------------------------------------------------------
+    def _run_job(self, job):
+        token = app_state.lcu_credentials["auth_token"]
+        port = app_state.lcu_credentials["app_port"]
+        try:
+            puuids = self._resolve_roster(job, token, port)
+            if puuids and not job.cancelled.is_set():
+                job.players = len(puuids)
+                logger.info(f"🔥 开始预热 {len(puuids)} 名玩家的缓存 ({job.stage})")
+                job.futures = [
+                    self._pool.submit(self._warm_player, job, token, port, puuid)
+                    for puuid in puuids
+                ]
+                if job.cancelled.is_set():
+                    for future in job.futures:
+                        future.cancel()
+                wait(job.futures)
+        except Exception as e:
+            logger.error(f"❌ 缓存预热异常: {e}")
+        finally:
+            job.finished_at = time.time()
+            self._finish(job)
+
+    def _resolve_roster(self, job, token, port):
+        if job.stage == 'champ_select':
+            state = lcu.ChampSelectState.from_session(lcu.get_champ_select_session(token, port))
+            return list(dict.fromkeys(state.team_puuids))
+
+        # 游戏加载阶段游戏内 API 尚不可用，按间隔重试直到拿到玩家列表或被取消
+        for _ in range(ROSTER_MAX_ATTEMPTS):
+            players = lcu.get_all_players_from_game(token, port)
+            if players:
+                entries = (players.get('teammates') or []) + (players.get('enemies') or [])
+                return list(dict.fromkeys(p.get('puuid') for p in entries if p.get('puuid')))
+            if job.cancelled.wait(ROSTER_RETRY_INTERVAL):
+                break
+        return []
+
+    def _warm_player(self, job, token, port, puuid):
+        steps = (
+            lambda: lcu.get_summoner_by_puuid(token, port, puuid),
+            lambda: lcu.get_ranked_stats(token, port, puuid=puuid),
+            lambda: lcu.get_match_history(token, port, puuid, count=WARMUP_HISTORY_COUNT),
+        )
+        ok = 0
+        for step in steps:
+            if job.cancelled.is_set():
+                break
+            try:
+                # 无段位玩家的排位信息为 {}，同样视为预热成功；只有 None 表示请求失败
+                ok += step() is not None
+            except Exception as e:
+                logger.debug(f"预热失败 ({puuid}): {e}")
+
+        with self._lock:
+            if ok == len(steps):
+                job.warmed += 1
+            elif ok:
+                job.partial += 1
+            elif not job.cancelled.is_set():
+                job.failed += 1
+
+    def _finish(self, job):
+        snapshot = job.snapshot()
+        with self._lock:
+            if self._job is job:
+                self._job = None
+            self._last = snapshot
+            self._totals['jobs'] += 1
+            self._totals['players'] += job.players
+            self._totals['warmed'] += job.warmed
+            self._totals['cancelled_jobs'] += int(snapshot['cancelled'])
+        if job.players:
+            state = '已取消' if snapshot['cancelled'] else '完成'
+            logger.info(
+                f"🔥 缓存预热{state} ({job.stage}): {job.warmed}/{job.players} 名玩家，"
+                f"部分 {job.partial}，失败 {job.failed}，耗时 {snapshot['elapsed']}s"
+            )
+
+
+# 全局缓存预热器实例
+cache_warmer = CacheWarmer()
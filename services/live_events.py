@@ -0,0 +1,174 @@
+"""
+实时对局事件增量处理
+只拉取上次之后的新事件，维护最近击杀的环形缓冲区以及玩家/队伍击杀计数
+
+每个轮询周期的开销只与新事件数量有关，不随对局时长增长。
+"""
+from collections import deque
+
+from core import lcu
+
+# 击杀播报保留的最近条数（与 format_game_data 的最近10次击杀一致）
+KILL_FEED_SIZE = 10
+
+
+class LiveEventIngester:
+    """
+    增量事件处理器（非线程安全，由实时对局轮询任务独占使用）。
+
+    - ingest(events, players): 处理新事件，players 为 playerlist，用于把玩家映射到队伍
+    - recent_kills(): 最近击杀（最新在前），格式与 format_game_data 的 recentKills 相同
+    - counters(): {'players': {name: {kills, deaths, assists}}, 'teams': {team: kills}}
+    """
+
+    def __init__(self, kill_feed_size=KILL_FEED_SIZE):
+        self._kill_feed_size = kill_feed_size
+        self.reset()
+
+    def reset(self):
+        """清空状态（新对局开始或离开对局时调用）"""
+        self.last_event_id = -1
+        self.last_game_time = None
+        self._kills = deque(maxlen=self._kill_feed_size)
+        self._player_stats = {}
+        self._team_kills = {}
+
+    @property
+    def next_event_id(self):
+        return self.last_event_id + 1
+
+    def observe_game_time(self, game_time):
+        """
+        根据对局时间判断是否进入了新的对局（时间倒退即视为新对局）
+
+        Returns:
+            bool: 是否因新对局而重置
+        """
+        if not isinstance(game_time, (int, float)):
+            return False
+        reset = self.last_game_time is not None and game_time + 1 < self.last_game_time
+        if reset:
+            self.reset()
+        self.last_game_time = game_time
+        return reset
+
+    def ingest(self, events, players=None):
+        """
+        处理一批事件，已处理过的 EventID 会被忽略
+
+        Args:
+            events: /liveclientdata/eventdata 返回的事件列表
+            players: 可选，/liveclientdata/playerlist 返回的玩家列表
+
+        Returns:
+            int: 本次新处理的事件数
+        """
+        if not events:
+            return 0
+
+        # 事件ID从 0 开始；收到 GameStart 且已经处理过事件，说明进入了新的对局
+        first = events[0] if isinstance(events[0], dict) else {}
+        if first.get('EventName') == 'GameStart' and self.last_event_id >= 0 and first.get('EventID', 0) <= self.last_event_id:
+            self.reset()
+
+        teams = _player_teams(players)
+        processed = 0
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            event_id = event.get('EventID')
+            if not isinstance(event_id, int) or event_id <= self.last_event_id:
+                continue
+            self.last_event_id = event_id
+            processed += 1
+            if event.get('EventName') == 'ChampionKill':
+                self._record_kill(event, teams)
+        return processed
+
+    def _record_kill(self, event, teams):
+        killer = event.get('KillerName', '')
+        victim = event.get('VictimName', '')
+        assisters = event.get('Assisters') or []
+
+        self._kills.append({
+            'killer': killer,
+            'victim': victim,
+            'assisters': assisters,
+            'time': round(event.get('EventTime', 0), 1),
+        })
+
+        self._player(killer)['kills'] += 1
+        self._player(victim)['deaths'] += 1
+        for name in assisters:
+            self._player(name)['assists'] += 1
+
+        team = teams.get(killer)
+        if team:
+            self._team_kills[team] = self._team_kills.get(team, 0) + 1
+
+    def _player(self, name):
+        stats = self._player_stats.get(name)
+        if stats is None:
+            stats = self._player_stats[name] = {'kills': 0, 'deaths': 0, 'assists': 0}
+        return stats
+
+    def recent_kills(self):
+        """最近击杀列表，最新在前"""
+        return list(reversed(self._kills))
+
+    def counters(self):
+        return {
+            'players': {name: dict(stats) for name, stats in self._player_stats.items()},
+            'teams': dict(self._team_kills),
+        }
+
+
+def _player_teams(players):
+    """把事件中出现的玩家名称映射到队伍（事件里可能使用召唤师名或 Riot ID 名称）"""
+    teams = {}
+    for player in players or []:
+        if not isinstance(player, dict):
+            continue
+        team = player.get('team')
+        for key in ('summonerName', 'riotIdGameName', 'riotId'):
+            name = player.get(key)
+            if name:
+                teams[name] = team
+    return teams
+
+
+def fetch_live_game(ingester, timeout=2):
+    """
+    按固定数量的小请求获取实时对局数据，事件部分只增量拉取
+
+    Args:
+        ingester: LiveEventIngester 实例
+        timeout: 单次请求超时（秒）
+
+    Returns:
+        dict: 与 /liveclientdata/allgamedata 结构相同的数据（events 为空），未在游戏中返回 None
+    """
+    active_player = lcu.get_live_active_player(timeout=timeout)
+    if not active_player:
+        ingester.reset()
+        return None
+
+    players = lcu.get_live_player_list(timeout=timeout)
+    game_stats = lcu.get_live_game_stats(timeout=timeout)
+    if players is None or game_stats is None:
+        return None
+
+    ingester.observe_game_time(game_stats.get('gameTime'))
+    events = lcu.get_live_events(ingester.next_event_id, timeout=timeout)
+    if events:
+        ingester.ingest(events, players)
+
+    data = {
+        'activePlayer': active_player,
+        'allPlayers': players,
+        'gameData': game_stats,
+        'events': {'Events': []},
+    }
+    # 录制器按 EventID 去重，只需交给它本次的新事件
+    lcu.record_live_frame({**data, 'events': {'Events': events or []}})
+    return data
@@ -0,0 +1,180 @@
+"""
+实时对局轮询服务
+由唯一的后台任务轮询游戏内 API（端口 2999），把变化推送到 Socket.IO 的 live_game 房间
+
+- 客户端加入房间时推送完整快照（live_game_snapshot）
+- 之后每次轮询只推送与上一次快照的结构化差异（live_game_diff）
+- 无论打开多少个页面，游戏内 API 每个周期只请求一轮；没有观看者时停止轮询
+"""
+import threading
+import time
+
+from services.live_events import LiveEventIngester, fetch_live_game
+from utils.game_data_formatter import format_game_data
+from utils.logger import logger
+from utils.snapshot_diff import diff_snapshots
+
+LIVE_GAME_ROOM = 'live_game'
+
+# 游戏中 / 未在游戏中的轮询间隔（秒）
+IN_GAME_INTERVAL = 1.0
+IDLE_INTERVAL = 2.0
+# 单次请求游戏内 API 的超时（秒）
+FETCH_TIMEOUT = 2
+
+NOT_IN_GAME_PAYLOAD = {
+    "success": False,
+    "inGame": False,
+    "message": "未在游戏中或游戏API不可用",
+}
+
+
+def build_live_payload(all_game_data, ingester=None):
+    """
+    把游戏内 API 的原始数据转换为 /get_live_game_data 的响应结构
+
+    Args:
+        all_game_data: allgamedata 结构的数据，None 表示未在游戏中
+        ingester: 可选，LiveEventIngester；提供时击杀信息取自增量事件处理结果
+    """
+    if not all_game_data:
+        return dict(NOT_IN_GAME_PAYLOAD)
+    if ingester is not None:
+        data = format_game_data(
+            all_game_data,
+            recent_kills=ingester.recent_kills(),
+            kill_counters=ingester.counters(),
+        )
+    else:
+        data = format_game_data(all_game_data)
+    return {
+        "success": True,
+        "inGame": True,
+        "data": data,
+    }
+
+
+class LiveGamePoller:
+    """
+    共享的实时对局轮询器。
+
+    观看者通过 add_watcher / remove_watcher 注册（以 Socket.IO sid 区分），
+    有观看者时才运行轮询任务。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._socketio = None
+        self._watchers = set()
+        self._running = False
+        self._snapshot = None
+        self._snapshot_at = 0.0
+        self._seq = 0
+        self._ingester = LiveEventIngester()
+        self._stats = {'polls': 0, 'snapshots': 0, 'diffs': 0, 'diff_ops': 0, 'unchanged': 0}
+
+    def attach(self, socketio):
+        self._socketio = socketio
+
+    @property
+    def watchers(self):
+        return len(self._watchers)
+
+    def latest(self, max_age=None):
+        """
+        返回最近一次的快照
+
+        Args:
+            max_age: 可选，快照超过该秒数视为过期并返回 None
+        """
+        with self._lock:
+            if self._snapshot is None:
+                return None
+            if max_age is not None and time.time() - self._snapshot_at > max_age:
+                return None
+            return self._snapshot
+
+    def add_watcher(self, sid):
+        """
+        注册观看者，必要时启动轮询任务。
+
+        Returns:
+            dict: 带 seq 的当前完整快照（轮询刚启动时为 None，首次轮询后会推送到房间）
+        """
+        with self._lock:
+            self._watchers.add(sid)
+            snapshot = self._snapshot if self._running else None
+            seq = self._seq
+            if not self._running and self._socketio is not None:
+                self._running = True
+                self._snapshot = None
+                self._socketio.start_background_task(self._run)
+        if snapshot is None:
+            return None
+        return {**snapshot, "seq": seq}
+
+    def remove_watcher(self, sid):
+        with self._lock:
+            self._watchers.discard(sid)
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['watchers'] = len(self._watchers)
+            snapshot['running'] = self._running
+        snapshot['avg_diff_ops'] = (
+            round(snapshot['diff_ops'] / snapshot['diffs'], 1) if snapshot['diffs'] else 0.0
+        )
+        return snapshot
+
+    def _poll_once(self):
+        # 事件只增量拉取（见 services/live_events.py），开销不随对局时长增长
+        payload = build_live_payload(fetch_live_game(self._ingester, timeout=FETCH_TIMEOUT), self._ingester)
+
+        with self._lock:
+            previous = self._snapshot
+            self._snapshot = payload
+            self._snapshot_at = time.time()
+            self._stats['polls'] += 1
+
+            # 首次轮询或进入/离开游戏时推送完整快照，其余只推送差异
+            if previous is None or previous.get("inGame") != payload.get("inGame"):
+                self._seq += 1
+                self._stats['snapshots'] += 1
+                event, message = 'live_game_snapshot', {**payload, "seq": self._seq}
+            else:
+                ops = diff_snapshots(previous, payload)
+                if not ops:
+                    self._stats['unchanged'] += 1
+                    return payload
+                self._seq += 1
+                self._stats['diffs'] += 1
+                self._stats['diff_ops'] += len(ops)
+                event, message = 'live_game_diff', {"seq": self._seq, "ops": ops}
+
+        self._socketio.emit(event, message, to=LIVE_GAME_ROOM)
+        return payload
+
+    def _run(self):
+        logger.info("📡 实时对局轮询已启动")
+        try:
+            while True:
+                with self._lock:
+                    if not self._watchers:
+                        self._running = False
+                        break
+                try:
+                    payload = self._poll_once()
+                except Exception as e:
+                    logger.error(f"❌ 实时对局轮询异常: {e}")
+                    payload = None
+                in_game = bool(payload and payload.get("inGame"))
+                self._socketio.sleep(IN_GAME_INTERVAL if in_game else IDLE_INTERVAL)
+        finally:
+            with self._lock:
+                self._running = False
+            logger.info("🛑 实时对局轮询已停止（无观看者）")
+
+
+# 全局实时对局轮询器实例
+live_game_poller = LiveGamePoller()
@@ -8,7 +8,14 @@ from datetime import datetime
 import constants
 from core import lcu
 from core.lcu.enrichment import enrich_game_with_augments, enrich_tft_game_with_summoner_info
+from core.lcu.cache import TTLCache
+from core.match_archive import match_archive
+from utils.logger import logger
 
+# 对局摘要缓存：{(kind, gameId, puuid): summary}，除 time_ago 外的字段只取决于对局和玩家，不会变化
+SUMMARY_MEMO_SIZE = 4000  # 约 200 名玩家各 20 场
+SUMMARY_MEMO_TTL = 6 * 3600
+_summary_memo = TTLCache('game_summary', SUMMARY_MEMO_SIZE, SUMMARY_MEMO_TTL)
 
 
 def format_game_mode(mode):
@@ -48,6 +55,24 @@ def calculate_time_ago(timestamp_ms):
         return "刚刚"
 
 
+def _memoized_summary(kind, game_id, puuid, build):
+    """
+    按 (kind, gameId, puuid) 缓存不变的摘要字段，每次返回副本并按当前时间计算 time_ago。
+
+    没有 gameId 的对局不缓存。
+    """
+    key = (kind, game_id, puuid)
+    base = _summary_memo.get(key) if game_id else None
+    if base is None:
+        base = build()
+        if game_id and base:
+            _summary_memo.put(key, base)
+    summary = dict(base)
+    if summary:
+        summary['time_ago'] = calculate_time_ago(summary.get('game_creation'))
+    return summary
+
+
 def process_single_tft_game(game, puuid=None):
     """从单个 TFT 游戏对象中提取摘要字段（用于卡片快速显示）
 
@@ -55,6 +80,12 @@ def process_single_tft_game(game, puuid=None):
     """
     if not isinstance(game, dict):
         return {}
+    metadata = game.get('metadata')
+    match_id = metadata.get('match_id') if isinstance(metadata, dict) else None
+    return _memoized_summary('tft', match_id, puuid, lambda: _build_tft_summary(game, puuid))
+
+
+def _build_tft_summary(game, puuid):
 
     # TFT 数据在 json 字段中
     game_json = game.get('json')
@@ -168,9 +199,8 @@ def process_single_tft_game(game, puuid=None):
     summary['gameMode'] = game_mode
     summary['mode'] = format_game_mode(game_mode)
 
-    # 时间差（使用 gameCreation）
+    # 对局时间（time_ago 在返回时按 gameCreation 计算）
     game_creation = (game_json.get('gameCreation', 0) if isinstance(game_json, dict) else 0)
-    summary['time_ago'] = calculate_time_ago(game_creation)
     summary['game_creation'] = game_creation
 
     # 对局时长
@@ -185,19 +215,25 @@ def process_single_tft_game(game, puuid=None):
 
 
 def process_lol_match_history(history, puuid=None):
-    processed_games = []
+    return list(iter_lol_match_history(history, puuid))
+
+
+def iter_lol_match_history(history, puuid=None):
+    """逐场生成对局摘要（流式响应使用，不在内存中保留整份摘要列表）"""
     games = history.get('games', {}).get('games', [])
     for idx, game in enumerate(games):
         summary = process_single_lol_game(game, puuid)
         summary['match_index'] = idx
-        processed_games.append(summary)
-    return processed_games
+        yield summary
 
 
 def process_single_lol_game(game, puuid=None):
     if not isinstance(game, dict):
         return {}
+    return _memoized_summary('lol', game.get('gameId'), puuid, lambda: _build_lol_summary(game, puuid))
+
 
+def _build_lol_summary(game, puuid):
     summary = {}
     participants = game.get('participants', [])
     if not isinstance(participants, list):
@@ -306,9 +342,8 @@ def process_single_lol_game(game, puuid=None):
                 summary['placement'] = int(placement)
                 summary['subteamPlacement'] = int(placement)
 
-    # 时间差与时长
+    # 对局时间（time_ago 在返回时按 gameCreation 计算）与时长
     game_creation = game.get('gameCreation', 0)
-    summary['time_ago'] = calculate_time_ago(game_creation)
     summary['game_creation'] = game_creation
 
     game_length = game.get('gameDuration', 0)
@@ -321,13 +356,53 @@ def process_single_lol_game(game, puuid=None):
 
 
 def process_match_history(history, puuid=None):
-    processed_games = []
-    games = history.get('games', {}).get('games', [])[:20]
+    return list(iter_tft_match_history(history, puuid))
+
+
+def iter_tft_match_history(history, puuid=None, limit=20):
+    """逐场生成 TFT 对局摘要（最多 limit 场）"""
+    games = history.get('games', {}).get('games', [])[:limit]
     for idx, game in enumerate(games):
         summary = process_single_tft_game(game, puuid)
         summary['match_index'] = idx
-        processed_games.append(summary)
-    return processed_games
+        yield summary
+
+
+def _get_archived_game(token, port, game_match_id, is_tft=False):
+    """
+    按对局ID获取补全后的对局详情：优先读取本地存档，首次查看时从 LCU 获取、补全并存档
+
+    Returns:
+        tuple: (game, complete)，complete 表示补全完整（已存档）；LCU 查询失败返回 (None, False)
+    """
+    kind = 'tft' if is_tft else 'lol'
+    game = match_archive.get_enriched(game_match_id, kind)
+    if game is not None:
+        return game, True
+
+    full_game = lcu.get_match_by_id(token, port, game_match_id)
+    if not full_game:
+        return None, False
+    game = full_game.get('game') if (isinstance(full_game, dict) and 'game' in full_game) else full_game
+
+    try:
+        if is_tft:
+            complete = enrich_tft_game_with_summoner_info(token, port, game)
+        else:
+            complete = lcu.enrich_game_with_summoner_info(token, port, game)
+            enrich_game_with_augments(game)
+    except Exception as e:
+        # 补全失败的结果不存档，下次查看时重试
+        print(f"召唤师信息补全失败 (match_id={game_match_id}): {e}")
+        return game, False
+
+    if not complete:
+        # 部分参与者查询超时或失败：本次照常返回，不存档，下次查看时重新补全
+        logger.warning(f"⚠️ 对局 {game_match_id} 召唤师信息补全不完整，暂不存档")
+        return game, False
+
+    match_archive.put_enriched(game_match_id, game, kind)
+    return game, True
 
 
 def get_match_detail(token, port, summoner_name, index, match_id=None, is_tft=False):
@@ -335,24 +410,18 @@ def get_match_detail(token, port, summoner_name, index, match_id=None, is_tft=Fa
     获取完整对局详情 (LOL 或 TFT)
     
     Returns:
-        dict: 对局数据
+        tuple: (game, complete)，complete 为 False 时对局信息补全不完整（部分参与者查询超时或失败），
+               调用方不应让客户端长期缓存
     Raises:
         ValueError: 参数错误
         RuntimeError: LCU 连接或查询失败
     """
     # 如果有 match_id，直接通过 match_id 查询（仅支持 LOL）
     if match_id and not is_tft:
-        match_obj = lcu.get_match_by_id(token, port, match_id)
-        if match_obj:
-            game = match_obj.get('game') if (isinstance(match_obj, dict) and 'game' in match_obj) else match_obj
-            try:
-                lcu.enrich_game_with_summoner_info(token, port, game)
-                enrich_game_with_augments(game)
-            except Exception as e:
-                print(f"召唤师信息补全失败 (match_id path): {e}")
-            return game
-        else:
+        game, complete = _get_archived_game(token, port, match_id)
+        if game is None:
             raise RuntimeError("通过 match_id 获取对局失败")
+        return game, complete
 
     if not summoner_name or index is None:
         raise ValueError("缺少参数 name 或 index")
@@ -381,18 +450,19 @@ def get_match_detail(token, port, summoner_name, index, match_id=None, is_tft=Fa
         if not game_match_id:
             game_match_id = game_summary.get('matchId') or game_summary.get('gameId') or game_summary.get('match_id')
         
-        game = game_summary
         if game_match_id:
-            full_game = lcu.get_match_by_id(token, port, game_match_id)
-            if full_game:
-                game = full_game.get('game') if (isinstance(full_game, dict) and 'game' in full_game) else full_game
-        
+            game, complete = _get_archived_game(token, port, game_match_id, is_tft=True)
+            if game is not None:
+                return game, complete
+
+        game = game_summary
+        complete = False
         try:
-            enrich_tft_game_with_summoner_info(token, port, game)
+            complete = enrich_tft_game_with_summoner_info(token, port, game)
         except Exception as e:
             print(f"TFT 召唤师信息补全失败: {e}")
             
-        return game
+        return game, complete
     else:
         # LOL 战绩查询
         fetch_count = min(index + 20, 200)
@@ -407,16 +477,17 @@ def get_match_detail(token, port, summoner_name, index, match_id=None, is_tft=Fa
         game_summary = games[index]
         game_match_id = game_summary.get('matchId') or game_summary.get('gameId') or game_summary.get('match_id')
         
-        game = game_summary
         if game_match_id:
-            full_game = lcu.get_match_by_id(token, port, game_match_id)
-            if full_game:
-                game = full_game.get('game') if (isinstance(full_game, dict) and 'game' in full_game) else full_game
+            game, complete = _get_archived_game(token, port, game_match_id)
+            if game is not None:
+                return game, complete
 
+        game = game_summary
+        complete = False
         try:
-            lcu.enrich_game_with_summoner_info(token, port, game)
+            complete = lcu.enrich_game_with_summoner_info(token, port, game)
             enrich_game_with_augments(game)
         except Exception as e:
             print(f"召唤师信息补全失败: {e}")
 
-        return game
+        return game, complete
@@ -0,0 +1,202 @@
+"""
+游戏阶段监视服务
+统一负责 gameflow-phase 的获取，并把阶段变化广播给各个后台任务
+
+- 事件通道可用时，直接转发 LCU 推送的阶段变化（无轮询）
+- 事件通道不可用时，由唯一的监视线程按固定间隔轮询
+- 每个阶段变化以 PhaseTransition(old_phase, new_phase, timestamp) 的形式发布
+"""
+import queue
+import threading
+import time
+from typing import NamedTuple
+
+from config import app_state
+from core import lcu
+from core.lcu import events
+from utils.logger import logger
+
+# 事件通道不可用时的轮询间隔（秒）
+POLL_INTERVAL = 1.0
+
+
+class PhaseTransition(NamedTuple):
+    """一次游戏阶段变化"""
+    old_phase: str | None
+    new_phase: str | None
+    timestamp: float
+
+
+class PhaseSubscription:
+    """
+    把阶段变化（以及可选的额外 LCU 事件）汇总到一个队列中，供后台任务阻塞读取。
+
+    队列中的元素为 PhaseTransition 或 core.lcu.events.LcuEvent。
+    订阅建立时若已知当前阶段，会先放入一条 old_phase=None 的初始变化。
+    """
+
+    def __init__(self, monitor, extra_uris=()):
+        self._monitor = monitor
+        self._extra_uris = list(extra_uris)
+        self._queue = queue.Queue()
+        for uri in self._extra_uris:
+            events.event_bus.subscribe(uri, self._queue.put)
+        monitor.add_listener(self._queue.put, replay=True)
+
+    def get(self, timeout=None):
+        """等待下一条阶段变化或事件，超时返回 None"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._monitor.remove_listener(self._queue.put)
+        for uri in self._extra_uris:
+            events.event_bus.unsubscribe(uri, self._queue.put)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class PhaseMonitor:
+    """
+    共享的游戏阶段监视器。
+
+    有监听者时才运行后台线程；最后一个监听者移除后线程自动退出。
+    监听者回调在推送线程或监视线程中调用，应尽快返回。
+    """
+
+    def __init__(self, poll_interval=POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._phase = None
+        self._synced = False
+        self._push_subscribed = False
+        self.polls = 0
+        self.transitions = 0
+
+    @property
+    def current_phase(self):
+        return self._phase
+
+    def add_listener(self, callback, replay=False):
+        """
+        注册阶段变化回调 callback(PhaseTransition)。
+
+        Args:
+            callback: 回调函数
+            replay: 为 True 且当前阶段已知时，立即以 old_phase=None 回放当前阶段
+        """
+        with self._lock:
+            self._listeners.append(callback)
+            current = self._phase if self._synced else None
+            self._ensure_running()
+        if replay and current is not None:
+            callback(PhaseTransition(None, current, time.time()))
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+            if not self._listeners:
+                self._wakeup.set()
+
+    def stats(self):
+        """返回监视器统计信息"""
+        with self._lock:
+            listeners = len(self._listeners)
+        return {
+            'current_phase': self._phase,
+            'listeners': listeners,
+            'polls': self.polls,
+            'transitions': self.transitions,
+            'push_connected': events.event_bus.connected,
+        }
+
+    def listen(self, extra_uris=()):
+        """创建队列式订阅（见 PhaseSubscription）"""
+        return PhaseSubscription(self, extra_uris)
+
+    def _ensure_running(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._wakeup.clear()
+        self._synced = False
+        self._thread = threading.Thread(target=self._run, name='phase-monitor', daemon=True)
+        self._thread.start()
+        if not self._push_subscribed:
+            # 推送回调常驻；监视器未同步时推送会被忽略
+            events.event_bus.subscribe(events.GAMEFLOW_PHASE_URI, self._on_push)
+            self._push_subscribed = True
+
+    def _on_push(self, event):
+        if self._synced:
+            self._set_phase(event.data)
+
+    def _set_phase(self, phase):
+        with self._lock:
+            old_phase = self._phase
+            self._synced = True
+            if phase == old_phase:
+                return
+            self._phase = phase
+            listeners = list(self._listeners)
+            self.transitions += 1
+
+        transition = PhaseTransition(old_phase, phase, time.time())
+        logger.debug(f"🔀 游戏阶段变化: {old_phase} -> {phase}")
+        for callback in listeners:
+            try:
+                callback(transition)
+            except Exception as e:
+                logger.error(f"❌ 阶段监听回调异常: {e}")
+
+    def _wait(self):
+        if self._wakeup.wait(self.poll_interval):
+            self._wakeup.clear()
+
+    def _run(self):
+        push_mode = False
+        while True:
+            with self._lock:
+                if not self._listeners:
+                    # 在锁内清空线程引用，保证随后注册的监听者会启动新线程
+                    self._thread = None
+                    self._synced = False
+                    return
+
+            if not app_state.is_lcu_connected():
+                self._synced = False
+                self._wait()
+                continue
+
+            try:
+                token = app_state.lcu_credentials["auth_token"]
+                port = app_state.lcu_credentials["app_port"]
+                events.ensure_event_bus(token, port)
+
+                was_push_mode = push_mode
+                push_mode = events.event_bus.connected
+                # 轮询模式，或事件通道刚恢复（期间可能错过推送）时主动同步一次
+                if not push_mode or not was_push_mode or not self._synced:
+                    self.polls += 1
+                    phase = lcu.get_gameflow_phase(token, port)
+                    # 请求失败时返回 None，视为未知而不是阶段变化
+                    if phase is not None:
+                        self._set_phase(phase)
+            except Exception as e:
+                logger.error(f"❌ 阶段监视异常: {e}")
+
+            self._wait()
+
+
+# 全局阶段监视器实例
+phase_monitor = PhaseMonitor()
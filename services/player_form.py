@@ -0,0 +1,120 @@
+"""
+玩家近期状态汇总
+敌我分析发现队友/敌人后，由服务端并发获取每名玩家的近期战绩，
+一次遍历算出胜率、KDA、常用英雄和连胜/连败，逐个通过 player_form 事件推送。
+
+前端不再为每名玩家单独请求 /get_history 并在浏览器中计算。
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from core import lcu
+from services.match_service import process_lol_match_history
+from utils.logger import logger
+
+# 统计最近多少场
+FORM_GAME_COUNT = 10
+# 并发获取战绩的线程数（需小于 LCU 连接池大小）
+FORM_MAX_WORKERS = 6
+# 返回的常用英雄数量
+TOP_CHAMPIONS = 3
+
+_form_pool = ThreadPoolExecutor(max_workers=FORM_MAX_WORKERS, thread_name_prefix='player-form')
+
+
+def summarize_form(games):
+    """
+    一次遍历对局摘要（process_lol_match_history 的结果，最新在前），计算近期状态
+
+    Returns:
+        dict: {
+            'games', 'wins', 'losses', 'winRate',
+            'kills', 'deaths', 'assists', 'kda' (无死亡时为 None),
+            'streak': {'win': bool, 'count': int},
+            'champions': [{'champion', 'games', 'wins'}],  # 按场次排序
+            'lastGame': {'win', 'champion', 'kda'}
+        }
+    """
+    wins = kills = deaths = assists = 0
+    streak_win, streak_count, streak_open = None, 0, True
+    champions = {}
+
+    for game in games:
+        win = bool(game.get('win'))
+        wins += win
+
+        parts = str(game.get('kda') or '0/0/0').split('/')
+        try:
+            k, d, a = (int(x) for x in parts[:3])
+        except ValueError:
+            k = d = a = 0
+        kills += k
+        deaths += d
+        assists += a
+
+        # 连胜/连败：从最近一场开始，直到结果变化为止
+        if streak_open:
+            if streak_win is None or streak_win == win:
+                streak_win = win
+                streak_count += 1
+            else:
+                streak_open = False
+
+        name = game.get('champion_en') or 'Unknown'
+        entry = champions.get(name)
+        if entry is None:
+            entry = champions[name] = {'champion': name, 'games': 0, 'wins': 0}
+        entry['games'] += 1
+        entry['wins'] += win
+
+    total = len(games)
+    last = games[0] if games else None
+    return {
+        'games': total,
+        'wins': wins,
+        'losses': total - wins,
+        'winRate': round(wins / total * 100, 1) if total else 0.0,
+        'kills': kills,
+        'deaths': deaths,
+        'assists': assists,
+        'kda': round((kills + assists) / deaths, 2) if deaths else None,
+        'streak': {'win': bool(streak_win), 'count': streak_count},
+        'champions': sorted(champions.values(), key=lambda c: c['games'], reverse=True)[:TOP_CHAMPIONS],
+        'lastGame': {
+            'win': bool(last.get('win')),
+            'champion': last.get('champion_en'),
+            'kda': last.get('kda'),
+        } if last else None,
+    }
+
+
+def get_player_form(token, port, puuid, count=FORM_GAME_COUNT):
+    """
+    获取并汇总一名玩家的近期状态
+
+    Returns:
+        dict: summarize_form 的结果，获取战绩失败返回 None
+    """
+    history = lcu.get_match_history(token, port, puuid, count=count, begin_index=0)
+    if not history:
+        return None
+    return summarize_form(process_lol_match_history(history, puuid))
+
+
+def push_roster_form(token, port, puuids, socketio, count=FORM_GAME_COUNT):
+    """
+    并发获取一组玩家的近期状态，每完成一名就推送一次 player_form 事件（不阻塞调用方）
+
+    事件格式: {'puuid': ..., 'success': bool, 'form': {...}}
+    """
+    for puuid in dict.fromkeys(p for p in puuids if p):
+        future = _form_pool.submit(get_player_form, token, port, puuid, count)
+        future.add_done_callback(lambda f, puuid=puuid: _emit_form(socketio, puuid, f))
+
+
+def _emit_form(socketio, puuid, future):
+    try:
+        form = future.result()
+    except Exception as e:
+        logger.warning(f"⚠️ 获取玩家近期状态失败: {e}")
+        form = None
+    socketio.emit('player_form', {'puuid': puuid, 'success': form is not None, 'form': form})
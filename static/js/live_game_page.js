@@ -27,11 +27,66 @@ function handleStatusUpdate(payload = {}) {
   }
 }
 
+// 实时对局状态：完整快照 + 按 seq 顺序应用的差异
+let liveGameState = null;
+let liveGameSeq = 0;
+
+// 与 utils/snapshot_diff.py 的 apply_diff 保持一致
+function applyDiff(snapshot, ops) {
+  for (const op of ops) {
+    const path = op.path || [];
+    if (path.length === 0) {
+      snapshot = op.value;
+      continue;
+    }
+    let target = snapshot;
+    for (const key of path.slice(0, -1)) {
+      target = target[key];
+    }
+    const last = path[path.length - 1];
+    if (op.op === "del") {
+      delete target[last];
+    } else {
+      target[last] = op.value;
+    }
+  }
+  return snapshot;
+}
+
+function renderLiveGame() {
+  if (typeof window.renderLiveGameResult === "function" && liveGameState) {
+    window.renderLiveGameResult(liveGameState);
+  }
+}
+
 document.addEventListener("DOMContentLoaded", () => {
-  const { socket } = setupSocket({
+  const { socket, joinLiveGame } = setupSocket({
     onStatusUpdate: handleStatusUpdate,
+    onLiveGameSnapshot(payload = {}) {
+      liveGameState = payload;
+      liveGameSeq = payload.seq || 0;
+      renderLiveGame();
+    },
+    onLiveGameDiff(payload = {}) {
+      const seq = payload.seq || 0;
+      if (!liveGameState || seq <= liveGameSeq) {
+        return;
+      }
+      if (seq !== liveGameSeq + 1) {
+        // 漏掉了中间的差异，重新加入房间获取完整快照
+        liveGameState = null;
+        joinLiveGame();
+        return;
+      }
+      liveGameState = applyDiff(liveGameState, payload.ops || []);
+      liveGameSeq = seq;
+      renderLiveGame();
+    },
   });
 
+  // 每次（重新）连接后加入实时对局房间
+  socket.on("connect", joinLiveGame);
+
   socket.on("connect_error", () => {
     showInlineMessage("❌ 无法连接到后台服务", {
       level: "error",
@@ -6,7 +6,11 @@ import {
   qs,
   formatRankBadge,
 } from "./modules/ui.js";
-import { fetchSummonerStats, fetchTFTMatches } from "./modules/api.js";
+import {
+  fetchRosterStats,
+  fetchTFTMatches,
+  renderPlayerForm,
+} from "./modules/api.js";
 import { setupSocket } from "./modules/socketHandler.js";
 import {
   loadChampionData,
@@ -34,6 +38,53 @@ document.addEventListener("DOMContentLoaded", async () => {
   const banChampionSelectors = [];
   const pickChampionSelectors = [];
 
+  // 服务端推送的玩家近期状态（player_form），按 puuid 等待
+  const formWaiters = new Map();
+  const FORM_TIMEOUT_MS = 20000;
+
+  // 需要单独查询战绩的玩家，同一轮事件循环内的合并为一次 /get_history_batch 请求
+  let rosterQueue = [];
+
+  function queueRosterStats(player, displayElement) {
+    return new Promise((resolve) => {
+      rosterQueue.push({ player, displayElement, resolve });
+      if (rosterQueue.length > 1) return;
+      setTimeout(() => {
+        const batch = rosterQueue;
+        rosterQueue = [];
+        fetchRosterStats(
+          batch.map((item) => item.player),
+          batch.map((item) => item.displayElement)
+        ).then(() => batch.forEach((item) => item.resolve()));
+      }, 0);
+    });
+  }
+
+  function waitForPlayerForm(player, displayElement) {
+    if (!player.puuid) {
+      return queueRosterStats(player, displayElement);
+    }
+    return new Promise((resolve) => {
+      const waiter = (payload) => {
+        clearTimeout(timer);
+        renderPlayerForm(payload, displayElement);
+        resolve();
+      };
+      // 超时未收到推送时回退为批量查询
+      const timer = setTimeout(() => {
+        const waiters = formWaiters.get(player.puuid) || [];
+        formWaiters.set(
+          player.puuid,
+          waiters.filter((fn) => fn !== waiter)
+        );
+        queueRosterStats(player, displayElement).then(resolve);
+      }, FORM_TIMEOUT_MS);
+      const waiters = formWaiters.get(player.puuid) || [];
+      waiters.push(waiter);
+      formWaiters.set(player.puuid, waiters);
+    });
+  }
+
   // socket handlers
   const {
     socket,
@@ -84,9 +135,10 @@ document.addEventListener("DOMContentLoaded", async () => {
         nameDiv.className = "d-flex align-items-center gap-2";
 
         const riotIdLink = document.createElement("a");
+        // 带上 puuid，详情页直接命中预热的缓存
         riotIdLink.href = `/summoner/${encodeURIComponent(
           enemy.gameName + "#" + enemy.tagLine
-        )}`;
+        )}${ enemy.puuid ? `?puuid=${encodeURIComponent(enemy.puuid)}` : "" }`;
         riotIdLink.target = "_blank";
         riotIdLink.rel = "noopener noreferrer";
         riotIdLink.className = "fw-bold text-danger text-decoration-none";
@@ -98,6 +150,7 @@ document.addEventListener("DOMContentLoaded", async () => {
         // 添加段位信息
         if (enemy.rank) {
           const rankBadge = document.createElement("span");
+          rankBadge.dataset.rankPuuid = enemy.puuid || "";
           rankBadge.innerHTML = formatRankBadge(enemy.rank);
           nameDiv.appendChild(rankBadge);
         }
@@ -116,13 +169,28 @@ document.addEventListener("DOMContentLoaded", async () => {
         statsDisplay.className = "text-muted small mt-1";
         li.appendChild(statsDisplay);
         ul.appendChild(li);
-        return fetchSummonerStats(enemy.gameName, enemy.tagLine, statsDisplay);
+        return waitForPlayerForm(enemy, statsDisplay);
       });
 
       await Promise.all(promises);
       realtimeStatus.textContent = `✅ 敌方战绩分析完成!`;
       realtimeStatus.className = "badge bg-success";
     },
+    onPlayerForm: (data) => {
+      if (!data || !data.puuid) return;
+      const waiters = formWaiters.get(data.puuid) || [];
+      formWaiters.delete(data.puuid);
+      waiters.forEach((fn) => fn(data));
+    },
+    onRankUpdate: (data) => {
+      // 首次推送时未返回的段位，结果到达后单独更新
+      if (!data || !data.puuid) return;
+      document.querySelectorAll("[data-rank-puuid]").forEach((badge) => {
+        if (badge.dataset.rankPuuid === data.puuid) {
+          badge.innerHTML = formatRankBadge(data.rank);
+        }
+      });
+    },
     onTeammatesFound: async (data) => {
       realtimeStatus.textContent = `👥 发现 ${data.teammates.length} 名队友! 正在分析战绩...`;
       realtimeStatus.className = "badge bg-info";
@@ -143,9 +211,10 @@ document.addEventListener("DOMContentLoaded", async () => {
         nameDiv.className = "d-flex align-items-center gap-2";
 
         const riotIdLink = document.createElement("a");
+        // 带上 puuid，详情页直接命中预热的缓存
         riotIdLink.href = `/summoner/${encodeURIComponent(
           tm.gameName + "#" + tm.tagLine
-        )}`;
+        )}${ tm.puuid ? `?puuid=${encodeURIComponent(tm.puuid)}` : "" }`;
         riotIdLink.target = "_blank";
         riotIdLink.rel = "noopener noreferrer";
         riotIdLink.className = "fw-bold text-primary text-decoration-none";
@@ -157,6 +226,7 @@ document.addEventListener("DOMContentLoaded", async () => {
         // 添加段位信息
         if (tm.rank) {
           const rankBadge = document.createElement("span");
+          rankBadge.dataset.rankPuuid = tm.puuid || "";
           rankBadge.innerHTML = formatRankBadge(tm.rank);
           nameDiv.appendChild(rankBadge);
         }
@@ -168,7 +238,7 @@ document.addEventListener("DOMContentLoaded", async () => {
         statsDisplay.className = "text-muted small mt-1";
         li.appendChild(statsDisplay);
         ul.appendChild(li);
-        return fetchSummonerStats(tm.gameName, tm.tagLine, statsDisplay);
+        return waitForPlayerForm(tm, statsDisplay);
       });
 
       await Promise.all(promises);
@@ -15,61 +15,156 @@ export async function fetchSummonerStats(gameName, tagLine, displayElement, coun
         }
 
         const data = await response.json();
+        renderSummonerStats(data, displayElement);
 
-        if (data.success && data.games && data.games.length > 0) {
-            const games = data.games;
-            const totalGames = games.length;
-            const wins = games.filter(game => game.win).length;
-            const losses = totalGames - wins;
-            const winRate = ((wins / totalGames) * 100).toFixed(1);
-
-            // 计算KDA平均值
-            let totalKills = 0, totalDeaths = 0, totalAssists = 0;
-            games.forEach(game => {
-                const kdaParts = game.kda.split('/');
-                totalKills += parseInt(kdaParts[0]) || 0;
-                totalDeaths += parseInt(kdaParts[1]) || 0;
-                totalAssists += parseInt(kdaParts[2]) || 0;
-            });
-            const avgKDA = totalDeaths > 0 ? ((totalKills + totalAssists) / totalDeaths).toFixed(2) : 'Perfect';
-
-            // 提取最近一场数据
-            const lastGame = games[0];
-            const resultText = lastGame.win ? '胜' : '败';
-            const resultClass = lastGame.win ? 'text-success fw-bold' : 'text-danger fw-bold';
-            const winRateClass = winRate >= 60 ? 'text-success' : winRate >= 50 ? 'text-warning' : 'text-danger';
-
-            displayElement.innerHTML = `
-                <div class="small mt-1">
-                    <div class="d-flex justify-content-between align-items-center mb-1">
-                        <span class="badge bg-secondary">最近${totalGames}场</span>
-                        <span class="${winRateClass} fw-bold">${wins}胜${losses}败 (${winRate}%)</span>
-                    </div>
-                    <div class="d-flex justify-content-between align-items-center">
-                        <span class="text-muted">平均KDA: <strong class="text-info">${avgKDA}</strong></span>
-                        <span class="${resultClass}">上局: ${resultText}</span>
-                    </div>
-                    <div class="text-muted" style="font-size: 0.85em;">
-                        <img src="https://ddragon.leagueoflegends.com/cdn/15.21.1/img/champion/${lastGame.champion_en}.png" 
-                             alt="${lastGame.champion_en}" 
-                             width="20" 
-                             height="20"
-                             style="vertical-align: middle; border-radius: 3px;">
-                        ${lastGame.champion_en} | ${lastGame.kda}
-                    </div>
+    } catch (error) {
+        console.error(`获取 ${fullRiotId} 战绩失败:`, error);
+        displayElement.innerHTML = `<div class="small text-danger mt-1">❌ 查询失败</div>`;
+    }
+}
+
+// 渲染一名玩家的战绩摘要（/get_history 或 /get_history_batch 中单个玩家的结果）
+export function renderSummonerStats(data, displayElement) {
+    if (data.success && data.games && data.games.length > 0) {
+        const games = data.games;
+        const totalGames = games.length;
+        const wins = games.filter(game => game.win).length;
+        const losses = totalGames - wins;
+        const winRate = ((wins / totalGames) * 100).toFixed(1);
+
+        // 计算KDA平均值
+        let totalKills = 0, totalDeaths = 0, totalAssists = 0;
+        games.forEach(game => {
+            const kdaParts = game.kda.split('/');
+            totalKills += parseInt(kdaParts[0]) || 0;
+            totalDeaths += parseInt(kdaParts[1]) || 0;
+            totalAssists += parseInt(kdaParts[2]) || 0;
+        });
+        const avgKDA = totalDeaths > 0 ? ((totalKills + totalAssists) / totalDeaths).toFixed(2) : 'Perfect';
+
+        // 提取最近一场数据
+        const lastGame = games[0];
+        const resultText = lastGame.win ? '胜' : '败';
+        const resultClass = lastGame.win ? 'text-success fw-bold' : 'text-danger fw-bold';
+        const winRateClass = winRate >= 60 ? 'text-success' : winRate >= 50 ? 'text-warning' : 'text-danger';
+
+        displayElement.innerHTML = `
+            <div class="small mt-1">
+                <div class="d-flex justify-content-between align-items-center mb-1">
+                    <span class="badge bg-secondary">最近${totalGames}场</span>
+                    <span class="${winRateClass} fw-bold">${wins}胜${losses}败 (${winRate}%)</span>
                 </div>
-            `;
+                <div class="d-flex justify-content-between align-items-center">
+                    <span class="text-muted">平均KDA: <strong class="text-info">${avgKDA}</strong></span>
+                    <span class="${resultClass}">上局: ${resultText}</span>
+                </div>
+                <div class="text-muted" style="font-size: 0.85em;">
+                    <img src="https://ddragon.leagueoflegends.com/cdn/15.21.1/img/champion/${lastGame.champion_en}.png" 
+                         alt="${lastGame.champion_en}" 
+                         width="20" 
+                         height="20"
+                         style="vertical-align: middle; border-radius: 3px;">
+                    ${lastGame.champion_en} | ${lastGame.kda}
+                </div>
+            </div>
+        `;
 
-        } else if (data.success) {
-            displayElement.innerHTML = `<div class="small text-warning mt-1">📊 无战绩数据</div>`;
-        } else {
-            displayElement.innerHTML = `<div class="small text-danger mt-1">❌ ${data.message || '查询失败'}</div>`;
+    } else if (data.success) {
+        displayElement.innerHTML = `<div class="small text-warning mt-1">📊 无战绩数据</div>`;
+    } else {
+        displayElement.innerHTML = `<div class="small text-danger mt-1">❌ ${data.message || '查询失败'}</div>`;
+    }
+}
+
+// 与服务端 HISTORY_BATCH_MAX_PLAYERS 一致
+const ROSTER_BATCH_SIZE = 16;
+
+// 一次请求获取整队玩家的战绩（/get_history_batch），结果按顺序渲染到 displayElements
+export async function fetchRosterStats(players, displayElements, count = 10) {
+    if (players.length > ROSTER_BATCH_SIZE) {
+        const chunks = [];
+        for (let i = 0; i < players.length; i += ROSTER_BATCH_SIZE) {
+            chunks.push(fetchRosterStats(
+                players.slice(i, i + ROSTER_BATCH_SIZE), displayElements.slice(i, i + ROSTER_BATCH_SIZE), count));
+        }
+        await Promise.all(chunks);
+        return;
+    }
+    try {
+        const response = await fetch('/get_history_batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                players: players.map(p => p.puuid ? { puuid: p.puuid } : { name: `${p.gameName}#${p.tagLine}` }),
+                count,
+            }),
+        });
+        if (!response.ok) {
+            throw new Error(`HTTP 错误! 状态码: ${response.status}`);
+        }
+
+        const data = await response.json();
+        if (!data.success) {
+            displayElements.forEach(el => {
+                el.innerHTML = `<div class="small text-danger mt-1">❌ ${data.message || '查询失败'}</div>`;
+            });
+            return;
         }
+        data.players.forEach((result, i) => renderSummonerStats(result, displayElements[i]));
 
     } catch (error) {
-        console.error(`获取 ${fullRiotId} 战绩失败:`, error);
+        console.error('批量获取战绩失败:', error);
+        displayElements.forEach(el => {
+            el.innerHTML = `<div class="small text-danger mt-1">❌ 查询失败</div>`;
+        });
+    }
+}
+
+// 渲染服务端推送的玩家近期状态（services/player_form.py 的 summarize_form）
+export function renderPlayerForm(payload, displayElement) {
+    if (!payload || !payload.success) {
         displayElement.innerHTML = `<div class="small text-danger mt-1">❌ 查询失败</div>`;
+        return;
+    }
+    const form = payload.form;
+    if (!form || !form.games) {
+        displayElement.innerHTML = `<div class="small text-warning mt-1">📊 无战绩数据</div>`;
+        return;
     }
+
+    const winRateClass = form.winRate >= 60 ? 'text-success' : form.winRate >= 50 ? 'text-warning' : 'text-danger';
+    const avgKDA = form.kda === null ? 'Perfect' : form.kda.toFixed(2);
+    const last = form.lastGame;
+    const resultText = last.win ? '胜' : '败';
+    const resultClass = last.win ? 'text-success fw-bold' : 'text-danger fw-bold';
+    const streak = form.streak.count >= 2
+        ? `<span class="${form.streak.win ? 'text-success' : 'text-danger'}">${form.streak.count}连${form.streak.win ? '胜' : '败'}</span>`
+        : '';
+    const champions = form.champions
+        .map(c => `${c.champion} ${c.wins}/${c.games}`)
+        .join(' · ');
+
+    displayElement.innerHTML = `
+        <div class="small mt-1">
+            <div class="d-flex justify-content-between align-items-center mb-1">
+                <span class="badge bg-secondary">最近${form.games}场</span>
+                <span class="${winRateClass} fw-bold">${form.wins}胜${form.losses}败 (${form.winRate.toFixed(1)}%)</span>
+            </div>
+            <div class="d-flex justify-content-between align-items-center">
+                <span class="text-muted">平均KDA: <strong class="text-info">${avgKDA}</strong> ${streak}</span>
+                <span class="${resultClass}">上局: ${resultText}</span>
+            </div>
+            <div class="text-muted" style="font-size: 0.85em;">
+                <img src="https://ddragon.leagueoflegends.com/cdn/15.21.1/img/champion/${last.champion}.png" 
+                     alt="${last.champion}" 
+                     width="20" 
+                     height="20"
+                     style="vertical-align: middle; border-radius: 3px;">
+                ${last.champion} | ${last.kda}
+            </div>
+            <div class="text-muted" style="font-size: 0.85em;">常用: ${champions}</div>
+        </div>
+    `;
 }
 
 export async function fetchTFTMatches(gameName, tagLine, displayElement, count = 20) {
@@ -122,4 +217,4 @@ export async function fetchTFTMatches(gameName, tagLine, displayElement, count =
     }
 }
 
-export default { fetchSummonerStats, fetchTFTMatches };
+export default { fetchSummonerStats, fetchRosterStats, renderSummonerStats, fetchTFTMatches, renderPlayerForm };
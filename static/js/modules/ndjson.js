@@ -0,0 +1,40 @@
+// ndjson.js - 读取 NDJSON 流式响应（/get_history?stream=1、/get_tft_history?stream=1）
+// 第一行作为 meta 返回，之后每行解析后立即交给 onItem(item, index)；
+// 响应不是 NDJSON 时（例如查询失败返回的普通 JSON）直接返回解析后的对象
+
+export async function readNdjson(response, onItem) {
+    const contentType = response.headers.get('Content-Type') || '';
+    if (!contentType.includes('application/x-ndjson') || !response.body) {
+        return response.json();
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let meta = null;
+    let index = 0;
+
+    const handleLine = (line) => {
+        if (!line.trim()) return;
+        const value = JSON.parse(line);
+        if (meta === null) {
+            meta = value;
+        } else {
+            onItem(value, index++);
+        }
+    };
+
+    for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.forEach(handleLine);
+    }
+    handleLine(buffer + decoder.decode());
+
+    return meta || { success: false, message: '响应为空' };
+}
+
+export default { readNdjson };
@@ -7,8 +7,14 @@ export function setupSocket(handlers = {}) {
     socket.on("enemies_found", handlers.onEnemiesFound);
   if (handlers.onTeammatesFound)
     socket.on("teammates_found", handlers.onTeammatesFound);
+  if (handlers.onRankUpdate) socket.on("rank_update", handlers.onRankUpdate);
+  if (handlers.onPlayerForm) socket.on("player_form", handlers.onPlayerForm);
   if (handlers.onStatusUpdate)
     socket.on("status_update", handlers.onStatusUpdate);
+  if (handlers.onLiveGameSnapshot)
+    socket.on("live_game_snapshot", handlers.onLiveGameSnapshot);
+  if (handlers.onLiveGameDiff)
+    socket.on("live_game_diff", handlers.onLiveGameDiff);
 
   // 监听服务器关闭事件。当后端发出 "server_shutdown" 时，尝试关闭页面或提示用户手动关闭。
   socket.on("server_shutdown", (payload) => {
@@ -60,6 +66,12 @@ export function setupSocket(handlers = {}) {
     stopAutoBanPick() {
       socket.emit("stop_auto_banpick");
     },
+    joinLiveGame() {
+      socket.emit("join_live_game");
+    },
+    leaveLiveGame() {
+      socket.emit("leave_live_game");
+    },
     configureBanPick(configOrBanId, pickChampionId) {
       if (typeof configOrBanId === "object") {
         socket.emit("configure_banpick", configOrBanId);
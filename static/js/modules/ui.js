@@ -149,6 +149,9 @@ export function setLCUStatus(message, style = "neutral") {
 }
 
 export function formatRankBadge(rank) {
+  if (rank && rank.pending) {
+    return '<span class="badge bg-secondary" style="font-size: 0.7rem;">段位查询中</span>';
+  }
   if (!rank || rank.tier === "UNRANKED") {
     return '<span class="badge bg-secondary" style="font-size: 0.7rem;">未定级</span>';
   }
@@ -0,0 +1,33 @@
+"""complete_action 按 PATCH 的状态码判断是否成功"""
+import pytest
+
+from core import lcu
+from services import auto_banpick
+
+ACTION = {'id': 7, 'actorCellId': 1, 'championId': 0, 'completed': False, 'isInProgress': True, 'type': 'pick'}
+
+
+def _fake_patch(monkeypatch, status):
+    sent = []
+
+    def fake_request_with_status(method, endpoint, token, port, **kwargs):
+        sent.append((method, endpoint, kwargs.get('json')))
+        return status, None
+
+    monkeypatch.setattr(lcu, 'request_with_status', fake_request_with_status)
+    return sent
+
+
+@pytest.mark.parametrize('status', [200, 204])
+def test_success_status_completes_action(monkeypatch, status):
+    sent = _fake_patch(monkeypatch, status)
+    assert auto_banpick.complete_action('token', 1, 7, 103, action_type='pick', action=ACTION) is True
+    method, endpoint, payload = sent[0]
+    assert (method, endpoint) == ('PATCH', '/lol-champ-select/v1/session/actions/7')
+    assert payload['championId'] == 103 and payload['completed'] is True
+
+
+@pytest.mark.parametrize('status', [None, 400, 500])
+def test_error_status_fails_action(monkeypatch, status):
+    _fake_patch(monkeypatch, status)
+    assert auto_banpick.complete_action('token', 1, 7, 103, action_type='pick', action=ACTION) is False
@@ -0,0 +1,41 @@
+"""批量召唤师接口的可用性判断"""
+import pytest
+
+from core.lcu import summoner
+
+
+@pytest.fixture
+def bulk_state():
+    summoner._summoner_cache.clear()
+    summoner._bulk_support.clear()
+    yield summoner._bulk_support
+    summoner._summoner_cache.clear()
+    summoner._bulk_support.clear()
+
+
+def _fake_lcu(monkeypatch, bulk_status):
+    def fake_request_with_status(method, endpoint, token, port, **kwargs):
+        if endpoint == '/lol-summoner/v2/summoners/puuid':
+            return bulk_status, None
+        puuid = endpoint.rsplit('/', 1)[-1]
+        return 200, {'puuid': puuid, 'summonerId': 1, 'displayName': puuid}
+
+    monkeypatch.setattr(summoner, 'request_with_status', fake_request_with_status)
+    monkeypatch.setattr(
+        summoner, 'make_request', lambda *args, **kwargs: fake_request_with_status(*args, **kwargs)[1]
+    )
+
+
+def test_network_failure_keeps_bulk_enabled(bulk_state, monkeypatch):
+    _fake_lcu(monkeypatch, bulk_status=None)
+    result = summoner.get_summoners_by_puuids('token', 1, ['a', 'b'])
+    assert set(result) == {'a', 'b'}
+    assert bulk_state.get((1, 'puuid'), True) is True
+
+
+@pytest.mark.parametrize('status', [404, 405])
+def test_missing_endpoint_disables_bulk(bulk_state, monkeypatch, status):
+    _fake_lcu(monkeypatch, bulk_status=status)
+    result = summoner.get_summoners_by_puuids('token', 1, ['a', 'b'])
+    assert set(result) == {'a', 'b'}
+    assert bulk_state[(1, 'puuid')] is False
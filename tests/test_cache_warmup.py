@@ -0,0 +1,31 @@
+"""缓存预热：每名玩家的覆盖统计"""
+import pytest
+
+from core import lcu
+from services.cache_warmup import CacheWarmer, _WarmupJob
+
+
+@pytest.fixture
+def warm(monkeypatch):
+    """用给定的返回值替换三个预热步骤，返回预热一名玩家后的统计"""
+    def run(summoner, ranked, history):
+        monkeypatch.setattr(lcu, 'get_summoner_by_puuid', lambda token, port, puuid: summoner)
+        monkeypatch.setattr(lcu, 'get_ranked_stats', lambda token, port, puuid=None: ranked)
+        monkeypatch.setattr(lcu, 'get_match_history', lambda token, port, puuid, count=20: history)
+        job = _WarmupJob('champ_select')
+        CacheWarmer(max_workers=1)._warm_player(job, 'token', 1, 'p1')
+        return job.warmed, job.partial, job.failed
+
+    return run
+
+
+def test_unranked_player_counts_as_warmed(warm):
+    assert warm({'puuid': 'p1'}, {}, {'games': []}) == (1, 0, 0)
+
+
+def test_failed_step_counts_as_partial(warm):
+    assert warm({'puuid': 'p1'}, {}, None) == (0, 1, 0)
+
+
+def test_all_steps_failed(warm):
+    assert warm(None, None, None) == (0, 0, 1)
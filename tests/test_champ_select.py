@@ -0,0 +1,103 @@
+"""选人会话状态：ingest 产生的变化类型与索引"""
+import copy
+
+from core.lcu import champ_select as cs
+from core.lcu.champ_select import ChampSelectState
+
+
+def _session(**overrides):
+    session = {
+        'id': 'session-1',
+        'localPlayerCellId': 1,
+        'timer': {'phase': 'BAN_PICK'},
+        'myTeam': [{'cellId': 0, 'puuid': 'p0'}, {'cellId': 1, 'puuid': 'p1'}],
+        'teams': [{'bans': []}],
+        'actions': [
+            [{'id': 1, 'actorCellId': 1, 'type': 'ban', 'championId': 0, 'completed': False, 'isInProgress': False}],
+            [{'id': 2, 'actorCellId': 1, 'type': 'pick', 'championId': 0, 'completed': False, 'isInProgress': False},
+             {'id': 3, 'actorCellId': 0, 'type': 'pick', 'championId': 0, 'completed': False, 'isInProgress': False}],
+        ],
+    }
+    session.update(overrides)
+    return session
+
+
+def _action(session, action_id):
+    return next(a for group in session['actions'] for a in group if a['id'] == action_id)
+
+
+def _kinds(changes):
+    return [(c.kind, c.action_id) for c in changes]
+
+
+def test_first_session_starts_and_indexes():
+    state = ChampSelectState()
+    changes = state.ingest(_session())
+    assert _kinds(changes) == [(cs.SESSION_STARTED, None), (cs.TIMER_PHASE_CHANGED, None), (cs.TEAM_CHANGED, None)]
+    assert state.local_cell_id == 1
+    assert [a['id'] for a in state.local_actions()] == [1, 2]
+    assert state.action(3)['actorCellId'] == 0
+    assert state.team_puuids == ['p0', 'p1']
+    assert state.timer_phase == 'BAN_PICK'
+    assert state.version == 1
+
+
+def test_unchanged_session_has_no_changes():
+    state = ChampSelectState.from_session(_session())
+    assert state.ingest(_session()) == []
+    assert state.version == 1
+
+
+def test_action_lifecycle_changes():
+    state = ChampSelectState.from_session(_session())
+
+    session = _session()
+    _action(session, 1)['isInProgress'] = True
+    changes = state.ingest(session)
+    assert _kinds(changes) == [(cs.ACTION_STARTED, 1)]
+    assert changes[0].action_type == 'ban' and changes[0].actor_cell_id == 1
+    assert [a['id'] for a in state.local_actions_in_progress()] == [1]
+
+    session = copy.deepcopy(session)
+    _action(session, 1).update(championId=55)
+    changes = state.ingest(session)
+    assert _kinds(changes) == [(cs.CHAMPION_HOVERED, 1)]
+    assert changes[0].champion_id == 55
+
+    session = copy.deepcopy(session)
+    _action(session, 1).update(completed=True, isInProgress=False)
+    session['teams'] = [{'bans': [{'championId': 55}]}]
+    assert _kinds(state.ingest(session)) == [(cs.BAN_COMPLETED, 1)]
+    assert state.is_unavailable(55)
+    assert state.local_actions_in_progress() == []
+
+    session = copy.deepcopy(session)
+    _action(session, 3).update(championId=99, completed=True)
+    changes = state.ingest(session)
+    assert _kinds(changes) == [(cs.CHAMPION_LOCKED, 3)]
+    assert changes[0].champion_id == 99
+    assert state.unavailable_ids == {55, 99}
+
+
+def test_timer_and_team_changes():
+    state = ChampSelectState.from_session(_session())
+    session = _session(timer={'phase': 'FINALIZATION'})
+    session['myTeam'] = session['myTeam'] + [{'cellId': 2, 'puuid': 'p2'}]
+    assert _kinds(state.ingest(session)) == [(cs.TIMER_PHASE_CHANGED, None), (cs.TEAM_CHANGED, None)]
+
+
+def test_new_session_resets_state():
+    state = ChampSelectState.from_session(_session(teams=[{'bans': [{'championId': 7}]}]))
+    assert state.is_unavailable(7)
+
+    changes = state.ingest(_session(id='session-2'))
+    assert changes[0].kind == cs.SESSION_STARTED
+    assert not state.is_unavailable(7)
+    assert state.session_id == 'session-2'
+
+
+def test_invalid_session_is_ignored():
+    state = ChampSelectState()
+    assert state.ingest(None) == []
+    assert state.ingest(_session(actions=[None, [None, {'id': 9, 'actorCellId': 1}]]))
+    assert [a['id'] for a in state.local_actions()] == [9]
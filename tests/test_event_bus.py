@@ -0,0 +1,152 @@
+"""LCU 事件总线：WAMP 订阅、事件分发与断线重连"""
+import json
+import queue
+import threading
+
+import pytest
+from simple_websocket import ConnectionClosed
+
+from core.lcu import events
+
+
+class _FakeSocket:
+    """替代 simple_websocket.Client：记录发送的消息，receive 从队列读取（None 表示断开）"""
+
+    def __init__(self):
+        self.sent = []
+        self.inbox = queue.Queue()
+        self.closed = threading.Event()
+
+    def send(self, message):
+        self.sent.append(json.loads(message))
+
+    def receive(self, timeout=None):
+        try:
+            # 缩短等待，测试结束时总线线程能尽快退出
+            message = self.inbox.get(timeout=min(timeout, 0.05))
+        except queue.Empty:
+            return None
+        if message is None:
+            raise ConnectionClosed()
+        return message
+
+    def close(self):
+        self.closed.set()
+
+    def topics(self):
+        return {message[1] for message in self.sent if message[0] == events._WAMP_SUBSCRIBE}
+
+
+class _FakeClient:
+    def __init__(self):
+        self.sockets = queue.Queue()
+        self.connect_args = []
+
+    def connect(self, url, **kwargs):
+        self.connect_args.append((url, kwargs))
+        ws = _FakeSocket()
+        self.sockets.put(ws)
+        return ws
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    client = _FakeClient()
+    monkeypatch.setattr(events, 'Client', client)
+    monkeypatch.setattr(events, '_RECONNECT_DELAY', 0.01)
+    bus = events.LcuEventBus()
+    yield bus, client
+    bus.stop()
+
+
+def _event(uri, data, event_type='Update'):
+    return json.dumps([events._WAMP_EVENT, events.topic_for_uri(uri), {'uri': uri, 'eventType': event_type, 'data': data}])
+
+
+def test_parse_event_message():
+    event = events.parse_event_message(_event(events.GAMEFLOW_PHASE_URI, 'ChampSelect'))
+    assert (event.uri, event.event_type, event.data) == (events.GAMEFLOW_PHASE_URI, 'Update', 'ChampSelect')
+    assert events.parse_event_message('') is None
+    assert events.parse_event_message('not json') is None
+    assert events.parse_event_message(json.dumps([0, 'welcome'])) is None
+    assert events.parse_event_message(json.dumps([events._WAMP_EVENT, 'topic', {'data': 1}])) is None
+
+
+def test_topic_for_uri():
+    assert events.topic_for_uri('/lol-gameflow/v1/gameflow-phase') == 'OnJsonApiEvent_lol-gameflow_v1_gameflow-phase'
+
+
+def test_subscribes_on_connect_and_dispatches(bus):
+    bus, client = bus
+    bus.start('token', 1234)
+    assert bus.wait_connected(2)
+    ws = client.sockets.get(timeout=2)
+
+    url, kwargs = client.connect_args[0]
+    assert url == 'wss://127.0.0.1:1234/'
+    assert kwargs['subprotocols'] == ['wamp']
+    assert kwargs['headers']['Authorization'].startswith('Basic ')
+    assert ws.topics() == {events.topic_for_uri(uri) for uri in events.DEFAULT_URIS}
+
+    with bus.listen([events.READY_CHECK_URI]) as sub:
+        ws.inbox.put(_event(events.GAMEFLOW_PHASE_URI, 'Lobby'))
+        ws.inbox.put(_event(events.READY_CHECK_URI, {'state': 'InProgress'}))
+        event = sub.get(timeout=2)
+    assert event.uri == events.READY_CHECK_URI
+    assert event.data == {'state': 'InProgress'}
+
+
+def test_new_uri_subscribed_immediately_when_connected(bus):
+    bus, client = bus
+    bus.start('token', 1234)
+    assert bus.wait_connected(2)
+    ws = client.sockets.get(timeout=2)
+
+    bus.subscribe('/lol-lobby/v2/lobby', lambda event: None)
+    assert events.topic_for_uri('/lol-lobby/v2/lobby') in ws.topics()
+
+
+def test_reconnects_and_resubscribes_after_disconnect(bus):
+    bus, client = bus
+    bus.start('token', 1234)
+    first = client.sockets.get(timeout=2)
+    bus.subscribe('/lol-lobby/v2/lobby', lambda event: None)
+
+    first.inbox.put(None)  # 服务器断开
+    second = client.sockets.get(timeout=2)
+    assert first.closed.wait(2)
+    assert bus.wait_connected(2)
+    assert events.topic_for_uri('/lol-lobby/v2/lobby') in second.topics()
+
+    received = queue.Queue()
+    bus.subscribe(events.GAMEFLOW_PHASE_URI, received.put)
+    second.inbox.put(_event(events.GAMEFLOW_PHASE_URI, 'InProgress'))
+    assert received.get(timeout=2).data == 'InProgress'
+
+
+def test_start_with_same_credentials_keeps_connection(bus):
+    bus, client = bus
+    bus.start('token', 1234)
+    assert bus.wait_connected(2)
+    bus.start('token', 1234)
+    assert len(client.connect_args) == 1
+
+    bus.start('new-token', 1234)
+    assert bus.wait_connected(2)
+    client.sockets.get(timeout=2)
+    client.sockets.get(timeout=2)
+    assert len(client.connect_args) == 2
+
+
+def test_callback_errors_do_not_stop_dispatch(bus):
+    bus, _ = bus
+    received = []
+
+    def broken(event):
+        raise RuntimeError('boom')
+
+    bus.subscribe(events.GAMEFLOW_PHASE_URI, broken)
+    bus.subscribe(events.GAMEFLOW_PHASE_URI, received.append)
+    bus._dispatch(events.LcuEvent(events.GAMEFLOW_PHASE_URI, 'Update', 'Lobby'))
+    assert [event.data for event in received] == ['Lobby']
+    assert bus.events_received == 1
@@ -0,0 +1,52 @@
+"""/get_history 的 If-None-Match：缓存命中时不访问 LCU"""
+import pytest
+from flask import Flask
+
+from config import app_state
+from core import lcu
+from core.lcu import match_history, summoner
+from routes import data_routes
+
+
+@pytest.fixture
+def client(monkeypatch):
+    match_history._match_history_cache.clear()
+    summoner._puuid_cache.clear()
+    monkeypatch.setattr(app_state, 'is_lcu_connected', lambda: True)
+    monkeypatch.setattr(app_state, 'lcu_credentials', {'auth_token': 'token', 'app_port': 1})
+    app = Flask(__name__)
+    app.register_blueprint(data_routes.data_bp)
+    yield app.test_client()
+    match_history._match_history_cache.clear()
+    summoner._puuid_cache.clear()
+
+
+def _no_lcu(*args, **kwargs):
+    raise AssertionError('不应访问 LCU')
+
+
+def test_cached_page_answers_if_none_match_without_lcu(client, monkeypatch):
+    games = [{'gameId': i} for i in range(3)]
+    match_history.build_history_page('p', games, count=20, begin_index=0)
+    summoner._puuid_cache.put('Name#TAG', 'p')
+    etag = data_routes._lol_history_etag('p', 1, 20, {'games': {'games': games}})
+
+    monkeypatch.setattr(lcu, 'get_puuid', _no_lcu)
+    monkeypatch.setattr(lcu, 'get_match_history', _no_lcu)
+    response = client.get('/get_history?name=Name%23TAG', headers={'If-None-Match': f'W/"{etag}"'})
+    assert response.status_code == 304
+
+
+def test_cache_miss_still_checks_etag_after_fetch(client, monkeypatch):
+    games = [{'gameId': 1}]
+    etag = data_routes._lol_history_etag('p', 1, 20, {'games': {'games': games}})
+    fetched = []
+
+    def fake_history(token, port, puuid, count=20, begin_index=0):
+        fetched.append(puuid)
+        return {'games': {'games': games}}
+
+    monkeypatch.setattr(lcu, 'get_match_history', fake_history)
+    response = client.get('/get_history?puuid=p', headers={'If-None-Match': f'W/"{etag}"'})
+    assert response.status_code == 304
+    assert fetched == ['p']
@@ -0,0 +1,81 @@
+"""/get_history 与 /get_tft_history 的 NDJSON 流式响应"""
+import json
+
+import pytest
+from flask import Flask
+
+from config import app_state
+from core import lcu
+from core.lcu import match_history, summoner
+from routes import data_routes
+
+
+@pytest.fixture
+def client(monkeypatch):
+    match_history._match_history_cache.clear()
+    summoner._puuid_cache.clear()
+    monkeypatch.setattr(app_state, 'is_lcu_connected', lambda: True)
+    monkeypatch.setattr(app_state, 'lcu_credentials', {'auth_token': 'token', 'app_port': 1})
+    app = Flask(__name__)
+    app.register_blueprint(data_routes.data_bp)
+    yield app.test_client()
+    match_history._match_history_cache.clear()
+    summoner._puuid_cache.clear()
+
+
+def _lol_game(game_id):
+    return {
+        'gameId': game_id, 'queueId': 420, 'gameCreation': 1700000000000 + game_id,
+        'participants': [{'participantId': 1, 'championId': 103, 'stats': {'win': True, 'kills': game_id}}],
+        'participantIdentities': [{'participantId': 1, 'player': {'puuid': 'p'}}],
+    }
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_lol_history_streams_meta_then_games(client, monkeypatch):
+    games = [_lol_game(i) for i in range(3)]
+    monkeypatch.setattr(lcu, 'get_match_history', lambda *args, **kwargs: {'games': {'games': games}})
+
+    response = client.get('/get_history?puuid=p&page=2&count=3&stream=1', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+    assert 'Content-Encoding' not in response.headers  # 流式响应不压缩
+    assert response.headers['ETag']
+
+    meta, *summaries = _lines(response)
+    assert meta == {'success': True, 'page': 2, 'count': 3}
+    assert [s['match_index'] for s in summaries] == [0, 1, 2]
+    assert summaries == json.loads(json.dumps(data_routes.process_lol_match_history({'games': {'games': games}}, 'p')))
+
+
+def test_non_stream_response_matches_stream(client, monkeypatch):
+    games = [_lol_game(i) for i in range(2)]
+    monkeypatch.setattr(lcu, 'get_match_history', lambda *args, **kwargs: {'games': {'games': games}})
+
+    streamed = _lines(client.get('/get_history?puuid=p&stream=1'))[1:]
+    plain = client.get('/get_history?puuid=p').get_json()
+    assert plain['success'] is True
+    assert plain['games'] == streamed
+
+
+def test_errors_before_streaming_are_plain_json(client, monkeypatch):
+    monkeypatch.setattr(lcu, 'get_match_history', lambda *args, **kwargs: None)
+    response = client.get('/get_history?puuid=p&stream=1')
+    assert response.mimetype == 'application/json'
+    assert response.get_json()['success'] is False
+
+
+def test_tft_stream_sends_all_requested_games(client, monkeypatch):
+    games = [{'gameId': i, 'metadata': {'match_id': f'm{i}'}, 'json': {'participants': []}} for i in range(25)]
+    monkeypatch.setattr(lcu, 'get_tft_match_history', lambda *args, **kwargs: {'games': {'games': games}})
+
+    meta, *summaries = _lines(client.get('/get_tft_history?puuid=p&count=25&stream=1'))
+    assert meta == {'success': True, 'count': 25}
+    assert len(summaries) == 25
+
+    plain = client.get('/get_tft_history?puuid=p&count=25').get_json()
+    assert len(plain['games']) == 20
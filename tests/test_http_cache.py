@@ -0,0 +1,75 @@
+"""gzip 压缩钩子与 ETag 压缩后缀"""
+import gzip
+
+import pytest
+from flask import Flask, jsonify
+
+from utils import http_cache
+from utils.http_cache import GZIP_ETAG_SUFFIX, compress_response, is_not_modified, match_etag, not_modified, with_etag
+
+BIG = {'games': ['x' * 50] * 50}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.after_request(compress_response)
+
+    @app.route('/big')
+    def big():
+        return with_etag(jsonify(BIG), match_etag('lol', 1))
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/match')
+    def match():
+        etag = match_etag('lol', 1)
+        if is_not_modified(etag):
+            return not_modified(etag)
+        return with_etag(jsonify(BIG), etag)
+
+    @app.route('/text')
+    def text():
+        return app.response_class('x' * 5000, mimetype='text/plain')
+
+    return app.test_client()
+
+
+def test_large_json_is_gzipped_with_suffixed_etag(client):
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.get_etag() == (match_etag('lol', 1) + GZIP_ETAG_SUFFIX, False)
+    assert gzip.decompress(response.get_data()).decode().startswith('{')
+
+
+def test_identity_client_gets_plain_body(client):
+    response = client.get('/big')
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.get_etag() == (match_etag('lol', 1), False)
+    assert response.get_json() == BIG
+
+
+def test_small_and_non_json_responses_are_not_compressed(client):
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/text', headers={'Accept-Encoding': 'gzip'}).headers
+    assert http_cache.MIN_COMPRESS_SIZE > len(b'{"ok":true}')
+
+
+@pytest.mark.parametrize('client_etag', ['', GZIP_ETAG_SUFFIX])
+def test_if_none_match_accepts_either_encoding(client, client_etag):
+    etag = match_etag('lol', 1) + client_etag
+    response = client.get('/match', headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+    # 304 返回客户端持有的那个 ETag 版本
+    assert response.get_etag() == (etag, False)
+    assert not response.get_data()
+
+
+def test_stale_etag_gets_full_response(client):
+    response = client.get('/match', headers={'If-None-Match': '"v0-lol-1"'})
+    assert response.status_code == 200
+    assert response.get_json() == BIG
@@ -0,0 +1,113 @@
+"""JSON 编解码层：标准库回退、参数兼容与 Flask provider"""
+import json
+import math
+
+import pytest
+from flask import Flask, jsonify
+
+from utils import json_codec
+
+
+class _RecordingOrjson:
+    """记录调用的 orjson 替身，用于验证哪些调用走快速路径（输出与 orjson 相同：紧凑 UTF-8）"""
+    OPT_INDENT_2 = 1
+    OPT_SORT_KEYS = 2
+    OPT_PASSTHROUGH_DATETIME = 4
+    OPT_NON_STR_KEYS = 8
+
+    class JSONDecodeError(json.JSONDecodeError):
+        pass
+
+    def __init__(self):
+        self.calls = []
+
+    def dumps(self, obj, default=None, option=0):
+        self.calls.append('dumps')
+        return json.dumps(
+            obj, default=default, separators=(',', ':'), ensure_ascii=False, sort_keys=bool(option & self.OPT_SORT_KEYS)
+        ).encode('utf-8')
+
+    def loads(self, data):
+        self.calls.append('loads')
+        text = data.decode('utf-8') if isinstance(data, bytes) else data
+        if 'NaN' in text:
+            raise self.JSONDecodeError('NaN is not valid JSON', text, 0)
+        return json.loads(text)
+
+
+@pytest.fixture
+def stdlib(monkeypatch):
+    monkeypatch.setattr(json_codec, 'orjson', None)
+
+
+@pytest.fixture
+def fake_orjson(monkeypatch):
+    fake = _RecordingOrjson()
+    monkeypatch.setattr(json_codec, 'orjson', fake)
+    return fake
+
+
+SAMPLE = {'name': '盖伦', 'b': [1, 2.5, None, True], 'a': {'x': 'y'}}
+
+
+def test_stdlib_output_is_compact_utf8(stdlib):
+    assert json_codec.dumps(SAMPLE) == '{"name":"盖伦","b":[1,2.5,null,true],"a":{"x":"y"}}'
+    assert json_codec.dumps_bytes(SAMPLE) == json_codec.dumps(SAMPLE).encode('utf-8')
+    assert json_codec.dumps({'b': 1, 'a': 2}, sort_keys=True) == '{"a":2,"b":1}'
+
+
+def test_stdlib_honours_caller_kwargs(stdlib):
+    assert json_codec.dumps({'n': '盖伦'}, ensure_ascii=True) == '{"n":"\\u76d6\\u4f26"}'
+    assert json_codec.dumps([1, 2], separators=(', ', ': ')) == '[1, 2]'
+    assert json_codec.loads('{"v": 1.5}', parse_float=str) == {'v': '1.5'}
+
+
+def test_loads_accepts_bytes_and_raises_value_error(stdlib):
+    assert json_codec.loads('{"a":1}'.encode('utf-8')) == {'a': 1}
+    assert json_codec.loads(memoryview(b'[1]')) == [1]
+    with pytest.raises(ValueError):
+        json_codec.loads('{not json')
+
+
+def test_orjson_equivalent_kwargs_stay_on_fast_path(fake_orjson):
+    assert json_codec.dumps([1, 2], separators=(',', ':')) == '[1,2]'
+    assert json_codec.dumps(['盖伦'], ensure_ascii=False) == '["盖伦"]'
+    assert fake_orjson.calls == ['dumps', 'dumps']
+
+
+@pytest.mark.parametrize('kwargs, expected', [
+    ({'ensure_ascii': True}, '["\\u76d6\\u4f26"]'),
+    ({'separators': (', ', ': ')}, '["盖伦"]'),
+    ({'cls': json.JSONEncoder}, '["盖伦"]'),
+])
+def test_other_dump_kwargs_use_stdlib(fake_orjson, kwargs, expected):
+    assert json_codec.dumps(['盖伦'], **kwargs) == expected
+    assert fake_orjson.calls == []
+
+
+def test_load_kwargs_use_stdlib(fake_orjson):
+    hooked = json_codec.loads('{"a": 1}', object_hook=lambda d: sorted(d))
+    assert hooked == ['a']
+    assert fake_orjson.calls == []
+
+
+def test_strict_decode_failure_falls_back_to_stdlib(fake_orjson):
+    assert math.isnan(json_codec.loads('[NaN]')[0])
+    assert fake_orjson.calls == ['loads']
+
+
+def test_real_orjson_matches_stdlib_compact_output():
+    orjson = pytest.importorskip('orjson')
+    assert json_codec.orjson is orjson
+    assert json_codec.dumps(SAMPLE) == json.dumps(SAMPLE, separators=(',', ':'), ensure_ascii=False)
+    assert json_codec.dumps({1: 'a'}) == '{"1":"a"}'
+    assert json_codec.dumps({'big': 2 ** 70}) == '{"big":%d}' % 2 ** 70
+
+
+def test_flask_provider_keeps_order_and_utf8():
+    app = Flask(__name__)
+    app.json = json_codec.CodecJSONProvider(app)
+    with app.app_context():
+        body = jsonify({'z': 1, 'name': '盖伦'}).get_data(as_text=True)
+        assert body == '{"z":1,"name":"盖伦"}\n'
+        assert app.json.loads(b'{"a":[1]}') == {'a': [1]}
@@ -0,0 +1,106 @@
+"""实时对局事件的增量处理"""
+import pytest
+
+from core import lcu
+from services import live_events
+from services.live_events import LiveEventIngester
+
+PLAYERS = [
+    {'summonerName': 'Ally', 'riotIdGameName': 'AllyRiot', 'team': 'ORDER'},
+    {'summonerName': 'Foe', 'team': 'CHAOS'},
+]
+
+
+def _kill(event_id, killer, victim, assisters=(), time=60.0):
+    return {
+        'EventID': event_id, 'EventName': 'ChampionKill', 'EventTime': time,
+        'KillerName': killer, 'VictimName': victim, 'Assisters': list(assisters),
+    }
+
+
+def test_ingest_skips_seen_event_ids():
+    ingester = LiveEventIngester()
+    first = [{'EventID': 0, 'EventName': 'GameStart'}, _kill(1, 'Ally', 'Foe')]
+    assert ingester.ingest(first, PLAYERS) == 2
+    assert ingester.next_event_id == 2
+
+    # 重复返回已处理的事件只处理新的部分
+    assert ingester.ingest([_kill(1, 'Ally', 'Foe'), _kill(2, 'Foe', 'Ally', ['X'])], PLAYERS) == 1
+    assert ingester.ingest([_kill(2, 'Foe', 'Ally', ['X'])], PLAYERS) == 0
+    assert ingester.next_event_id == 3
+
+    counters = ingester.counters()
+    assert counters['players']['Ally'] == {'kills': 1, 'deaths': 1, 'assists': 0}
+    assert counters['players']['X'] == {'kills': 0, 'deaths': 0, 'assists': 1}
+    assert counters['teams'] == {'ORDER': 1, 'CHAOS': 1}
+
+
+def test_team_lookup_accepts_riot_id_names():
+    ingester = LiveEventIngester()
+    ingester.ingest([_kill(0, 'AllyRiot', 'Foe')], PLAYERS)
+    assert ingester.counters()['teams'] == {'ORDER': 1}
+
+
+def test_kill_feed_is_bounded_newest_first():
+    ingester = LiveEventIngester(kill_feed_size=2)
+    ingester.ingest([_kill(i, 'Ally', f'Foe{i}', time=i + 0.04) for i in range(4)], PLAYERS)
+    feed = ingester.recent_kills()
+    assert [kill['victim'] for kill in feed] == ['Foe3', 'Foe2']
+    assert feed[0]['time'] == 3.0
+    assert ingester.counters()['players']['Ally']['kills'] == 4
+
+
+def test_game_start_after_progress_resets():
+    ingester = LiveEventIngester()
+    ingester.ingest([{'EventID': 0, 'EventName': 'GameStart'}, _kill(1, 'Ally', 'Foe')], PLAYERS)
+    assert ingester.ingest([{'EventID': 0, 'EventName': 'GameStart'}], PLAYERS) == 1
+    assert ingester.next_event_id == 1
+    assert ingester.recent_kills() == []
+
+
+def test_game_time_going_back_resets():
+    ingester = LiveEventIngester()
+    assert ingester.observe_game_time(300.0) is False
+    ingester.ingest([_kill(0, 'Ally', 'Foe')], PLAYERS)
+    assert ingester.observe_game_time(300.5) is False
+    assert ingester.observe_game_time(5.0) is True
+    assert ingester.next_event_id == 0
+    assert ingester.observe_game_time(None) is False
+
+
+@pytest.fixture
+def live_api(monkeypatch):
+    requested = []
+    state = {'events': [{'EventID': 0, 'EventName': 'GameStart'}, _kill(1, 'Ally', 'Foe')]}
+
+    def get_events(event_id, timeout=None):
+        requested.append(event_id)
+        return [e for e in state['events'] if e['EventID'] >= event_id]
+
+    monkeypatch.setattr(lcu, 'get_live_active_player', lambda timeout=None: {'summonerName': 'Ally'})
+    monkeypatch.setattr(lcu, 'get_live_player_list', lambda timeout=None: PLAYERS)
+    monkeypatch.setattr(lcu, 'get_live_game_stats', lambda timeout=None: {'gameTime': 100.0})
+    monkeypatch.setattr(lcu, 'get_live_events', get_events)
+    monkeypatch.setattr(lcu, 'record_live_frame', lambda data: None)
+    return requested, state
+
+
+def test_fetch_live_game_requests_only_new_events(live_api):
+    requested, state = live_api
+    ingester = LiveEventIngester()
+
+    data = live_events.fetch_live_game(ingester)
+    assert data['events'] == {'Events': []}
+    state['events'].append(_kill(2, 'Foe', 'Ally'))
+    live_events.fetch_live_game(ingester)
+
+    assert requested == [0, 2]
+    assert ingester.counters()['teams'] == {'ORDER': 1, 'CHAOS': 1}
+
+
+def test_fetch_live_game_resets_when_not_in_game(live_api, monkeypatch):
+    ingester = LiveEventIngester()
+    live_events.fetch_live_game(ingester)
+    monkeypatch.setattr(lcu, 'get_live_active_player', lambda timeout=None: None)
+    assert live_events.fetch_live_game(ingester) is None
+    assert ingester.next_event_id == 0
@@ -0,0 +1,137 @@
+"""实时对局录制：索引、关键帧与按时间定位"""
+import pytest
+
+from core.lcu import live_recording
+from core.lcu.live_recording import LiveRecorder, LiveRecording, LiveReplay
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(live_recording, 'time', clock)
+    return clock
+
+
+def _frame(i, events):
+    return {'gameData': {'gameTime': float(i)}, 'activePlayer': {'level': i}, 'allPlayers': [], 'events': {'Events': events}}
+
+
+def _event(i):
+    return {'EventID': i, 'EventName': 'GameStart' if i == 0 else 'ChampionKill'}
+
+
+def _record(path, clock, count, incremental=True):
+    recorder = LiveRecorder(str(path), keyframe_interval=3)
+    for i in range(count):
+        events = [_event(i)] if incremental else [_event(j) for j in range(i + 1)]
+        recorder.record(_frame(i, events))
+        clock.now += 1
+    recorder.close()
+    return recorder
+
+
+def _event_ids(frame):
+    return [e['EventID'] for e in frame['events']['Events']]
+
+
+@pytest.mark.parametrize('incremental', [True, False])
+def test_keyframes_and_cumulative_events(tmp_path, clock, incremental):
+    path = tmp_path / 'game.rec'
+    recorder = _record(path, clock, 8, incremental)
+    assert recorder.stats()['frames'] == 8
+    assert recorder.stats()['keyframes'] == 3  # 第 0、3、6 条
+
+    recording = LiveRecording(str(path))
+    assert len(recording) == 8
+    assert recording.duration == 7.0
+    assert [i for i, entry in enumerate(recording._entries) if entry[3]] == [0, 3, 6]
+    for t, frame in recording.frames():
+        assert _event_ids(frame) == list(range(int(t) + 1))
+
+
+def test_frame_at_seeks_forward_and_backward(tmp_path, clock):
+    path = tmp_path / 'game.rec'
+    _record(path, clock, 8)
+    recording = LiveRecording(str(path))
+
+    assert _event_ids(recording.frame_at(6.5)) == list(range(7))
+    assert recording.frame_at(6.5)['gameData']['gameTime'] == 6.0
+    # 向后定位会从最近的关键帧重新累积
+    assert _event_ids(recording.frame_at(1.2)) == [0, 1]
+    assert _event_ids(recording.frame_at(4)) == list(range(5))
+    # 早于第一条记录时返回第一条，超过末尾时返回最后一条
+    assert _event_ids(recording.frame_at(-3)) == [0]
+    assert _event_ids(recording.frame_at(99)) == list(range(8))
+
+
+def test_incomplete_index_line_is_ignored(tmp_path, clock):
+    path = tmp_path / 'game.rec'
+    _record(path, clock, 4)
+    with open(f"{path}.idx", 'a', encoding='utf-8') as f:
+        f.write('4.0\t999')  # 写入中断的行
+    assert len(LiveRecording(str(path))) == 4
+
+
+def test_append_continues_timeline(tmp_path, clock):
+    path = tmp_path / 'game.rec'
+    _record(path, clock, 2)
+    clock.now += 50
+    recorder = LiveRecorder(str(path), keyframe_interval=3)
+    recorder.record(_frame(2, [_event(2)]))
+    recorder.close()
+
+    recording = LiveRecording(str(path))
+    assert recording._times == [0.0, 1.0, 1.0]
+    # 新录制器从关键帧开始
+    assert recording._entries[2][3] is True
+
+
+def test_restarted_game_starts_new_keyframe(tmp_path, clock):
+    path = tmp_path / 'game.rec'
+    recorder = LiveRecorder(str(path), keyframe_interval=10)
+    recorder.record(_frame(0, [_event(j) for j in range(5)]))
+    recorder.record(_frame(1, [_event(j) for j in range(6)]))
+    recorder.record(_frame(0, [_event(0)]))  # 新对局：事件从 GameStart 重新开始
+    recorder.close()
+
+    recording = LiveRecording(str(path))
+    assert [entry[3] for entry in recording._entries] == [True, False, True]
+    assert _event_ids(recording.frame_at(99)) == [0]
+
+
+def test_empty_recording_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        LiveRecording(str(tmp_path / 'missing.rec'))
+
+
+def test_replay_serves_live_api_paths(tmp_path, clock):
+    path = tmp_path / 'game.rec'
+    _record(path, clock, 8)
+    clock.now = 0.0
+    replay = LiveReplay(str(path), speed=2.0)
+
+    clock.now = 2.5  # 回放位置 5.0
+    assert replay.get('/liveclientdata/gamestats') == {'gameTime': 5.0}
+    assert replay.get('/liveclientdata/activeplayer') == {'level': 5}
+    assert _event_ids({'events': replay.get('/liveclientdata/eventdata', {'eventID': 3})}) == [3, 4, 5]
+    assert replay.get('/liveclientdata/unknown') is None
+
+    clock.now = 10.0  # 位置 20.0，超过录制末尾
+    assert replay.get('/liveclientdata/allgamedata') is None
+
+
+def test_looping_replay_wraps_around(tmp_path, clock):
+    path = tmp_path / 'game.rec'
+    _record(path, clock, 8)
+    clock.now = 0.0
+    replay = LiveReplay(str(path), loop=True)
+    clock.now = 9.0  # 9 % 7 = 2
+    assert replay.get('/liveclientdata/gamestats') == {'gameTime': 2.0}
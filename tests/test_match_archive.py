@@ -0,0 +1,81 @@
+"""对局存档：提交失败重试、数量/时间上限"""
+import sqlite3
+import time
+
+import pytest
+
+from core import match_archive as archive_module
+from core.match_archive import MatchArchive
+
+
+class _FailingConn:
+    """executemany 总是失败的连接"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def executemany(self, *args):
+        raise sqlite3.OperationalError('database is locked')
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = MatchArchive(str(tmp_path / 'archive.db'), max_rows=3, max_age=3600)
+    # 不启动后台写入线程，由测试直接驱动 _write_batch / _prune
+    archive._initialized = True
+    conn = archive._connect()
+    conn.executescript(archive_module._SCHEMA)
+    yield archive, conn
+    conn.close()
+
+
+def _drain(archive):
+    keys = []
+    while not archive._queue.empty():
+        keys.append(archive._queue.get_nowait())
+    return keys
+
+
+def test_failed_batch_is_kept_and_retried(archive):
+    archive, conn = archive
+    archive.put_raw(1, {'gameId': 1})
+    keys = _drain(archive)
+
+    assert archive._write_batch(_FailingConn(), keys) is False
+    assert archive.get_raw(1) == {'gameId': 1}
+    keys = _drain(archive)
+    assert keys == [('raw_games', '1', '')]
+
+    assert archive._write_batch(conn, keys) is True
+    assert archive.stats()['pending'] == 0
+    assert archive.get_raw(1) == {'gameId': 1}
+
+
+def test_batch_dropped_after_max_attempts(archive):
+    archive, _ = archive
+    archive.put_raw(1, {'gameId': 1})
+    for _ in range(archive_module.MAX_WRITE_ATTEMPTS):
+        assert archive._write_batch(_FailingConn(), _drain(archive)) is False
+
+    stats = archive.stats()
+    assert stats['dropped'] == 1
+    assert stats['write_errors'] == archive_module.MAX_WRITE_ATTEMPTS
+    assert stats['pending'] == 0
+    assert archive._queue.empty()
+
+
+def test_prune_enforces_row_and_age_caps(archive):
+    archive, conn = archive
+    now = time.time()
+    with conn:
+        conn.executemany(
+            "INSERT INTO raw_games (game_id, payload, archived_at) VALUES (?, '{}', ?)",
+            [(str(i), now - i) for i in range(5)] + [('old', now - 7200)]
+        )
+
+    assert archive._prune(conn) == 3
+    remaining = {row[0] for row in conn.execute("SELECT game_id FROM raw_games")}
+    assert remaining == {'0', '1', '2'}
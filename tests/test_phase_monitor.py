@@ -0,0 +1,83 @@
+"""游戏阶段监视器：轮询同步、阶段变化广播、推送与监听者生命周期"""
+import itertools
+
+import pytest
+
+from config import app_state
+from core import lcu
+from core.lcu import events
+from services.phase_monitor import PhaseMonitor, PhaseTransition
+
+
+@pytest.fixture
+def lcu_phases(monkeypatch):
+    """让 get_gameflow_phase 依次返回给定的阶段（之后保持最后一个）"""
+    monkeypatch.setattr(app_state, 'lcu_credentials', {'auth_token': 'token', 'app_port': 1})
+    monkeypatch.setattr(events, 'event_bus', events.LcuEventBus())  # 未连接：轮询模式
+    monkeypatch.setattr(events, 'ensure_event_bus', lambda token, port: None)
+
+    def script(*phases):
+        sequence = itertools.chain(phases, itertools.repeat(phases[-1]))
+        monkeypatch.setattr(lcu, 'get_gameflow_phase', lambda token, port: next(sequence))
+
+    return script
+
+
+def _transitions(sub, count):
+    items = [sub.get(timeout=2) for _ in range(count)]
+    return [(t.old_phase, t.new_phase) for t in items if isinstance(t, PhaseTransition)]
+
+
+def test_polling_publishes_only_changes(lcu_phases):
+    lcu_phases('Lobby', 'Lobby', None, 'ChampSelect')
+    monitor = PhaseMonitor(poll_interval=0.01)
+    with monitor.listen() as sub:
+        assert _transitions(sub, 2) == [(None, 'Lobby'), ('Lobby', 'ChampSelect')]
+        assert sub.get(timeout=0.1) is None
+    assert monitor.transitions == 2
+    assert monitor.current_phase == 'ChampSelect'
+
+
+def test_late_listener_replays_current_phase(lcu_phases):
+    lcu_phases('InProgress')
+    monitor = PhaseMonitor(poll_interval=0.01)
+    with monitor.listen() as first:
+        assert _transitions(first, 1) == [(None, 'InProgress')]
+        with monitor.listen() as second:
+            assert _transitions(second, 1) == [(None, 'InProgress')]
+
+
+def test_push_is_ignored_until_synced(lcu_phases):
+    monitor = PhaseMonitor()
+    received = []
+    monitor._listeners.append(received.append)
+
+    monitor._on_push(events.LcuEvent(events.GAMEFLOW_PHASE_URI, 'Update', 'Lobby'))
+    assert received == []
+
+    monitor._set_phase('Lobby')
+    monitor._on_push(events.LcuEvent(events.GAMEFLOW_PHASE_URI, 'Update', 'ReadyCheck'))
+    assert [(t.old_phase, t.new_phase) for t in received] == [(None, 'Lobby'), ('Lobby', 'ReadyCheck')]
+
+
+def test_listener_errors_do_not_block_others(lcu_phases):
+    monitor = PhaseMonitor()
+    received = []
+
+    def broken(transition):
+        raise RuntimeError('boom')
+
+    monitor._listeners.extend([broken, received.append])
+    monitor._set_phase('Lobby')
+    assert [t.new_phase for t in received] == ['Lobby']
+
+
+def test_thread_stops_after_last_listener(lcu_phases):
+    lcu_phases('Lobby')
+    monitor = PhaseMonitor(poll_interval=0.01)
+    with monitor.listen() as sub:
+        sub.get(timeout=2)
+        thread = monitor._thread
+    thread.join(2)
+    assert not thread.is_alive()
+    assert monitor._thread is None
@@ -0,0 +1,60 @@
+"""get_ranked_stats 的缓存与端点记忆"""
+import pytest
+
+from core.lcu import summoner
+
+RANKED = {'queues': [{'queueType': 'RANKED_SOLO_5x5', 'tier': 'GOLD', 'division': 'II'}]}
+
+
+@pytest.fixture
+def lcu_requests(monkeypatch):
+    """替换 make_request，记录发往 LCU 的请求路径"""
+    calls = []
+
+    def fake_request(method, endpoint, token, port, **kwargs):
+        calls.append(endpoint)
+        return RANKED
+
+    monkeypatch.setattr(summoner, 'make_request', fake_request)
+    summoner._ranked_cache.clear()
+    summoner._ranked_endpoints.clear()
+    yield calls
+    summoner._ranked_cache.clear()
+    summoner._ranked_endpoints.clear()
+
+
+def test_repeat_lookup_is_cached(lcu_requests):
+    first = summoner.get_ranked_stats('token', 1, puuid='p1')
+    assert first['queues'][0]['tier'] == 'GOLD'
+    sent = len(lcu_requests)
+    assert sent >= 1
+
+    assert summoner.get_ranked_stats('token', 1, puuid='p1') == first
+    assert summoner.get_ranked_stats('token', 1, puuid='p1') == first
+    assert len(lcu_requests) == sent
+
+
+def test_remembered_endpoint_result_is_cached(lcu_requests):
+    summoner.get_ranked_stats('token', 1, puuid='p1')
+    lcu_requests.clear()
+
+    # 第二名玩家走已记住的端点：只请求一次，之后命中缓存
+    summoner.get_ranked_stats('token', 1, puuid='p2')
+    assert len(lcu_requests) == 1
+    summoner.get_ranked_stats('token', 1, puuid='p2')
+    summoner.get_ranked_stats('token', 1, puuid='p2')
+    assert len(lcu_requests) == 1
+
+
+def test_empty_result_is_cached_briefly(lcu_requests, monkeypatch):
+    def empty_request(method, endpoint, token, port, **kwargs):
+        lcu_requests.append(endpoint)
+        return {'queues': []}
+
+    monkeypatch.setattr(summoner, 'make_request', empty_request)
+    assert summoner.get_ranked_stats('token', 1, puuid='unranked') == {}
+    sent = len(lcu_requests)
+
+    # 未定级玩家的重复查询不再重新探测所有端点
+    assert summoner.get_ranked_stats('token', 1, puuid='unranked') == {}
+    assert len(lcu_requests) == sent
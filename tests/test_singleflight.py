@@ -0,0 +1,148 @@
+"""同步 / 异步调用共用同一组进行中的请求"""
+import asyncio
+import threading
+
+from core.lcu.singleflight import SingleFlight
+
+
+def test_async_caller_joins_sync_call():
+    flight = SingleFlight('test_sync_leader')
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 'sync'
+
+    leader = threading.Thread(target=lambda: flight.do('k', slow))
+    leader.start()
+    started.wait(5)
+
+    async def follower():
+        task = asyncio.ensure_future(flight.do_async('k', lambda: asyncio.sleep(0, 'async')))
+        await asyncio.sleep(0.05)
+        release.set()
+        return await task
+
+    assert asyncio.run(follower()) == 'sync'
+    leader.join(5)
+    assert flight.stats()['executions'] == 1
+    assert flight.stats()['coalesced'] == 1
+
+
+def test_sync_caller_joins_async_call():
+    flight = SingleFlight('test_async_leader')
+    started = threading.Event()
+    results = []
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(0.1)
+        return 'async'
+
+    def follower():
+        started.wait(5)
+        results.append(flight.do('k', lambda: 'sync'))
+
+    thread = threading.Thread(target=follower)
+    thread.start()
+    assert asyncio.run(flight.do_async('k', slow)) == 'async'
+    thread.join(5)
+    assert results == ['async']
+    assert flight.stats()['executions'] == 1
+
+
+def test_cancelled_waiter_does_not_cancel_execution():
+    flight = SingleFlight('test_cancel')
+    finished = []
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+        return 'done'
+
+    async def main():
+        with_deadline = asyncio.ensure_future(flight.do_async('k', slow))
+        await asyncio.sleep(0.01)
+        with_deadline.cancel()
+        return await flight.do_async('k', slow)
+
+    assert asyncio.run(main()) == 'done'
+    assert finished == [True]
+    assert flight.stats()['executions'] == 1
+
+
+def test_running_leader_task_is_referenced():
+    flight = SingleFlight('test_task_ref')
+
+    async def main():
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return 'done'
+
+        task = asyncio.ensure_future(flight.do_async('k', slow))
+        await asyncio.sleep(0)
+        held = len(flight._tasks)
+        release.set()
+        return held, await task
+
+    assert asyncio.run(main()) == (1, 'done')
+    assert not flight._tasks
+
+
+def test_sync_waiter_fails_when_leader_loop_shuts_down():
+    flight = SingleFlight('test_loop_shutdown')
+    started = threading.Event()
+    errors = []
+
+    async def never():
+        started.set()
+        await asyncio.Event().wait()
+
+    def follower():
+        started.wait(5)
+        try:
+            flight.do('k', lambda: 'sync')
+        except RuntimeError as e:
+            errors.append(e)
+
+    async def main():
+        asyncio.ensure_future(flight.do_async('k', never))
+        await asyncio.sleep(0.05)
+        # 返回时 asyncio.run 取消仍在执行的任务并关闭事件循环
+
+    thread = threading.Thread(target=follower)
+    thread.start()
+    asyncio.run(main())
+    thread.join(5)
+    assert not thread.is_alive()
+    assert len(errors) == 1
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_sync_waiter_stops_waiting_on_stopped_loop():
+    flight = SingleFlight('test_loop_stopped', wait_timeout=0.2)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    started = threading.Event()
+
+    async def never():
+        started.set()
+        await asyncio.Event().wait()
+
+    asyncio.run_coroutine_threadsafe(flight.do_async('k', never), loop)
+    started.wait(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+    assert flight.do('k', lambda: 'sync') == 'sync'
+    assert flight.stats()['wait_timeouts'] == 1
+
+    pending = asyncio.all_tasks(loop)
+    for task in pending:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+    loop.close()
@@ -0,0 +1,70 @@
+"""快照差异：diff_snapshots 生成的变更应用后与新快照一致"""
+import copy
+
+import pytest
+
+from utils.snapshot_diff import apply_diff, diff_snapshots
+
+OLD = {
+    'gameTime': 120.5,
+    'data': {
+        'teammates': [{'name': 'A', 'kills': 1, 'items': [1001]}, {'name': 'B', 'kills': 0, 'items': []}],
+        'recentKills': ['A -> X'],
+        'dead': False,
+    },
+}
+
+
+@pytest.mark.parametrize('new', [
+    # 标量修改与列表元素内部修改
+    {**OLD, 'gameTime': 121.0, 'data': {**OLD['data'], 'teammates': [
+        {'name': 'A', 'kills': 2, 'items': [1001]}, {'name': 'B', 'kills': 0, 'items': [3006]}
+    ]}},
+    # 删除与新增键
+    {'gameTime': 120.5, 'data': {'teammates': OLD['data']['teammates'], 'dead': False, 'events': [1]}},
+    # 列表长度变化
+    {**OLD, 'data': {**OLD['data'], 'recentKills': ['A -> X', 'B -> Y']}},
+    # 类型变化（bool 与 int 不视为相同）
+    {**OLD, 'data': {**OLD['data'], 'dead': 0}},
+    # 整体替换
+    ['not', 'a', 'dict'],
+])
+def test_round_trip(new):
+    ops = diff_snapshots(OLD, new)
+    assert ops
+    result = apply_diff(copy.deepcopy(OLD), ops)
+    assert result == new
+    assert [type(v) for v in _leaves(result)] == [type(v) for v in _leaves(new)]
+
+
+def test_identical_snapshots_have_no_ops():
+    assert diff_snapshots(OLD, copy.deepcopy(OLD)) == []
+
+
+def test_ops_are_minimal_paths():
+    new = copy.deepcopy(OLD)
+    new['data']['teammates'][1]['kills'] = 3
+    del new['data']['recentKills']
+    assert diff_snapshots(OLD, new) == [
+        {'op': 'set', 'path': ['data', 'teammates', 1, 'kills'], 'value': 3},
+        {'op': 'del', 'path': ['data', 'recentKills']},
+    ]
+
+
+def test_resized_list_is_replaced_whole():
+    new = copy.deepcopy(OLD)
+    new['data']['teammates'].append({'name': 'C', 'kills': 0, 'items': []})
+    assert diff_snapshots(OLD, new) == [
+        {'op': 'set', 'path': ['data', 'teammates'], 'value': new['data']['teammates']},
+    ]
+
+
+def _leaves(value):
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _leaves(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _leaves(item)
+    else:
+        yield value
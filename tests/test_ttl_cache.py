@@ -0,0 +1,86 @@
+"""TTLCache：LRU 淘汰、TTL 过期与统计"""
+import pytest
+
+from core.lcu import cache as cache_module
+from core.lcu.cache import TTLCache, get_cache_stats
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache_module, 'time', clock)
+    return clock
+
+
+def test_lru_eviction_keeps_recently_used(clock):
+    cache = TTLCache('test_lru', maxsize=2, ttl=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # a 变为最近使用
+    cache.put('c', 3)
+
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache('test_ttl', maxsize=10, ttl=60)
+    cache.put('a', 1)
+    cache.put('short', 2, ttl=5)
+
+    clock.now += 5
+    assert cache.get('short', 'missing') == 'missing'
+    assert 'a' in cache
+
+    clock.now += 55
+    assert 'a' not in cache
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert stats['expirations'] == 2
+    assert len(cache) == 0
+
+
+def test_put_refreshes_expiry_and_position(clock):
+    cache = TTLCache('test_refresh', maxsize=2, ttl=10)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    clock.now += 8
+    cache.put('a', 3)
+    cache.put('c', 4)
+
+    clock.now += 8
+    assert cache.get('a') == 3
+    assert 'b' not in cache
+
+
+def test_cached_falsy_values_are_hits(clock):
+    cache = TTLCache('test_falsy', maxsize=10, ttl=10)
+    cache.put('empty', {})
+    assert cache.get('empty', 'missing') == {}
+    assert cache.stats()['hits'] == 1
+
+
+def test_pop_clear_and_stats(clock):
+    cache = TTLCache('test_stats', maxsize=10, ttl=10)
+    cache.put('a', 1)
+    cache.get('a')
+    cache.get('b')
+    assert cache.pop('a') == 1
+    assert cache.pop('a', 'gone') == 'gone'
+    cache.put('c', 3)
+    cache.clear()
+
+    stats = get_cache_stats()['test_stats']
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 1, 0)
+    assert stats['hit_ratio'] == 0.5
+    assert (stats['maxsize'], stats['ttl']) == (10, 10)
@@ -205,12 +205,14 @@ def format_player_info(player_data, active_player_name):
     }
 
 
-def format_game_data(all_game_data):
+def format_game_data(all_game_data, recent_kills=None, kill_counters=None):
     """
     格式化完整游戏数据
     
     Args:
         all_game_data: 从 /liveclientdata/allgamedata 获取的完整数据
+        recent_kills: 可选，已增量维护的最近击杀（最新在前），提供时不再遍历 events
+        kill_counters: 可选，增量维护的玩家/队伍击杀计数，提供时作为 killStats 返回
     
     Returns:
         dict: 包含格式化后的玩家列表和游戏信息
@@ -301,6 +303,24 @@ def format_game_data(all_game_data):
         'mapNumber': game_data.get('mapNumber', 'Unknown')
     }
     
+    if recent_kills is None:
+        recent_kills = _extract_recent_kills(all_game_data)
+    
+    result = {
+        'teammates': teammates,
+        'enemies': enemies,
+        'gameInfo': game_info,
+        'recentKills': recent_kills,
+        'activePlayerTeam': active_player_team,
+        'activePlayerSubteam': active_subteam_id
+    }
+    if kill_counters is not None:
+        result['killStats'] = kill_counters
+    return result
+
+
+def _extract_recent_kills(all_game_data):
+    """从完整事件列表中倒序提取最近10次击杀（未使用增量事件处理时的回退路径）"""
     # 提取事件信息（最近击杀等）
     events_data = all_game_data.get('events')
     if events_data is None or not isinstance(events_data, dict):
@@ -322,18 +342,5 @@ def format_game_data(all_game_data):
             })
             if len(recent_kills) >= 10:  # 只保留最近10次击杀
                 break
-    
-    return {
-        'teammates': teammates,
-        'enemies': enemies,
-        'gameInfo': game_info,
-        'recentKills': recent_kills,
-        'activePlayerTeam': active_player_team,
-        'activePlayerSubteam': active_subteam_id
-    }
-
-
-
-
-
 
+    return recent_kills
@@ -0,0 +1,88 @@
+"""
+HTTP 条件请求与压缩
+供数据 API 使用，减少局域网（手机等）客户端重复下载战绩和对局详情
+
+- 强 ETag: 不会变化的资源（按 gameId 的对局详情）
+- 弱 ETag: 会变化但可以判断是否相同的资源（战绩分页，按本页 gameId 列表计算）
+- is_not_modified(): 请求的 If-None-Match 命中时路由直接返回 not_modified()，不再访问 LCU
+- compress_response(): after_request 钩子，按 Accept-Encoding 对 JSON 响应进行 gzip 压缩；
+  压缩后的 ETag 追加 GZIP_ETAG_SUFFIX，比较时忽略该后缀
+"""
+import gzip
+import hashlib
+
+from flask import current_app, request
+
+# 响应结构变化时递增，使客户端缓存的旧 ETag 失效
+ETAG_VERSION = 1
+# 小于该大小（字节）的响应不压缩
+MIN_COMPRESS_SIZE = 1024
+COMPRESS_LEVEL = 6
+GZIP_ETAG_SUFFIX = '-gzip'
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html')
+
+
+def match_etag(kind, match_id):
+    """对局详情的强 ETag（同一 gameId 的对局数据不会再变化）"""
+    return f"v{ETAG_VERSION}-{kind}-{match_id}"
+
+
+def history_etag(kind, puuid, page, count, game_ids):
+    """战绩分页的弱 ETag：本页的对局 gameId 列表不变即视为相同"""
+    digest = hashlib.blake2b(','.join(str(g) for g in game_ids).encode(), digest_size=8).hexdigest()
+    return f"v{ETAG_VERSION}-{kind}-{puuid}-{page}-{count}-{digest}"
+
+
+def is_not_modified(etag):
+    """请求的 If-None-Match 是否包含该 ETag（弱比较，忽略压缩后缀）"""
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return False
+    return if_none_match.contains_weak(etag) or if_none_match.contains_weak(etag + GZIP_ETAG_SUFFIX)
+
+
+def not_modified(etag, weak=False, cache_control=None):
+    """304 Not Modified 响应（带上客户端持有的 ETag 版本和缓存策略）"""
+    if request.if_none_match.contains_weak(etag + GZIP_ETAG_SUFFIX):
+        etag += GZIP_ETAG_SUFFIX
+    response = current_app.response_class(status=304)
+    return with_etag(response, etag, weak, cache_control)
+
+
+def with_etag(response, etag, weak=False, cache_control=None):
+    """设置 ETag 和 Cache-Control（默认 private, no-cache: 每次使用前都需要重新验证）"""
+    response.set_etag(etag, weak=weak)
+    response.headers['Cache-Control'] = cache_control or 'private, no-cache'
+    return response
+
+
+def compress_response(response):
+    """
+    after_request 钩子：客户端接受 gzip 时压缩 JSON/HTML 响应。
+
+    流式响应（NDJSON）、已编码、过小或非 200 的响应保持不变。
+    """
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if request.accept_encodings.best_match(['gzip', 'identity'], default='identity') != 'gzip':
+        return response
+
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+
+    response.set_data(gzip.compress(data, compresslevel=COMPRESS_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    etag, weak = response.get_etag()
+    if etag:
+        # 压缩后的字节不同，强 ETag 需要区分编码
+        response.set_etag(etag + GZIP_ETAG_SUFFIX, weak=weak)
+    return response
@@ -0,0 +1,129 @@
+"""
+JSON 编解码层
+所有热路径（LCU 响应解析、Flask 响应、Socket.IO 推送、对局存档）统一通过这里编解码。
+
+安装了 orjson 时使用 orjson（可选依赖: pip install ".[fast-json]"），否则使用标准库 json。
+默认输出为紧凑的 UTF-8（不转义非 ASCII 字符）。dumps / loads 接受标准库的全部参数：
+与默认输出等价的参数（separators=(',', ':')、ensure_ascii=False）仍使用 orjson，
+其余参数（cls、object_hook、parse_float、ensure_ascii=True 等）交给标准库处理，行为与 json 模块一致，
+因此本模块可以直接作为 Flask-SocketIO 的 json 模块。
+
+- dumps(obj) -> str / dumps_bytes(obj) -> bytes / loads(str | bytes)
+- CodecJSONProvider: Flask 的 JSON provider（jsonify、request.get_json）；与 Flask 默认不同，
+  键不排序且直接输出非 ASCII 字符
+"""
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，未安装时使用标准库
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+# 与 Flask 的 JSON 异常类型保持一致（orjson 的异常是它们的子类）
+JSONDecodeError = json.JSONDecodeError
+
+# orjson 输出与这些标准库参数的结果相同，传入时仍可使用 orjson
+_ORJSON_EQUIVALENT_KWARGS = {'separators': (',', ':'), 'ensure_ascii': False}
+
+
+def _orjson_can_dump(indent, kwargs):
+    for key, value in kwargs.items():
+        if key not in _ORJSON_EQUIVALENT_KWARGS:
+            return False
+        if key == 'separators':
+            # 带缩进时标准库的换行格式与 orjson 不同
+            if indent or value is None or tuple(value) != _ORJSON_EQUIVALENT_KWARGS[key]:
+                return False
+        elif value != _ORJSON_EQUIVALENT_KWARGS[key]:
+            return False
+    return True
+
+
+def _orjson_dumps(obj, default=None, indent=None, sort_keys=False):
+    option = 0
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if default is not None:
+        # 日期交给调用方的 default 处理，与标准库行为一致
+        option |= orjson.OPT_PASSTHROUGH_DATETIME
+    try:
+        return orjson.dumps(obj, default=default, option=option)
+    except TypeError:
+        # 非字符串键（如 championId）或超出 64 位的整数：标准库能处理的情况回退
+        try:
+            return orjson.dumps(obj, default=default, option=option | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return _stdlib_dumps(obj, default=default, indent=indent, sort_keys=sort_keys).encode('utf-8')
+
+
+def _stdlib_dumps(obj, default=None, indent=None, sort_keys=False, **kwargs):
+    kwargs.setdefault('ensure_ascii', False)
+    if indent is None:
+        kwargs.setdefault('separators', (',', ':'))
+    return json.dumps(obj, default=default, indent=indent, sort_keys=sort_keys, **kwargs)
+
+
+def dumps_bytes(obj, default=None, indent=None, sort_keys=False):
+    """序列化为 UTF-8 字节（HTTP 响应体、请求体）"""
+    if orjson is not None:
+        return _orjson_dumps(obj, default, indent, sort_keys)
+    return _stdlib_dumps(obj, default, indent, sort_keys).encode('utf-8')
+
+
+def dumps(obj, default=None, indent=None, sort_keys=False, **kwargs):
+    """
+    序列化为字符串。
+
+    接受标准库的全部参数；orjson 无法得到相同结果的参数组合使用标准库序列化。
+    """
+    if orjson is not None and _orjson_can_dump(indent, kwargs):
+        return _orjson_dumps(obj, default, indent, sort_keys).decode('utf-8')
+    return _stdlib_dumps(obj, default, indent, sort_keys, **kwargs)
+
+
+def loads(data, **kwargs):
+    """
+    反序列化 str / bytes；格式错误时抛出 JSONDecodeError（ValueError 的子类）
+
+    传入标准库参数（object_hook、parse_float 等）时使用标准库解析。
+    """
+    if orjson is not None and not kwargs:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson 更严格（如 NaN、超大整数），交给标准库再试一次
+            pass
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode('utf-8')
+    return json.loads(data, **kwargs)
+
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """
+    使用本模块编解码的 Flask JSON provider。
+
+    与 Flask 的 DefaultJSONProvider 不同：键保持插入顺序（不排序），非 ASCII 字符直接以 UTF-8 输出。
+    """
+
+    sort_keys = False
+    ensure_ascii = False
+
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault('default', self.default)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = 2 if (self.compact is None and self._app.debug) or self.compact is False else None
+        body = dumps_bytes(obj, default=self.default, indent=indent, sort_keys=self.sort_keys)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
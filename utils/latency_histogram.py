@@ -0,0 +1,58 @@
+"""
+延迟直方图
+按固定的毫秒分桶累计样本，用于在 /get_perf_stats 中观察关键操作的延迟分布
+"""
+import bisect
+import threading
+
+# 分桶上界（毫秒），最后一个桶收集超过最大上界的样本
+DEFAULT_BUCKETS_MS = (25, 50, 100, 200, 300, 500, 1000, 2000, 5000)
+
+
+class LatencyHistogram:
+    """线程安全的延迟直方图"""
+
+    def __init__(self, name, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.name = name
+        self._bounds = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._min = None
+        self._max = None
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            self._counts[bisect.bisect_left(self._bounds, ms)] += 1
+            self._count += 1
+            self._total += ms
+            self._min = ms if self._min is None else min(self._min, ms)
+            self._max = ms if self._max is None else max(self._max, ms)
+
+    def _percentile(self, fraction):
+        """按分桶估算百分位（返回所在桶的上界）"""
+        target = fraction * self._count
+        seen = 0
+        # 最后一个桶（超过最大上界）没有上界，落在其中时返回最大值
+        for bound, count in zip(self._bounds, self._counts[:-1], strict=True):
+            seen += count
+            if seen >= target:
+                return bound
+        return round(self._max, 1)
+
+    def stats(self):
+        with self._lock:
+            if not self._count:
+                return {'count': 0}
+            labels = [f"<={bound}ms" for bound in self._bounds] + [f">{self._bounds[-1]}ms"]
+            return {
+                'count': self._count,
+                'avg_ms': round(self._total / self._count, 1),
+                'min_ms': round(self._min, 1),
+                'max_ms': round(self._max, 1),
+                'p50_ms': self._percentile(0.5),
+                'p95_ms': self._percentile(0.95),
+                'buckets': {label: count for label, count in zip(labels, self._counts, strict=True) if count},
+            }
@@ -0,0 +1,75 @@
+"""
+快照结构化差异
+比较两个 JSON 结构（dict / list / 标量），生成前端可按顺序应用的变更列表
+
+变更格式:
+    {'op': 'set', 'path': ['data', 'teammates', 2, 'kills'], 'value': 5}
+    {'op': 'del', 'path': ['data', 'recentKills']}
+
+- dict 按键递归比较，新增/修改的键为 set，删除的键为 del
+- 长度相同的 list 按下标递归比较；长度不同时整体 set
+- path 为空表示整体替换
+"""
+
+
+def diff_snapshots(old, new, path=()):
+    """
+    计算从 old 到 new 的变更列表
+
+    Args:
+        old: 旧快照
+        new: 新快照
+        path: 当前路径（递归使用）
+
+    Returns:
+        list: 变更列表，相同时为空列表
+    """
+    ops = []
+    _diff(old, new, list(path), ops)
+    return ops
+
+
+def _diff(old, new, path, ops):
+    if old is new:
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            if key not in old:
+                ops.append({'op': 'set', 'path': path + [key], 'value': value})
+            else:
+                _diff(old[key], value, path + [key], ops)
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'del', 'path': path + [key]})
+        return
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for index, (old_item, new_item) in enumerate(zip(old, new, strict=True)):
+            _diff(old_item, new_item, path + [index], ops)
+        return
+
+    # 类型不同或标量变化：直接替换（bool 与 int 需区分，避免 True == 1 被视为相同）
+    if type(old) is not type(new) or old != new:
+        ops.append({'op': 'set', 'path': path, 'value': new})
+
+
+def apply_diff(snapshot, ops):
+    """
+    把变更列表应用到快照上（就地修改），返回新的快照对象
+
+    与前端 live_game_page.js 中的 applyDiff 保持一致。
+    """
+    for op in ops:
+        path = op['path']
+        if not path:
+            snapshot = op.get('value')
+            continue
+        target = snapshot
+        for key in path[:-1]:
+            target = target[key]
+        if op['op'] == 'del':
+            target.pop(path[-1], None)
+        else:
+            target[path[-1]] = op['value']
+    return snapshot
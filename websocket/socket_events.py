@@ -2,9 +2,11 @@
 WebSocket事件处理模块
 """
 import threading
-from flask_socketio import emit
+from flask import request
+from flask_socketio import emit, join_room, leave_room
 from config import app_state
 from services import auto_accept_task, auto_analyze_task, auto_banpick_task
+from services.live_game_poller import live_game_poller, LIVE_GAME_ROOM
 from core import lcu
 
 
@@ -29,6 +31,7 @@ def register_socket_events(socketio):
         socketio: Flask-SocketIO实例
     """
     thread_lock = threading.Lock()
+    live_game_poller.attach(socketio)
     
     @socketio.on('connect')
     def handle_connect():
@@ -43,6 +46,7 @@ def register_socket_events(socketio):
     def handle_disconnect():
         """客户端断开连接事件"""
         print('浏览器客户端已断开连接')
+        live_game_poller.remove_watcher(request.sid)
         # 当检测到任一客户端断开时，通知其他已连接的客户端关闭页面。
         # 这会触发前端的 `server_shutdown` 处理器（尝试关闭窗口或显示提示）。
         try:
@@ -53,6 +57,20 @@ def register_socket_events(socketio):
         # 不重置功能开关，但清理线程状态标记
         # 这样如果用户刷新页面，重新连接后可以重新启动功能
     
+    @socketio.on('join_live_game')
+    def handle_join_live_game():
+        """加入实时对局房间：立即收到完整快照，之后只接收差异"""
+        join_room(LIVE_GAME_ROOM)
+        snapshot = live_game_poller.add_watcher(request.sid)
+        if snapshot is not None:
+            emit('live_game_snapshot', snapshot)
+    
+    @socketio.on('leave_live_game')
+    def handle_leave_live_game():
+        """离开实时对局房间"""
+        leave_room(LIVE_GAME_ROOM)
+        live_game_poller.remove_watcher(request.sid)
+    
     @socketio.on('start_auto_accept')
     def handle_start_auto_accept():
         """启动自动接受对局"""
@@ -235,6 +253,12 @@ def _detect_and_connect_lcu(socketio, status_proxy):
     
     token, port = lcu.autodetect_credentials(status_proxy)
 
+    # 凭证变化时丢弃旧连接池和事件通道，下一次使用时按新 (port, token) 重建
+    previous = (app_state.lcu_credentials["app_port"], app_state.lcu_credentials["auth_token"])
+    if previous != (port, token):
+        lcu.reset_session()
+        lcu.event_bus.stop()
+
     if token and port:
         app_state.lcu_credentials["auth_token"] = token
         app_state.lcu_credentials["app_port"] = port